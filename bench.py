@@ -0,0 +1,331 @@
+"""
+Benchmarks for the incident analytics hot paths.
+
+Usage:
+    python bench.py reports    # columnar report aggregation vs the original per-incident loop
+    python bench.py charts     # templated chart payloads vs the original validate/re-dump loop
+    python bench.py startup    # import time and peak RSS of bot/main, lazy models vs building them all
+"""
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+import charts
+import reports
+
+STAGES = ["Closed", "Verification", "Resolution in Progress", "New", "On Hold", "Resolved - Completed", ""]
+ISSUE_STATUSES = ["Open", "Pending", "Resolved", "Done", "Escalated", "Waiting for customer", "In Progress", ""]
+SUBCATEGORIES = ["VDI", "Email", "Printer", "Login", "VPN", "Outlook", "Teams", "OneDrive", "Citrix", "Other", None]
+
+
+def make_incidents(n: int, seed: int = 7) -> list:
+    """Synthetic categoriser incidents with the field mix seen in production."""
+    rng = random.Random(seed)
+    now = datetime.now()
+    incidents = []
+    for i in range(n):
+        created = now - timedelta(days=rng.randint(0, 90), seconds=rng.randint(0, 86400))
+        incidents.append({
+            "requestId": f"REQ{i:07d}",
+            "record_date_timestamp": created.timestamp(),
+            "createdDate": rng.choice([
+                created.strftime("%Y-%m-%dT%H:%M:%S.22Z"),
+                created.strftime("%Y-%m-%d %H:%M:%S"),
+            ]),
+            "correctedSubCategory": rng.choice(SUBCATEGORIES),
+            "stage": rng.choice(STAGES),
+            "issueStatus": rng.choice(ISSUE_STATUSES),
+            "resolution": rng.choice(["", "Restarted the VM", None]),
+            "priority": rng.choice(["P1", "P2", "P3", "P4"]),
+            "top_engineers_for_category": [
+                {"engineer": f"engineer-{rng.randint(0, 40)}", "percentage": round(rng.random() * 100, 2)}
+                for _ in range(3)
+            ],
+        })
+    return incidents
+
+
+# Status keywords of the per-incident loop get_incidents_by_category shipped with. "Done" never matched the
+# lower-cased stage, and is kept so the reference gives the same answers.
+_STAGE_RESOLVED = ["closed", "resolved", "completed", "resolved - completed", "closed - verified",
+                   "resolved - verified", "closed - resolved", "completed - verified", "Done"]
+_STAGE_PENDING = ["verification", "pending", "in progress", "resolution in progress", "isolation", "on hold",
+                  "hold", "in queue", "assigned", "investigation", "work in progress", "wip"]
+_ISSUE_RESOLVED = ["done", "resolved", "closed", "completed"]
+_ISSUE_PENDING = ["pending", "on hold", "escalated", "waiting", "in progress", "verification",
+                  "review with engineering"]
+
+
+def _legacy_days_old(value, now: datetime) -> int:
+    """Age in days the way the original loop computed it: from the date part only, 0 when unparseable."""
+    try:
+        if isinstance(value, (int, float)):
+            return (now - datetime.fromtimestamp(value)).days
+        if isinstance(value, str) and len(value) >= 10:
+            return (now - datetime.strptime(value[:10], "%Y-%m-%d")).days
+    except (ValueError, OverflowError, OSError):
+        pass
+    return 0
+
+
+def _legacy_status(incident: dict) -> str:
+    stage = incident.get("stage", "") or incident.get("Stage", "")
+    issue_status = incident.get("issueStatus", "") or incident.get("IssueStatus", "")
+    resolution_note = incident.get("resolutionNote") or incident.get("resolution", "") or incident.get("Resolution", "")
+    has_resolution = bool(resolution_note and resolution_note.strip())
+    if stage:
+        stage_lower = stage.lower().strip()
+        if any(keyword in stage_lower for keyword in _STAGE_RESOLVED):
+            return "resolved"
+        if any(keyword in stage_lower for keyword in _STAGE_PENDING):
+            return "pending"
+        return "resolved" if has_resolution else "open"
+    if issue_status:
+        status_lower = issue_status.lower().strip()
+        if any(keyword in status_lower for keyword in _ISSUE_RESOLVED):
+            return "resolved"
+        if any(keyword in status_lower for keyword in _ISSUE_PENDING):
+            return "pending"
+        return "resolved" if "open" in status_lower and has_resolution else "open"
+    if has_resolution:
+        return "resolved"
+    status_details = (incident.get("statusDetails") or incident.get("status", "") or incident.get("Status", "")).lower()
+    if "resolved" in status_details:
+        return "resolved"
+    return "pending" if "pending" in status_details else "open"
+
+
+def legacy_aggregate(incidents: list):
+    """
+    Reference for the per-incident dict loop get_incidents_by_category shipped with.
+    Note:
+        Trimmed to the logic being compared; see `git show ba76e20:tools.py` for the original.
+    """
+    by_priority = {}
+    if incidents and "priority" in incidents[0]:
+        for incident in incidents:
+            priority = incident.get("priority", "Unknown")
+            by_priority[priority] = by_priority.get(priority, 0) + 1
+
+    ageing_counts = {"0-7": 0, "8-14": 0, "15-30": 0, "30+": 0}
+    subcategory_status = {}
+    now = datetime.now()
+    for incident in incidents:
+        days_old = _legacy_days_old(
+            incident.get("created_at_timestamp")
+            or incident.get("created_at")
+            or incident.get("createdDate")
+            or incident.get("created_date"),
+            now,
+        )
+        if days_old <= 7:
+            ageing_counts["0-7"] += 1
+        elif days_old <= 14:
+            ageing_counts["8-14"] += 1
+        elif days_old <= 30:
+            ageing_counts["15-30"] += 1
+        else:
+            ageing_counts["30+"] += 1
+
+        subcategory = (
+            incident.get("correctedSubCategory")
+            or incident.get("corrected_sub_category")
+            or incident.get("subCategory")
+            or incident.get("sub_category")
+            or "Other"
+        )
+        counts = subcategory_status.setdefault(subcategory, {"resolved": 0, "pending": 0, "open": 0})
+        counts[_legacy_status(incident)] += 1
+
+    engineer_percentages = {}
+    for incident in incidents:
+        for engineer_data in incident.get("top_engineers_for_category") or []:
+            if isinstance(engineer_data, dict):
+                engineer = engineer_data.get("engineer", "Unknown")
+                percentage = engineer_data.get("percentage", 0.0)
+                engineer_percentages[engineer] = max(engineer_percentages.get(engineer, percentage), percentage)
+    top_smes = [{"engineer": engineer, "percentage": percentage} for engineer, percentage in engineer_percentages.items()]
+    top_smes.sort(key=lambda x: x["percentage"], reverse=True)
+    return by_priority, ageing_counts, subcategory_status, top_smes[:5]
+
+
+def columnar_aggregate(incidents: list):
+    columns = reports.IncidentColumns.from_incidents(incidents)
+    return columns.by_priority(), columns.ageing_counts(), columns.subcategory_status(), columns.top_smes()
+
+
+def _legacy_axis(text: str) -> dict:
+    return {"title": {"display": True, "text": text}}
+
+
+def _legacy_dataset(label: str, data: list, colour) -> dict:
+    return {"label": label, "data": data, "backgroundColor": colour, "borderWidth": 1, "borderColor": "#ffffff"}
+
+
+def legacy_build_charts(ageing_counts: dict, subcategory_status: dict, top_subcategories: list) -> str:
+    """
+    Reference for the chart building get_incidents_by_category shipped with.
+    Note:
+        It built both chart dicts per call, serialised them, and then parsed
+        the result five more times and re-serialised it once to validate it.
+        Only that happy path is kept here.
+    """
+    count_axis = {"beginAtZero": True, **_legacy_axis("Number of Incidents (Count)")}
+    ageing_chart = {
+        "type": "bar",
+        "data": {
+            "labels": ["0-7 days", "8-14 days", "15-30 days", "30+ days"],
+            "datasets": [_legacy_dataset(
+                "Incidents",
+                [ageing_counts["0-7"], ageing_counts["8-14"], ageing_counts["15-30"], ageing_counts["30+"]],
+                ["#3B82F6", "#60A5FA", "#93C5FD", "#DBEAFE"],
+            )],
+        },
+        "options": {
+            "responsive": True,
+            "maintainAspectRatio": True,
+            "plugins": {
+                "title": {"display": True, "text": "Incident Ageing Analysis", "font": {"size": 18, "weight": "bold"}},
+                "legend": {"display": False},
+            },
+            "scales": {"y": count_axis, "x": _legacy_axis("Age Range (Days)")},
+        },
+    }
+    labels = [subcat for subcat, _ in top_subcategories]
+    status_chart = {
+        "type": "bar",
+        "data": {
+            "labels": labels,
+            "datasets": [
+                _legacy_dataset(label, [subcategory_status[subcat][status] for subcat in labels], colour)
+                for label, status, colour in (
+                    ("Resolved", "resolved", "#10B981"),
+                    ("Pending", "pending", "#F59E0B"),
+                    ("Open", "open", "#EF4444"),
+                )
+            ],
+        },
+        "options": {
+            "indexAxis": "y",
+            "responsive": True,
+            "maintainAspectRatio": True,
+            "plugins": {
+                "title": {"display": True, "text": "Issue Status by Subcategory", "font": {"size": 18, "weight": "bold"}},
+                "legend": {"display": True, "position": "top"},
+            },
+            "scales": {"x": count_axis, "y": _legacy_axis("Subcategory")},
+        },
+    }
+
+    charts_json = json.dumps([ageing_chart, status_chart])
+    parsed = None
+    for _ in range(2):
+        parsed = json.loads(charts_json)
+    charts_json = json.dumps(parsed)
+    for _ in range(3):
+        json.loads(charts_json)
+    return charts_json
+
+
+def template_build_charts(ageing_counts: dict, subcategory_status: dict, top_subcategories: list) -> str:
+    labels = [subcat for subcat, _ in top_subcategories]
+    return charts.build_charts_json(
+        ageing_data=[ageing_counts[bucket] for bucket in reports.AGEING_BUCKETS],
+        subcategory_labels=labels,
+        resolved_counts=[subcategory_status[subcat]["resolved"] for subcat in labels],
+        pending_counts=[subcategory_status[subcat]["pending"] for subcat in labels],
+        open_counts=[subcategory_status[subcat]["open"] for subcat in labels],
+    )
+
+
+def timeit(fn, *args, repeat: int = 5) -> float:
+    """Best wall-clock time of `repeat` runs, in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def bench_reports():
+    for n in (10_000, 100_000):
+        incidents = make_incidents(n)
+        legacy = legacy_aggregate(incidents)
+        columnar = columnar_aggregate(incidents)
+        assert legacy[:3] == columnar[:3], "columnar aggregates differ from the baseline loop"
+        legacy_ms = timeit(legacy_aggregate, incidents)
+        columnar_ms = timeit(columnar_aggregate, incidents)
+        print(
+            f"reports n={n:>7,}: loop {legacy_ms:8.1f} ms | columnar {columnar_ms:8.1f} ms | "
+            f"speed-up {legacy_ms / columnar_ms:4.1f}x"
+        )
+
+
+def bench_charts():
+    columns = reports.IncidentColumns.from_incidents(make_incidents(10_000))
+    ageing_counts = columns.ageing_counts()
+    subcategory_status = columns.subcategory_status()
+    top_subcategories = sorted(
+        subcategory_status.items(), key=lambda x: sum(x[1].values()), reverse=True
+    )[:8]
+    args = (ageing_counts, subcategory_status, top_subcategories)
+    assert legacy_build_charts(*args) == template_build_charts(*args), "chart payloads differ"
+    runs = 2_000
+    legacy_ms = timeit(lambda: [legacy_build_charts(*args) for _ in range(runs)]) / runs
+    template_ms = timeit(lambda: [template_build_charts(*args) for _ in range(runs)]) / runs
+    print(
+        f"charts: validate/re-dump {legacy_ms * 1000:7.1f} us | template {template_ms * 1000:7.1f} us | "
+        f"speed-up {legacy_ms / template_ms:4.1f}x"
+    )
+
+
+# Each probe runs in a fresh interpreter; it prints import seconds and peak RSS in KiB
+_STARTUP_PROBE = """
+import resource, time
+started = time.perf_counter()
+{statement}
+print(time.perf_counter() - started, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+STARTUP_CASES = {
+    "import bot": "import bot",
+    "import main": "import main",
+    "import llm": "import llm",
+    # What importing llm cost before models were built lazily
+    "build all models": "import llm\nfor name in llm.MODEL_NAMES: llm.get_model(name)",
+}
+
+
+def bench_startup(repeat: int = 3):
+    root = os.path.dirname(os.path.abspath(__file__))
+    for label, statement in STARTUP_CASES.items():
+        runs = []
+        for _ in range(repeat):
+            result = subprocess.run(
+                [sys.executable, "-c", _STARTUP_PROBE.format(statement=statement)],
+                cwd=root, capture_output=True, text=True,
+            )
+            if result.returncode != 0:
+                print(f"startup {label:>16}: failed ({result.stderr.strip().splitlines()[-1]})")
+                break
+            seconds, rss_kib = result.stdout.split()[-2:]
+            runs.append((float(seconds), int(rss_kib)))
+        else:
+            seconds = min(run[0] for run in runs)
+            rss_mib = min(run[1] for run in runs) / 1024
+            print(f"startup {label:>16}: {seconds * 1000:8.0f} ms | peak RSS {rss_mib:7.1f} MiB")
+
+
+BENCHMARKS = {
+    "reports": bench_reports,
+    "charts": bench_charts,
+    "startup": bench_startup,
+}
+
+if __name__ == "__main__":
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        BENCHMARKS[name]()
@@ -1,4 +1,5 @@
 import asyncio
+from contextlib import AsyncExitStack
 from dotenv import load_dotenv
 import os
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
@@ -9,14 +10,25 @@ from telegram.ext import (
     CommandHandler,
     ContextTypes,
 )
-from kb import create_vector_store
 from deep_agents import create_agent
 from loguru import logger
 from telegram.constants import ParseMode
 import telegramify_markdown
 from telegramify_markdown.customize import get_runtime_config
 from langgraph.store.postgres.aio import AsyncPostgresStore
+from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
 import constants as c
+import cache
+import checkpoints
+import db
+import http_client
+import llm as l
+import mirror
+import routing
+import scheduler
+import streaming
+import update_processor
+import workers
 
 cfg = get_runtime_config()
 cfg.markdown_symbol.heading_level_1 = "📌"
@@ -30,19 +42,39 @@ AGENT = None
 
 
 async def echo(update: Update, context: ContextTypes.DEFAULT_TYPE):
-
-    result = await AGENT.ainvoke(
-        {"messages": [{"role": "user", "content": update.message.text}]},
-        config={"configurable": {"thread_id": str(update.effective_chat.id), "assistant_id": str(update.effective_user.id), "user_name": update.effective_user.first_name}},
-    )
-    logger.info(result)
-    response_text = str(result["structured_response"]["response"])
+    agent_input = {"messages": [{"role": "user", "content": update.message.text}]}
+    config = {"configurable": {"thread_id": str(update.effective_chat.id), "assistant_id": str(update.effective_user.id), "user_name": update.effective_user.first_name, "priority": scheduler.INTERACTIVE}}
+
+    reply = None
+    if c.BOT_STREAMING:
+        # Show a placeholder straight away and edit it with progress while the agent runs
+        reply = streaming.StreamingReply(context.bot, update.effective_chat.id, c.BOT_STREAM_EDIT_INTERVAL)
+        await reply.start()
+        try:
+            structured_response = await streaming.stream_to_reply(
+                AGENT.astream(agent_input, config=config, stream_mode=["updates", "messages"]), reply
+            )
+            if structured_response is None:
+                raise RuntimeError("Agent run finished without a structured response")
+        except Exception:
+            # Don't leave the placeholder spinning forever
+            await reply.finish("⚠️ Sorry, something went wrong while working on that.")
+            raise
+        logger.info(f"Streamed response with {reply.edits} progress edits: {structured_response}")
+    else:
+        result = await AGENT.ainvoke(agent_input, config=config)
+        logger.info(result)
+        structured_response = result["structured_response"]
+    response_text = str(structured_response["response"])
     converted = telegramify_markdown.markdownify(
         response_text,
         max_line_length=None,  # If you want to change the max line length for links, images, set it to the desired value.
         normalize_whitespace=False,
     )
-    await context.bot.send_message(chat_id=update.effective_chat.id, text=converted, parse_mode=ParseMode.MARKDOWN_V2)
+    if reply is not None:
+        await reply.finish(converted, parse_mode=ParseMode.MARKDOWN_V2)
+    else:
+        await context.bot.send_message(chat_id=update.effective_chat.id, text=converted, parse_mode=ParseMode.MARKDOWN_V2)
 
 
 async def start(update, context):
@@ -59,13 +91,26 @@ async def main():
     # logger.info("Creating vector store")
     # store = await create_vector_store()
     global AGENT
-    async with AsyncPostgresStore.from_conn_string(c.CONNECTION_STRING) as store:
+    async with AsyncExitStack() as stack:
+        # The memory store and the checkpointer share one pool, so concurrent chats don't queue on a single connection
+        pool = await db.open_pool()
+        stack.push_async_callback(db.close_pool)
+        store = AsyncPostgresStore(pool)
         await store.setup()
 
-        AGENT = create_agent(store)
+        checkpointer = None
+        if c.CHECKPOINTER == "postgres":
+            checkpointer = AsyncPostgresSaver(pool)
+            await checkpointer.setup()
+
+        AGENT = create_agent(store, checkpointer)
         logger.info("Agent started")
 
-        application = ApplicationBuilder().token(TELEGRAM_BOT_TOKEN).build()
+        # Chats are handled in parallel, each chat's messages strictly in order
+        processor = update_processor.ChatOrderedUpdateProcessor(c.BOT_CONCURRENT_UPDATES)
+        application = (
+            ApplicationBuilder().token(TELEGRAM_BOT_TOKEN).concurrent_updates(processor).build()
+        )
 
         # Handlers
         application.add_handler(CommandHandler("start", start))
@@ -74,8 +119,13 @@ async def main():
             MessageHandler(filters.TEXT & (~filters.COMMAND), echo)
         )
 
+        prewarm_task = asyncio.create_task(l.prewarm(*c.LLM_PREWARM))
         try:
             # ---- START ----
+            await http_client.startup()
+            await mirror.start()
+            if checkpointer is not None:
+                checkpoints.start_pruning(checkpointer)
             await application.initialize()
             await application.start()
             await application.updater.start_polling()
@@ -92,10 +142,21 @@ async def main():
             # ---- CLEANUP (VERY IMPORTANT) ----
             logger.info("Stopping Telegram bot...")
 
+            prewarm_task.cancel()
             await application.updater.stop()
             await application.stop()
             await application.shutdown()
-
+            await mirror.stop()
+            await checkpoints.stop_pruning()
+            await scheduler.stop()
+            await http_client.shutdown()
+            workers.shutdown()
+
+            logger.info(f"Update processing stats: {processor.stats()}")
+            logger.info(f"Postgres pool stats: {db.stats()}")
+            logger.info(f"Model scheduler stats: {scheduler.stats()}")
+            logger.info(f"Model routing stats: {routing.stats()}")
+            logger.info(f"Cache stats: {cache.stats()}")
             logger.info("Telegram bot stopped cleanly")
 
 if __name__ == "__main__":
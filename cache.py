@@ -0,0 +1,201 @@
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable
+import structlog
+
+logger = structlog.get_logger()
+
+# Every cache created in this process, by creation order
+_caches: list = []
+
+
+def make_key(*parts, **params) -> tuple:
+    """
+    Build a cache key from request parameters.
+    Args:
+        parts: Positional key parts, e.g. the endpoint or operation name
+        params: Request parameters; None/empty values are dropped, strings are stripped and order is ignored
+    Returns:
+        tuple: A hashable, normalised key
+    """
+    normalised = []
+    for name, value in params.items():
+        if isinstance(value, str):
+            value = value.strip()
+        if value is None or value == "":
+            continue
+        normalised.append((name, value))
+    return (*parts, *sorted(normalised))
+
+
+def _estimate_size(value: Any) -> int:
+    """Approximate memory cost of a cached value, as the length of its JSON form."""
+    return len(json.dumps(value, default=str))
+
+
+class TTLCache:
+    """
+    Async result cache with TTL, stale-while-revalidate and an LRU memory budget.
+
+    Entries are fresh for `ttl` seconds. For a further `stale_ttl` seconds they
+    are still served while a single background task reloads them. Concurrent
+    misses for a key are coalesced into one load. Once the
+    estimated size of all entries exceeds `max_bytes` the least recently used
+    entries are evicted. All bookkeeping runs on the event loop, so no lock is
+    needed.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        ttl: float,
+        stale_ttl: float = 0,
+        max_bytes: int = 16 * 1024 * 1024,
+        sizeof: Callable[[Any], int] = _estimate_size,
+    ):
+        self.name = name
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        # key -> (value, stored_at, size)
+        self._entries: OrderedDict[Hashable, tuple[Any, float, int]] = OrderedDict()
+        self._bytes = 0
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.refresh_errors = 0
+        register(self)
+
+    def _store(self, key: Hashable, value: Any):
+        size = self.sizeof(value)
+        if size > self.max_bytes:
+            return
+        self._drop(key)
+        self._entries[key] = (value, time.monotonic(), size)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+            self.evictions += 1
+
+    def _drop(self, key: Hashable):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[2]
+
+    async def _load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            value = await loader()
+            # Skip storing if the key was invalidated while this load was in flight
+            if self._inflight.get(key) is asyncio.current_task():
+                self._store(key, value)
+            return value
+        finally:
+            if self._inflight.get(key) is asyncio.current_task():
+                del self._inflight[key]
+
+    def _start_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        task = asyncio.create_task(self._load(key, loader))
+        task.add_done_callback(self._load_done)
+        self._inflight[key] = task
+        return task
+
+    def _load_done(self, task: asyncio.Task):
+        # Every waiter may have been cancelled; retrieve the error here so asyncio doesn't report it as unhandled
+        if not task.cancelled() and task.exception() is not None:
+            logger.debug("Cache load failed", cache=self.name, error=str(task.exception()))
+
+    def _refresh_done(self, task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            self.refresh_errors += 1
+            logger.warning("Cache refresh failed", cache=self.name, error=str(task.exception()))
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Return the cached value for `key`, loading it with `loader` on a miss.
+        Args:
+            key: Cache key, usually from make_key()
+            loader: Coroutine function producing the value; exceptions propagate and nothing is cached
+        Returns:
+            The cached or freshly loaded value
+        Note:
+            Concurrent misses for the same key share a single in-flight load.
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, stored_at, _ = entry
+            age = time.monotonic() - stored_at
+            if age <= self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            if age <= self.ttl + self.stale_ttl:
+                self._entries.move_to_end(key)
+                self.stale_hits += 1
+                if key not in self._inflight:
+                    self._start_load(key, loader).add_done_callback(self._refresh_done)
+                return value
+            self._drop(key)
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            task = self._start_load(key, loader)
+        # Shield so one caller being cancelled does not cancel the load for everyone else
+        return await asyncio.shield(task)
+
+    def get(self, key: Hashable) -> Any:
+        """Return the fresh value cached for `key`, or None without loading anything."""
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() - entry[1] > self.ttl:
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def set(self, key: Hashable, value: Any):
+        """Store a value loaded outside get_or_load, e.g. one item of a batch response."""
+        self._store(key, value)
+
+    def invalidate(self, key: Hashable):
+        """Drop `key`, including any load in flight, so the next lookup fetches fresh data."""
+        self._drop(key)
+        self._inflight.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self) -> dict:
+        """Lookup outcomes since startup, and how many entries and bytes are held now."""
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "name": self.name,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": round((self.hits + self.stale_hits) / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "refresh_errors": self.refresh_errors,
+        }
+
+
+def register(cache: Any):
+    """Include `cache` (anything with a stats() method) in stats()."""
+    _caches.append(cache)
+
+
+def stats() -> list[dict]:
+    """stats() of every cache created in this process, logged by the bot on shutdown."""
+    return [cache.stats() for cache in _caches]
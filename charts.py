@@ -0,0 +1,148 @@
+import json
+import re
+
+# Placeholders mark where per-report arrays go in the pre-serialised templates
+_SLOT = re.compile(r'"__slot_(\w+)__"')
+
+
+def _slot(name: str) -> str:
+    return f"__slot_{name}__"
+
+
+AGEING_CHART = {
+    "type": "bar",
+    "data": {
+        "labels": ["0-7 days", "8-14 days", "15-30 days", "30+ days"],
+        "datasets": [{
+            "label": "Incidents",
+            "data": _slot("ageing_data"),
+            "backgroundColor": ["#3B82F6", "#60A5FA", "#93C5FD", "#DBEAFE"],
+            "borderWidth": 1,
+            "borderColor": "#ffffff"
+        }]
+    },
+    "options": {
+        "responsive": True,
+        "maintainAspectRatio": True,
+        "plugins": {
+            "title": {
+                "display": True,
+                "text": "Incident Ageing Analysis",
+                "font": {"size": 18, "weight": "bold"}
+            },
+            "legend": {"display": False}
+        },
+        "scales": {
+            "y": {
+                "beginAtZero": True,
+                "title": {
+                    "display": True,
+                    "text": "Number of Incidents (Count)"
+                }
+            },
+            "x": {
+                "title": {
+                    "display": True,
+                    "text": "Age Range (Days)"
+                }
+            }
+        }
+    }
+}
+
+SUBCATEGORY_STATUS_CHART = {
+    "type": "bar",
+    "data": {
+        "labels": _slot("subcategory_labels"),
+        "datasets": [
+            {
+                "label": "Resolved",
+                "data": _slot("resolved"),
+                "backgroundColor": "#10B981",
+                "borderWidth": 1,
+                "borderColor": "#ffffff"
+            },
+            {
+                "label": "Pending",
+                "data": _slot("pending"),
+                "backgroundColor": "#F59E0B",
+                "borderWidth": 1,
+                "borderColor": "#ffffff"
+            },
+            {
+                "label": "Open",
+                "data": _slot("open"),
+                "backgroundColor": "#EF4444",
+                "borderWidth": 1,
+                "borderColor": "#ffffff"
+            }
+        ]
+    },
+    "options": {
+        "indexAxis": "y",
+        "responsive": True,
+        "maintainAspectRatio": True,
+        "plugins": {
+            "title": {
+                "display": True,
+                "text": "Issue Status by Subcategory",
+                "font": {"size": 18, "weight": "bold"}
+            },
+            "legend": {
+                "display": True,
+                "position": "top"
+            }
+        },
+        "scales": {
+            "x": {
+                "beginAtZero": True,
+                "title": {
+                    "display": True,
+                    "text": "Number of Incidents (Count)"
+                }
+            },
+            "y": {
+                "title": {
+                    "display": True,
+                    "text": "Subcategory"
+                }
+            }
+        }
+    }
+}
+
+
+def _compile(charts: list) -> list:
+    """Serialise the static chart structure once, split around its placeholders."""
+    return _SLOT.split(json.dumps(charts))
+
+
+# Alternating [literal, slot name, literal, ...]; only the slots change per report
+_TEMPLATE = _compile([AGEING_CHART, SUBCATEGORY_STATUS_CHART])
+
+
+def build_charts_json(
+    ageing_data: list, subcategory_labels: list, resolved_counts: list, pending_counts: list, open_counts: list
+) -> str:
+    """
+    Build the Chart.js payload for the ageing and subcategory-status charts.
+    Args:
+        ageing_data: Incident counts for the 0-7, 8-14, 15-30 and 30+ day buckets
+        subcategory_labels: Subcategories shown in the status chart
+        resolved_counts: Resolved counts, one per subcategory label
+        pending_counts: Pending counts, one per subcategory label
+        open_counts: Open counts, one per subcategory label
+    Returns:
+        str: JSON array of both charts, identical to json.dumps of the full chart dicts
+    """
+    values = {
+        "ageing_data": ageing_data,
+        "subcategory_labels": subcategory_labels,
+        "resolved": resolved_counts,
+        "pending": pending_counts,
+        "open": open_counts,
+    }
+    parts = _TEMPLATE[:]
+    for i in range(1, len(parts), 2):
+        parts[i] = json.dumps(values[parts[i]])
+    return "".join(parts)
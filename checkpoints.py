@@ -0,0 +1,154 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Optional
+import structlog
+from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
+from psycopg import AsyncConnection
+import constants as c
+
+logger = structlog.get_logger()
+
+# Checkpoints beyond the newest %(keep)s of each (thread, namespace), and their pending writes.
+# checkpoint_id is a time-ordered uuid6, so its text order is creation order.
+_PRUNE_CHECKPOINTS = """
+    WITH ranked AS (
+        SELECT thread_id, checkpoint_ns, checkpoint_id,
+               row_number() OVER (
+                   PARTITION BY thread_id, checkpoint_ns ORDER BY checkpoint_id DESC
+               ) AS rank
+        FROM checkpoints
+    ), doomed AS (
+        SELECT thread_id, checkpoint_ns, checkpoint_id FROM ranked WHERE rank > %(keep)s
+    ), deleted_writes AS (
+        DELETE FROM checkpoint_writes w USING doomed d
+        WHERE w.thread_id = d.thread_id
+          AND w.checkpoint_ns = d.checkpoint_ns
+          AND w.checkpoint_id = d.checkpoint_id
+    )
+    DELETE FROM checkpoints cp USING doomed d
+    WHERE cp.thread_id = d.thread_id
+      AND cp.checkpoint_ns = d.checkpoint_ns
+      AND cp.checkpoint_id = d.checkpoint_id
+    RETURNING cp.thread_id
+"""
+
+# Channel values no remaining checkpoint points at, in the given threads only, so each
+# statement is an index range scan rather than an anti-join over the whole table. A blob
+# is only dropped once a checkpoint references a newer version of its channel, so blobs
+# written by a put whose checkpoint row has not landed yet are never touched.
+_PRUNE_BLOBS = """
+    DELETE FROM checkpoint_blobs b
+    WHERE b.thread_id = ANY(%(thread_ids)s)
+    AND NOT EXISTS (
+        SELECT 1 FROM checkpoints cp
+        WHERE cp.thread_id = b.thread_id
+          AND cp.checkpoint_ns = b.checkpoint_ns
+          AND cp.checkpoint -> 'channel_versions' ->> b.channel = b.version
+    )
+    AND EXISTS (
+        SELECT 1 FROM checkpoints cp
+        WHERE cp.thread_id = b.thread_id
+          AND cp.checkpoint_ns = b.checkpoint_ns
+          AND cp.checkpoint -> 'channel_versions' ->> b.channel > b.version
+    )
+"""
+
+# Threads whose newest root checkpoint is older than the cutoff (ISO timestamps compare as text)
+_IDLE_THREADS = """
+    SELECT thread_id FROM checkpoints
+    WHERE checkpoint_ns = ''
+    GROUP BY thread_id
+    HAVING max(checkpoint ->> 'ts') < %(cutoff)s
+"""
+
+# Threads whose orphaned blobs are deleted per statement, keeping each well inside DB_STATEMENT_TIMEOUT_MS
+BLOB_PRUNE_BATCH = 100
+
+_task: Optional[asyncio.Task] = None
+
+
+@asynccontextmanager
+async def _connection(saver: AsyncPostgresSaver) -> AsyncIterator[AsyncConnection]:
+    """A connection for maintenance queries that never interleaves with the saver's own."""
+    if isinstance(saver.conn, AsyncConnection):
+        async with saver.lock:
+            yield saver.conn
+    else:
+        async with saver.conn.connection() as conn:
+            yield conn
+
+
+async def prune(saver: AsyncPostgresSaver, keep_last: int, idle_ttl: float) -> dict:
+    """
+    Apply the checkpoint retention policy once.
+    Args:
+        saver: The agent's Postgres checkpointer
+        keep_last: Checkpoints kept per thread and namespace; the newest is always kept
+        idle_ttl: Seconds without a new checkpoint after which a whole thread is deleted
+    Returns:
+        dict: Rows deleted, per kind
+    """
+    started = time.perf_counter()
+    cutoff = (datetime.now(timezone.utc) - timedelta(seconds=idle_ttl)).isoformat()
+    async with _connection(saver) as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(_IDLE_THREADS, {"cutoff": cutoff})
+            idle = [row["thread_id"] if isinstance(row, dict) else row[0] for row in await cur.fetchall()]
+
+    for thread_id in idle:
+        await saver.adelete_thread(thread_id)
+
+    async with _connection(saver) as conn:
+        async with conn.transaction(), conn.cursor() as cur:
+            await cur.execute(_PRUNE_CHECKPOINTS, {"keep": max(keep_last, 1)})
+            pruned = [row["thread_id"] if isinstance(row, dict) else row[0] for row in await cur.fetchall()]
+    checkpoints = len(pruned)
+
+    # Only threads that just lost checkpoints can have new orphaned blobs
+    thread_ids = sorted(set(pruned))
+    blobs = 0
+    for start in range(0, len(thread_ids), BLOB_PRUNE_BATCH):
+        async with _connection(saver) as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(_PRUNE_BLOBS, {"thread_ids": thread_ids[start:start + BLOB_PRUNE_BATCH]})
+                blobs += cur.rowcount
+
+    result = {"idle_threads": len(idle), "checkpoints": checkpoints, "blobs": blobs}
+    logger.info(
+        "Checkpoints pruned",
+        **result,
+        latency_ms=round((time.perf_counter() - started) * 1000, 1),
+    )
+    return result
+
+
+async def _prune_forever(saver: AsyncPostgresSaver):
+    while True:
+        try:
+            await prune(saver, c.CHECKPOINT_KEEP_LAST, c.CHECKPOINT_IDLE_TTL)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error("Checkpoint pruning failed", error=str(e) or type(e).__name__)
+        await asyncio.sleep(c.CHECKPOINT_PRUNE_INTERVAL)
+
+
+def start_pruning(saver: AsyncPostgresSaver):
+    """Start the background retention task for `saver`."""
+    global _task
+    if _task is None:
+        _task = asyncio.create_task(_prune_forever(saver))
+
+
+async def stop_pruning():
+    """Cancel the background retention task."""
+    global _task
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+        _task = None
@@ -0,0 +1,160 @@
+import time
+import uuid
+from typing import Any, Optional
+import structlog
+from langchain.agents.middleware import AgentMiddleware, AgentState
+from langchain_core.messages import AnyMessage, HumanMessage, RemoveMessage, SystemMessage, ToolMessage
+from langchain_core.messages.utils import count_tokens_approximately, get_buffer_string
+from langgraph.graph.message import REMOVE_ALL_MESSAGES
+from langgraph.runtime import Runtime
+import constants as c
+import llm as l
+
+logger = structlog.get_logger()
+
+SUMMARY_PREFIX = "Here is a summary of the conversation to date:\n\n"
+SUMMARY_PROMPT = """You compact the history of an incident-resolution assistant's conversation.
+Summarise the conversation below so the assistant can carry on without it. Keep:
+- what the user asked for and any preferences or constraints they stated
+- incident numbers, categories, tags, date ranges and other identifiers exactly as written
+- figures and findings the assistant reported, and tools it used to get them
+- open questions and anything the assistant promised to do next
+Drop greetings, repetition and raw tool payloads. Write concise bullet points."""
+# Characters of each tool output kept in the transcript sent for summarisation
+TRANSCRIPT_TOOL_CHARS = 1500
+# Characters of a compacted tool output kept as a preview
+PREVIEW_CHARS = 300
+
+
+def _is_summary(message: AnyMessage) -> bool:
+    return isinstance(message, HumanMessage) and message.additional_kwargs.get("lc_source") == "summarization"
+
+
+def _current_turn_start(messages: list[AnyMessage]) -> int:
+    """Index of the latest user message; everything from there on belongs to the turn in progress."""
+    for index in range(len(messages) - 1, -1, -1):
+        if isinstance(messages[index], HumanMessage) and not _is_summary(messages[index]):
+            return index
+    return 0
+
+
+def compact_tool_outputs(messages: list[AnyMessage], max_chars: int) -> tuple[list[AnyMessage], int]:
+    """
+    Replace bulky tool outputs from earlier turns with a short reference.
+    Args:
+        messages: Conversation history
+        max_chars: Tool outputs longer than this are replaced
+    Returns:
+        tuple: (new message list, number of outputs replaced)
+    Note:
+        Outputs of the turn in progress are left alone; the model may still need them.
+    """
+    turn_start = _current_turn_start(messages)
+    compacted = []
+    replaced = 0
+    for index, message in enumerate(messages):
+        content = message.content if isinstance(message, ToolMessage) else None
+        if index < turn_start and isinstance(content, str) and len(content) > max_chars:
+            preview = " ".join(content[:PREVIEW_CHARS].split())
+            message = ToolMessage(
+                content=(
+                    f"[Compacted output of {message.name or 'tool'} ({len(content):,} chars); "
+                    f"call the tool again if the details are needed. Preview: {preview}…]"
+                ),
+                tool_call_id=message.tool_call_id,
+                name=message.name,
+                id=message.id,
+            )
+            replaced += 1
+        compacted.append(message)
+    return compacted, replaced
+
+
+def _split_point(messages: list[AnyMessage], keep_tokens: int) -> int:
+    """
+    Index splitting history into (summarised, kept) so that roughly `keep_tokens` are kept.
+    The kept part always starts at a user message, so no tool call is cut from its result.
+    """
+    kept_tokens = 0
+    split = len(messages)
+    for index in range(len(messages) - 1, -1, -1):
+        kept_tokens += count_tokens_approximately([messages[index]])
+        if kept_tokens > keep_tokens:
+            break
+        split = index
+    # Move back to the start of the turn the split falls in
+    while split > 0 and not (isinstance(messages[split], HumanMessage) and not _is_summary(messages[split])):
+        split -= 1
+    return split
+
+
+def _transcript(messages: list[AnyMessage]) -> str:
+    trimmed = []
+    for message in messages:
+        if isinstance(message, ToolMessage) and isinstance(message.content, str) and len(message.content) > TRANSCRIPT_TOOL_CHARS:
+            message = message.model_copy(update={"content": message.content[:TRANSCRIPT_TOOL_CHARS] + "…"})
+        trimmed.append(message)
+    return get_buffer_string(trimmed)
+
+
+async def summarise(messages: list[AnyMessage]) -> str:
+    """Summarise older turns with the cheaper MINI_MODEL."""
+    response = await l.get_model("MINI_MODEL").ainvoke(
+        [SystemMessage(SUMMARY_PROMPT), HumanMessage(_transcript(messages))]
+    )
+    return response.text
+
+
+class HistoryCompactionMiddleware(AgentMiddleware):
+    """
+    Keep long-lived threads under a token budget before every model call.
+
+    Once the history passes COMPACT_TRIGGER_TOKENS, tool outputs from earlier
+    turns longer than COMPACT_TOOL_OUTPUT_CHARS are first replaced with short
+    references. If that is not enough, turns older than the most recent
+    COMPACT_KEEP_TOKENS are summarised by MINI_MODEL into a single message,
+    which is itself folded into the next summary. The rewritten history is
+    saved to the thread, so each compaction is paid for once.
+    """
+
+    async def abefore_model(self, state: AgentState, runtime: Runtime) -> Optional[dict[str, Any]]:
+        messages = state["messages"]
+        tokens_before = count_tokens_approximately(messages)
+        if tokens_before <= c.COMPACT_TRIGGER_TOKENS:
+            logger.info("History tokens", tokens=tokens_before, messages=len(messages), compacted=False)
+            return None
+
+        started = time.perf_counter()
+        compacted, replaced = compact_tool_outputs(messages, c.COMPACT_TOOL_OUTPUT_CHARS)
+        summarised = 0
+        if count_tokens_approximately(compacted) > c.COMPACT_TRIGGER_TOKENS:
+            split = _split_point(compacted, c.COMPACT_KEEP_TOKENS)
+            if split > 0:
+                try:
+                    summary = await summarise(compacted[:split])
+                except Exception as e:
+                    logger.warning("History summarisation failed", error=str(e))
+                else:
+                    summary_message = HumanMessage(
+                        content=SUMMARY_PREFIX + summary,
+                        additional_kwargs={"lc_source": "summarization"},
+                        id=str(uuid.uuid4()),
+                    )
+                    summarised = split
+                    compacted = [summary_message, *compacted[split:]]
+
+        if not replaced and not summarised:
+            logger.info("History tokens", tokens=tokens_before, messages=len(messages), compacted=False)
+            return None
+        tokens_after = count_tokens_approximately(compacted)
+        logger.info(
+            "History compacted",
+            tokens_before=tokens_before,
+            tokens_after=tokens_after,
+            messages_before=len(messages),
+            messages_after=len(compacted),
+            tool_outputs_replaced=replaced,
+            messages_summarised=summarised,
+            latency_ms=round((time.perf_counter() - started) * 1000, 1),
+        )
+        return {"messages": [RemoveMessage(id=REMOVE_ALL_MESSAGES), *compacted]}
@@ -1,5 +1,3 @@
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_openai import OpenAIEmbeddings
 from dotenv import dotenv_values
 
 config = dotenv_values(".env")
@@ -9,3 +7,134 @@ URL = "https://aisera-api-uat.mydesktopnow.com"
 
 INGESTER_URL = "http://localhost:8000"
 CONNECTION_STRING = f"postgresql://{config['POSTGRES_USER']}:{config['POSTGRES_PASSWORD']}@{config['POSTGRES_HOST']}:{config['POSTGRES_PORT']}/{config['POSTGRES_DB']}"
+
+# Pooled HTTP client settings (see http_client.py)
+HTTP_POOL_LIMIT = int(config.get("HTTP_POOL_LIMIT") or 100)
+HTTP_POOL_LIMIT_PER_HOST = int(config.get("HTTP_POOL_LIMIT_PER_HOST") or 30)
+HTTP_DNS_CACHE_TTL = int(config.get("HTTP_DNS_CACHE_TTL") or 300)
+HTTP_KEEPALIVE_TIMEOUT = float(config.get("HTTP_KEEPALIVE_TIMEOUT") or 30)
+
+# Max categoriser queries in flight for count_all_incidents
+COUNT_CONCURRENCY = int(config.get("COUNT_CONCURRENCY") or 10)
+
+# Executor for CPU-heavy report aggregation: "thread" or "process"
+REPORT_EXECUTOR = (config.get("REPORT_EXECUTOR") or "thread").lower()
+REPORT_WORKERS = int(config.get("REPORT_WORKERS") or 4)
+# Incidents per aggregation batch, and batches allowed in flight, while streaming reports
+REPORT_BATCH_SIZE = int(config.get("REPORT_BATCH_SIZE") or 2000)
+REPORT_MAX_PENDING_BATCHES = int(config.get("REPORT_MAX_PENDING_BATCHES") or 2)
+
+# Distinct status keys memoised by status_classifier
+STATUS_CACHE_SIZE = int(config.get("STATUS_CACHE_SIZE") or 4096)
+# Distinct created days memoised by dates
+DATE_CACHE_SIZE = int(config.get("DATE_CACHE_SIZE") or 4096)
+
+# Categoriser result cache: seconds fresh, extra seconds served stale while refreshing, memory budget
+CATEGORISER_CACHE_TTL = float(config.get("CATEGORISER_CACHE_TTL") or 300)
+CATEGORISER_CACHE_STALE_TTL = float(config.get("CATEGORISER_CACHE_STALE_TTL") or 900)
+CATEGORISER_CACHE_MAX_BYTES = int(config.get("CATEGORISER_CACHE_MAX_BYTES") or 32 * 1024 * 1024)
+
+# Incident detail lookups (seconds / bytes); kept short as incidents change while being worked
+INCIDENT_CACHE_TTL = float(config.get("INCIDENT_CACHE_TTL") or 60)
+INCIDENT_CACHE_MAX_BYTES = int(config.get("INCIDENT_CACHE_MAX_BYTES") or 8 * 1024 * 1024)
+# Incidents per /getIncidentDetails request, and requests in flight, for batch lookups
+INCIDENT_BATCH_SIZE = int(config.get("INCIDENT_BATCH_SIZE") or 100)
+INCIDENT_DETAILS_CONCURRENCY = int(config.get("INCIDENT_DETAILS_CONCURRENCY") or 5)
+
+# Semantic SOP cache: minimum cosine similarity for a reuse, entries kept, seconds an entry stays valid
+SOP_CACHE_THRESHOLD = float(config.get("SOP_CACHE_THRESHOLD") or 0.9)
+SOP_CACHE_MAX_ENTRIES = int(config.get("SOP_CACHE_MAX_ENTRIES") or 1024)
+SOP_CACHE_TTL = float(config.get("SOP_CACHE_TTL") or 3600)
+
+# Local incident mirror (see mirror.py): "off" (default), "sqlite" or "postgres" (CONNECTION_STRING)
+MIRROR_BACKEND = (config.get("MIRROR_BACKEND") or "off").lower()
+MIRROR_SQLITE_PATH = config.get("MIRROR_SQLITE_PATH") or "data/incident_mirror.sqlite3"
+# Categoriser tag values to mirror; "all" is the untagged search, which already contains every tag
+MIRROR_TAGS = [tag.strip() for tag in (config.get("MIRROR_TAGS") or "horizon,AVD,ws1,citrix").split(",") if tag.strip()]
+# Seconds between syncs, and the oldest sync the tools will still answer from
+MIRROR_SYNC_INTERVAL = float(config.get("MIRROR_SYNC_INTERVAL") or 300)
+MIRROR_MAX_AGE = float(config.get("MIRROR_MAX_AGE") or 900)
+# Seconds between full re-reads of each tag, which pick up status edits to older incidents
+MIRROR_FULL_SYNC_INTERVAL = float(config.get("MIRROR_FULL_SYNC_INTERVAL") or 3600)
+MIRROR_SYNC_TIMEOUT = float(config.get("MIRROR_SYNC_TIMEOUT") or 600)
+MIRROR_FETCH_LIMIT = int(config.get("MIRROR_FETCH_LIMIT") or 100000)
+# Seconds before a tag whose pull hit MIRROR_FETCH_LIMIT is tried again
+MIRROR_TRUNCATED_BACKOFF = float(config.get("MIRROR_TRUNCATED_BACKOFF") or 21600)
+
+# internet_search: concurrent Tavily calls, cache TTL (seconds) and budget, characters kept per result
+SEARCH_CONCURRENCY = int(config.get("SEARCH_CONCURRENCY") or 4)
+SEARCH_CACHE_TTL = float(config.get("SEARCH_CACHE_TTL") or 900)
+SEARCH_CACHE_MAX_BYTES = int(config.get("SEARCH_CACHE_MAX_BYTES") or 8 * 1024 * 1024)
+SEARCH_CONTENT_CHARS = int(config.get("SEARCH_CONTENT_CHARS") or 1000)
+SEARCH_RAW_CONTENT_CHARS = int(config.get("SEARCH_RAW_CONTENT_CHARS") or 4000)
+
+# Route cheap agent steps to MINI_MODEL/NANO_MODEL (see routing.py); "off" keeps every call on LARGE_MODEL
+MODEL_ROUTING = (config.get("MODEL_ROUTING") or "on").lower() != "off"
+
+# Telegram updates processed at once across all chats (each chat stays sequential)
+BOT_CONCURRENT_UPDATES = int(config.get("BOT_CONCURRENT_UPDATES") or 32)
+# Stream progress into a placeholder message ("off" sends one reply at the end), and seconds between edits
+BOT_STREAMING = (config.get("BOT_STREAMING") or "on").lower() != "off"
+BOT_STREAM_EDIT_INTERVAL = float(config.get("BOT_STREAM_EDIT_INTERVAL") or 1.5)
+
+# Bot conversation checkpoints: "postgres" (CONNECTION_STRING, pruned in the background) or "memory"
+CHECKPOINTER = (config.get("CHECKPOINTER") or "postgres").lower()
+# Checkpoints kept per thread, seconds of inactivity before a thread is deleted, seconds between prunes
+CHECKPOINT_KEEP_LAST = int(config.get("CHECKPOINT_KEEP_LAST") or 20)
+CHECKPOINT_IDLE_TTL = float(config.get("CHECKPOINT_IDLE_TTL") or 30 * 24 * 3600)
+CHECKPOINT_PRUNE_INTERVAL = float(config.get("CHECKPOINT_PRUNE_INTERVAL") or 3600)
+
+# Conversation history compaction (compaction.HistoryCompactionMiddleware)
+COMPACT_TRIGGER_TOKENS = int(config.get("COMPACT_TRIGGER_TOKENS") or 24000)
+COMPACT_KEEP_TOKENS = int(config.get("COMPACT_KEEP_TOKENS") or 8000)
+COMPACT_TOOL_OUTPUT_CHARS = int(config.get("COMPACT_TOOL_OUTPUT_CHARS") or 2000)
+
+# Shared Postgres connection pool (db.open_pool) for the memory store and checkpointer
+DB_POOL_MIN_SIZE = int(config.get("DB_POOL_MIN_SIZE") or 2)
+DB_POOL_MAX_SIZE = int(config.get("DB_POOL_MAX_SIZE") or 20)
+DB_POOL_TIMEOUT = float(config.get("DB_POOL_TIMEOUT") or 30)
+DB_POOL_MAX_IDLE = float(config.get("DB_POOL_MAX_IDLE") or 600)
+DB_POOL_MAX_LIFETIME = float(config.get("DB_POOL_MAX_LIFETIME") or 3600)
+DB_STATEMENT_TIMEOUT_MS = int(config.get("DB_STATEMENT_TIMEOUT_MS") or 30000)
+
+# Per-user /memories/ files (memories.file_cache); injected into every turn unless MEMORY_INJECTION=off
+MEMORY_CACHE_TTL = float(config.get("MEMORY_CACHE_TTL") or 600)
+MEMORY_CACHE_MAX_BYTES = int(config.get("MEMORY_CACHE_MAX_BYTES") or 16 * 1024 * 1024)
+MEMORY_INJECTION = (config.get("MEMORY_INJECTION") or "on").lower() != "off"
+
+# Incident tool output projection (projection.project_incident); INCIDENT_PROJECTION=off returns full records.
+# Detail fields are used by get_incident_details_by_incident_number, the shorter summary fields by the batch tool.
+INCIDENT_PROJECTION = (config.get("INCIDENT_PROJECTION") or "on").lower() != "off"
+INCIDENT_DETAIL_FIELDS = [field.strip() for field in (
+    config.get("INCIDENT_DETAIL_FIELDS")
+    or "incidentNumber,shortDescription,description,clientName,productType,priority,category,subCategory,"
+    "stage,issueStatus,statusDetails,assignedTo,createdDate,updatedDate,resolvedDate,resolutionNote"
+).split(",") if field.strip()]
+INCIDENT_SUMMARY_FIELDS = [field.strip() for field in (
+    config.get("INCIDENT_SUMMARY_FIELDS")
+    or "incidentNumber,shortDescription,clientName,productType,priority,stage,issueStatus,assignedTo,createdDate"
+).split(",") if field.strip()]
+INCIDENT_TEXT_CHARS = int(config.get("INCIDENT_TEXT_CHARS") or 500)
+INCIDENT_LIST_ITEMS = int(config.get("INCIDENT_LIST_ITEMS") or 5)
+
+# Client-side request scheduler for the chat deployments (scheduler.py), off unless enabled. The per-deployment
+# quotas are starting budgets; each response's x-ratelimit-limit-* headers replace them with the real ones
+SCHEDULER = (config.get("SCHEDULER") or "off").lower() != "off"
+LARGE_MODEL_RPM = int(config.get("LARGE_MODEL_RPM") or 300)
+LARGE_MODEL_TPM = int(config.get("LARGE_MODEL_TPM") or 50000)
+MINI_MODEL_RPM = int(config.get("MINI_MODEL_RPM") or 600)
+MINI_MODEL_TPM = int(config.get("MINI_MODEL_TPM") or 100000)
+NANO_MODEL_RPM = int(config.get("NANO_MODEL_RPM") or 600)
+NANO_MODEL_TPM = int(config.get("NANO_MODEL_TPM") or 100000)
+# Tokens reserved for each call's output until its real usage is known
+SCHEDULER_OUTPUT_TOKENS = int(config.get("SCHEDULER_OUTPUT_TOKENS") or 1000)
+# Seconds to pause a deployment after a 429 that carries no retry-after header
+SCHEDULER_DEFAULT_BACKOFF = float(config.get("SCHEDULER_DEFAULT_BACKOFF") or 10)
+
+# Models (llm.MODEL_NAMES) the bot builds in the background at startup, comma separated, or "off". The SOP
+# cache's embedding model takes seconds to load, so by default it is built before the first get_sop_for_issue
+LLM_PREWARM = [
+    name.strip()
+    for name in (config.get("LLM_PREWARM") or "HF_EMBEDDING_MODEL").split(",")
+    if name.strip() and name.strip().lower() != "off"
+]
@@ -0,0 +1,90 @@
+from datetime import date, datetime
+from functools import lru_cache
+import numpy as np
+import constants as c
+
+# Day ordinal for missing or unparseable dates; ageing treats these as 0 days old
+UNKNOWN_DAY = -1
+SECONDS_PER_DAY = 86400
+MAX_DAY = date.max.toordinal()
+
+
+@lru_cache(maxsize=c.DATE_CACHE_SIZE)
+def _prefix_ordinal(prefix: str) -> int:
+    """Ordinal of a "YYYY-MM-DD" prefix; thousands of incidents share each calendar day."""
+    try:
+        return date(int(prefix[0:4]), int(prefix[5:7]), int(prefix[8:10])).toordinal()
+    except ValueError:
+        return UNKNOWN_DAY
+
+
+def _slow_ordinal(value: str) -> int:
+    """Ordinal of a string without a "YYYY-MM-DD" prefix, e.g. compact ISO or unpadded dates."""
+    try:
+        if "T" in value:
+            # Try full ISO parsing
+            return datetime.fromisoformat(value.replace("Z", "+00:00").split(".")[0]).toordinal()
+        if len(value) >= 10:
+            return datetime.strptime(value.split()[0], "%Y-%m-%d").toordinal()
+    except (ValueError, IndexError):
+        pass
+    return UNKNOWN_DAY
+
+
+def day_ordinal(value, now: datetime) -> int:
+    """
+    Normalise a created-date value to an integer day ordinal.
+    Args:
+        value: A Unix timestamp, or a string such as "2025-07-21T10:27:57.93Z" or "2025-07-21 10:27:57"
+        now: Reference time; a timestamp maps to the day that gives the same whole-day age as `now - value`
+    Returns:
+        int: date.toordinal() of the created day, or UNKNOWN_DAY if it cannot be parsed
+    """
+    if not value:
+        return UNKNOWN_DAY
+    if isinstance(value, str):
+        if len(value) >= 10 and value[4] == "-" and value[7] == "-":
+            return _prefix_ordinal(value[:10])
+        return _slow_ordinal(value)
+    if isinstance(value, (int, float)):
+        try:
+            age = (now - datetime.fromtimestamp(value)).days
+        except (ValueError, OverflowError, OSError):
+            return UNKNOWN_DAY
+        return now.toordinal() - age
+    return UNKNOWN_DAY
+
+
+def day_ordinals(values: list, now: datetime) -> np.ndarray:
+    """
+    Normalise a whole column of created-date values at once.
+    Args:
+        values: Created-date values, as accepted by day_ordinal; None for missing
+        now: Reference time, see day_ordinal
+    Returns:
+        np.ndarray: int32 day ordinals, UNKNOWN_DAY where missing or unparseable
+    """
+    ordinals = np.full(len(values), UNKNOWN_DAY, dtype=np.int32)
+    timestamp_rows, timestamps = [], []
+    for row, value in enumerate(values):
+        if isinstance(value, str):
+            if len(value) >= 10 and value[4] == "-" and value[7] == "-":
+                ordinals[row] = _prefix_ordinal(value[:10])
+            else:
+                ordinals[row] = _slow_ordinal(value)
+        elif isinstance(value, (int, float)) and value:
+            timestamp_rows.append(row)
+            timestamps.append(value)
+
+    if timestamps:
+        # Whole days elapsed between each timestamp and now, as (now - created).days would give
+        ages = np.floor((now.timestamp() - np.array(timestamps, dtype=np.float64)) / SECONDS_PER_DAY)
+        days = now.toordinal() - ages
+        valid = np.isfinite(days) & (days >= 1) & (days <= MAX_DAY)
+        ordinals[np.array(timestamp_rows)[valid]] = days[valid].astype(np.int32)
+    return ordinals
+
+
+def days_old(ordinals: np.ndarray, today: int) -> np.ndarray:
+    """Age in whole days of every day ordinal, with unknown days counted as 0 (recent)."""
+    return np.where(ordinals == UNKNOWN_DAY, 0, today - ordinals)
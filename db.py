@@ -0,0 +1,140 @@
+import time
+from typing import Optional
+import structlog
+from psycopg import AsyncCursor
+from psycopg.rows import dict_row
+from psycopg_pool import AsyncConnectionPool
+import constants as c
+
+logger = structlog.get_logger()
+
+_pool: Optional[AsyncConnectionPool] = None
+
+
+class QueryStats:
+    """Statement count and latency totals across every pooled connection."""
+
+    def __init__(self):
+        self.queries = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, elapsed_ms: float, failed: bool):
+        self.queries += 1
+        self.errors += failed
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+
+    def as_dict(self) -> dict:
+        return {
+            "queries": self.queries,
+            "errors": self.errors,
+            "avg_query_ms": round(self.total_ms / self.queries, 1) if self.queries else 0.0,
+            "max_query_ms": round(self.max_ms, 1),
+        }
+
+
+_query_stats = QueryStats()
+
+
+class TimedCursor(AsyncCursor):
+    """
+    A cursor that records how long each statement takes.
+    Note:
+        Inside a pipeline execute() only queues the statement, so pipelined
+        batches (the store's put/get batches) count as near-zero latency.
+    """
+
+    async def execute(self, *args, **kwargs):
+        started = time.perf_counter()
+        failed = True
+        try:
+            result = await super().execute(*args, **kwargs)
+            failed = False
+            return result
+        finally:
+            _query_stats.record((time.perf_counter() - started) * 1000, failed)
+
+    async def executemany(self, *args, **kwargs):
+        started = time.perf_counter()
+        failed = True
+        try:
+            await super().executemany(*args, **kwargs)
+            failed = False
+        finally:
+            _query_stats.record((time.perf_counter() - started) * 1000, failed)
+
+
+async def open_pool() -> AsyncConnectionPool:
+    """
+    Open the shared Postgres connection pool.
+    Returns:
+        AsyncConnectionPool: The pool, opened on first call and reused afterwards
+    Note:
+        Connections are configured the way AsyncPostgresStore and
+        AsyncPostgresSaver expect (autocommit, dict rows, no prepared
+        statements), so both can be built directly on the pool.
+    """
+    global _pool
+    if _pool is None:
+        _pool = AsyncConnectionPool(
+            c.CONNECTION_STRING,
+            min_size=c.DB_POOL_MIN_SIZE,
+            max_size=c.DB_POOL_MAX_SIZE,
+            timeout=c.DB_POOL_TIMEOUT,
+            max_idle=c.DB_POOL_MAX_IDLE,
+            max_lifetime=c.DB_POOL_MAX_LIFETIME,
+            # Ping each connection as it is handed out, replacing it if the server dropped it
+            check=AsyncConnectionPool.check_connection,
+            kwargs={
+                "autocommit": True,
+                "prepare_threshold": 0,
+                "row_factory": dict_row,
+                "cursor_factory": TimedCursor,
+                "options": f"-c statement_timeout={c.DB_STATEMENT_TIMEOUT_MS}",
+            },
+            name="deepagent",
+            open=False,
+        )
+        try:
+            await _pool.open(wait=True, timeout=c.DB_POOL_TIMEOUT)
+        except Exception:
+            await _pool.close()
+            _pool = None
+            raise
+        logger.info(
+            "Postgres pool opened",
+            min_size=c.DB_POOL_MIN_SIZE,
+            max_size=c.DB_POOL_MAX_SIZE,
+            statement_timeout_ms=c.DB_STATEMENT_TIMEOUT_MS,
+        )
+    return _pool
+
+
+def stats() -> dict:
+    """Current pool occupancy, waits for a connection, and statement latency since the pool opened."""
+    if _pool is None:
+        return {}
+    pool_stats = _pool.get_stats()
+    requests = pool_stats.get("requests_num", 0)
+    return {
+        "pool_size": pool_stats.get("pool_size", 0),
+        "pool_available": pool_stats.get("pool_available", 0),
+        "requests_waiting": pool_stats.get("requests_waiting", 0),
+        "requests": requests,
+        "requests_queued": pool_stats.get("requests_queued", 0),
+        "requests_errors": pool_stats.get("requests_errors", 0),
+        "avg_wait_ms": round(pool_stats.get("requests_wait_ms", 0) / requests, 1) if requests else 0.0,
+        "connections_lost": pool_stats.get("connections_lost", 0),
+        **_query_stats.as_dict(),
+    }
+
+
+async def close_pool():
+    """Close the shared pool and every connection in it."""
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+        logger.info("Postgres pool closed")
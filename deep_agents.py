@@ -1,12 +1,28 @@
-from datetime import datetime
+from typing import Optional
 from deepagents import create_deep_agent
 from deepagents.graph import CompiledStateGraph
 import tools as t
 import models as m
 import llm as l
-from deepagents.backends import StateBackend, CompositeBackend, StoreBackend
+import routing
+import compaction
+import constants as c
+import memories
+import prompts
+from deepagents.backends import StateBackend, CompositeBackend
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.checkpoint.memory import MemorySaver
 
+# agent_prompt must stay free of per-turn values (dates, names, memory) so the prompt prefix is byte-stable and
+# cacheable; prompts.TurnContextMiddleware appends those at the end. With memory injection the files' current
+# contents are part of that tail, so no read_file calls are needed
+if c.MEMORY_INJECTION:
+    _MEMORY_READING = "Their current contents are included at the end of this prompt under **Current Memory Files**; follow them. Do not read these files with read_file."
+    _MEMORY_BEFORE_EDIT = "Use the current contents shown at the end of this prompt; create the file with write_file if it does not exist yet."
+else:
+    _MEMORY_READING = "Read this file at the start of conversations to understand user preferences."
+    _MEMORY_BEFORE_EDIT = "always read the file before editing it."
+
 agent_prompt = f"""
 # Deep Agent - Incident Resolution (Production-Ready)
 
@@ -29,6 +45,7 @@ Do **not** answer from general knowledge if a tool can provide the information.
 
 - **internet_search** – Use when external or up-to-date information is required.  
 - **get_incident_details_by_incident_number** – Retrieve details of a single incident. ⚠ Only include *tag* if the user explicitly asks.  
+- **get_incident_details_by_incident_numbers** – Retrieve details of several incidents in one call. Use this whenever the user mentions more than one incident number.  
 - **count_all_incidents** – Count incidents grouped by category.  
 - **get_sop_for_issue** – Retrieve official SOPs for an issue.  
 - **get_incidents_by_category** – Retrieve incidents by category within a date range.  
@@ -37,7 +54,7 @@ Do **not** answer from general knowledge if a tool can provide the information.
 
 ## Date Awareness
 
-Today's date is: `{datetime.now().strftime("%Y-%m-%d")}`  
+Today's date is given under **Current Context** at the end of this prompt.
 
 Resolve relative dates (e.g., "last week") to explicit date ranges before calling tools.
 
@@ -54,10 +71,10 @@ Memory paths:
 
 You have a file at /memories/instructions.txt, /memories/user_preferences.txt, /memories/profile.txt with additional instructions and preferences.
 
-Read this file at the start of conversations to understand user preferences.
+{_MEMORY_READING}
 
 When users provide feedback like "please always do X" or "I prefer Y",
-update /memories/instructions.txt using the edit_file tool. always read the file before editing it. Always update the file with the key value pairs for easier retrieval.
+update /memories/instructions.txt using the edit_file tool. {_MEMORY_BEFORE_EDIT} Always update the file with the key value pairs for easier retrieval.
 
 ### Storing Personal Information
 If the user shares long-term personal information (name, job role, team, location, contact preferences), store them as key value pairs in:
@@ -86,7 +103,16 @@ using the `edit_file` tool.
 """
 
 
-def create_agent(vector_store) -> CompiledStateGraph:
+def create_agent(vector_store, checkpointer: Optional[BaseCheckpointSaver] = None) -> CompiledStateGraph:
+    """
+    Build the incident resolution deep agent.
+    Args:
+        vector_store: LangGraph store backing the /memories/ files
+        checkpointer: Conversation checkpointer; defaults to an in-process MemorySaver,
+            which keeps every thread's history until the process exits
+    Returns:
+        CompiledStateGraph: The agent
+    """
     llm = l.LARGE_MODEL
 
     # Create a proper LangGraph memory store (not a vector store)
@@ -96,23 +122,30 @@ def create_agent(vector_store) -> CompiledStateGraph:
         return CompositeBackend(
             default=StateBackend(runtime),
             routes={
-                "/memories/": StoreBackend(
+                "/memories/": memories.CachedStoreBackend(
                     runtime,
                 )
             }
         )
 
-    checkpointer = MemorySaver()
+    if checkpointer is None:
+        checkpointer = MemorySaver()
     agent = create_deep_agent(
         model=llm,
         tools=[
             t.internet_search,
             t.get_incident_details_by_incident_number,
+            t.get_incident_details_by_incident_numbers,
             t.count_all_incidents,
             t.get_sop_for_issue,
             t.get_incidents_by_category,
         ],
         system_prompt=agent_prompt,
+        middleware=[
+            compaction.HistoryCompactionMiddleware(),
+            prompts.TurnContextMiddleware(),
+            routing.ModelRoutingMiddleware(),
+        ],
         backend=make_backend,
         checkpointer=checkpointer,
         store=vector_store,
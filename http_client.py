@@ -0,0 +1,51 @@
+import aiohttp
+import structlog
+import constants as c
+
+logger = structlog.get_logger()
+
+# One keep-alive session (and connection pool) per upstream host
+_sessions: dict[str, aiohttp.ClientSession] = {}
+
+
+def _new_session() -> aiohttp.ClientSession:
+    connector = aiohttp.TCPConnector(
+        limit=c.HTTP_POOL_LIMIT,
+        limit_per_host=c.HTTP_POOL_LIMIT_PER_HOST,
+        ttl_dns_cache=c.HTTP_DNS_CACHE_TTL,
+        keepalive_timeout=c.HTTP_KEEPALIVE_TIMEOUT,
+    )
+    return aiohttp.ClientSession(connector=connector)
+
+
+def get_session(base_url: str) -> aiohttp.ClientSession:
+    """
+    Get the shared client session for an upstream host.
+    Args:
+        base_url: The base URL of the upstream, e.g. constants.URL or constants.INGESTER_URL
+    Returns:
+        aiohttp.ClientSession: A pooled session, created lazily if startup() was not called
+    Note:
+        Callers must not close the returned session; use shutdown() instead.
+    """
+    session = _sessions.get(base_url)
+    if session is None or session.closed:
+        session = _new_session()
+        _sessions[base_url] = session
+    return session
+
+
+async def startup():
+    """Open the pooled sessions for the incident API and the ingester."""
+    for base_url in (c.URL, c.INGESTER_URL):
+        get_session(base_url)
+    logger.info("HTTP client pools opened", hosts=list(_sessions))
+
+
+async def shutdown():
+    """Close every pooled session and release their connections."""
+    sessions = list(_sessions.values())
+    _sessions.clear()
+    for session in sessions:
+        await session.close()
+    logger.info("HTTP client pools closed")
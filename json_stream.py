@@ -0,0 +1,109 @@
+import codecs
+import json
+import re
+from typing import Any, AsyncIterator
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_DELIMITERS = frozenset(" \t\n\r,]")
+_DECODER = json.JSONDecoder()
+CHUNK_SIZE = 64 * 1024
+
+
+class NotAJSONArray(ValueError):
+    """Raised when the streamed document is not a top-level JSON array."""
+
+    def __init__(self, value: Any):
+        super().__init__("Expected a top-level JSON array")
+        self.value = value
+
+
+async def iter_array_items(chunks: AsyncIterator[bytes]) -> AsyncIterator[Any]:
+    """
+    Parse a top-level JSON array item by item from a byte stream.
+    Args:
+        chunks: Async iterator of raw bytes, e.g. aiohttp `resp.content.iter_chunked(n)`
+    Yields:
+        Each decoded array element as soon as it has fully arrived
+    Raises:
+        NotAJSONArray: If the document is not an array; `.value` holds the decoded document
+        json.JSONDecodeError: If the stream is malformed or truncated
+    Note:
+        Only the item currently being received is buffered, so memory stays
+        bounded by the largest single item rather than the whole response.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    buf = ""
+    pos = 0
+    state = "start"
+    eof = False
+    chunk_iter = chunks.__aiter__()
+
+    while True:
+        progressed = True
+        while progressed:
+            progressed = False
+            pos = _WHITESPACE.match(buf, pos).end()
+            if pos >= len(buf):
+                break
+            if state == "start":
+                if buf[pos] != "[":
+                    state = "document"
+                    break
+                pos += 1
+                state = "first"
+                progressed = True
+            elif state in ("first", "item"):
+                if state == "first" and buf[pos] == "]":
+                    return
+                try:
+                    item, end = _DECODER.raw_decode(buf, pos)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                    break
+                # A number cut at the buffer edge may still be growing
+                if not eof and (end >= len(buf) or buf[end] not in _DELIMITERS):
+                    break
+                pos = end
+                state = "separator"
+                progressed = True
+                yield item
+            elif state == "separator":
+                if buf[pos] == "]":
+                    return
+                if buf[pos] != ",":
+                    raise json.JSONDecodeError("Expected ',' or ']'", buf, pos)
+                pos += 1
+                state = "item"
+                progressed = True
+
+        if eof:
+            if state == "document":
+                raise NotAJSONArray(json.loads(buf[pos:]))
+            raise json.JSONDecodeError("Unexpected end of JSON array", buf, pos)
+
+        if state != "document" and pos:
+            buf = buf[pos:]
+            pos = 0
+        try:
+            chunk = await chunk_iter.__anext__()
+            buf += decoder.decode(chunk)
+        except StopAsyncIteration:
+            buf += decoder.decode(b"", final=True)
+            eof = True
+
+
+async def count_array_items(chunks: AsyncIterator[bytes]) -> int:
+    """
+    Count the elements of a streamed top-level JSON array, discarding each one.
+    Args:
+        chunks: Async iterator of raw bytes
+    Returns:
+        int: Number of elements
+    Raises:
+        NotAJSONArray: If the document is not an array, e.g. an upstream `{"error": ...}` body
+    """
+    count = 0
+    async for _ in iter_array_items(chunks):
+        count += 1
+    return count
@@ -1,5 +1,5 @@
 import llm as l
-import constants as c
+import db
 from langchain_postgres.v2.async_vectorstore import AsyncPGVectorStore
 from langgraph.store.postgres.aio import AsyncPostgresStore
 from langchain_postgres.v2.engine import PGEngine
@@ -43,5 +43,5 @@ async def create_vector_store():
     #     )
     # else:
     #     logger.info("Table already exists, skipping initialization")
-    store_ctx = AsyncPostgresStore.from_conn_string(c.CONNECTION_STRING)
-    return store_ctx
\ No newline at end of file
+    # Built on the shared pool (db.open_pool); close it with db.close_pool()
+    return AsyncPostgresStore(await db.open_pool())
\ No newline at end of file
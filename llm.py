@@ -1,38 +1,122 @@
+import asyncio
+import threading
+from typing import Any, Callable
+import structlog
 import constants as c
-from langchain_openai import AzureChatOpenAI
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_openai import AzureOpenAIEmbeddings
-
-LARGE_MODEL = AzureChatOpenAI(
-    model="gpt-4o-2024-11-20",
-    api_key=c.config["OPENAI_API_KEY_AGENTIC"],
-    azure_endpoint="https://agentic-ai-euv.openai.azure.com/openai/deployments/gpt-4o/chat/completions?api-version=2025-01-01-preview",
-    azure_deployment="Agentic-AI-EuV",
-    api_version="2025-01-01-preview",
-)
-
-MINI_MODEL = AzureChatOpenAI(
-    model="gpt-5-mini",
-    api_key=c.config["OPENAI_API_KEY_ADMIN"],
-    azure_endpoint="https://admin-4780-resource.cognitiveservices.azure.com/openai/deployments/gpt-5-mini/chat/completions?api-version=2025-01-01-preview",
-    azure_deployment="admin-4780-resource",
-    api_version="2025-01-01-preview",
-)
-
-NANO_MODEL = AzureChatOpenAI(
-    model="gpt-5-nano",
-    api_key=c.config["OPENAI_API_KEY_ADMIN"],
-    azure_endpoint="https://admin-4780-resource.cognitiveservices.azure.com/openai/deployments/gpt-5-nano/chat/completions?api-version=2025-01-01-preview",
-    azure_deployment="admin-4780-resource",
-    api_version="2025-01-01-preview",
-)
-
-HF_EMBEDDING_MODEL = HuggingFaceEmbeddings(
-    model_name="sentence-transformers/all-MiniLM-L6-v2",
-    encode_kwargs={"normalize_embeddings": True},
-)
-OPENAI_EMBEDDING_MODEL = AzureOpenAIEmbeddings(
-    model="text-embedding-3-small",
-    api_key=c.config["OPENAI_API_KEY_AGENTIC"],
-    azure_endpoint="https://agentic-ai-euv.openai.azure.com/",
-)
\ No newline at end of file
+
+logger = structlog.get_logger()
+
+
+def _large_model():
+    from langchain_openai import AzureChatOpenAI
+    import scheduler
+    return AzureChatOpenAI(
+        model="gpt-4o-2024-11-20",
+        api_key=c.config["OPENAI_API_KEY_AGENTIC"],
+        azure_endpoint="https://agentic-ai-euv.openai.azure.com/openai/deployments/gpt-4o/chat/completions?api-version=2025-01-01-preview",
+        azure_deployment="Agentic-AI-EuV",
+        api_version="2025-01-01-preview",
+        **scheduler.model_kwargs("LARGE_MODEL"),
+    )
+
+
+def _mini_model():
+    from langchain_openai import AzureChatOpenAI
+    import scheduler
+    return AzureChatOpenAI(
+        model="gpt-5-mini",
+        api_key=c.config["OPENAI_API_KEY_ADMIN"],
+        azure_endpoint="https://admin-4780-resource.cognitiveservices.azure.com/openai/deployments/gpt-5-mini/chat/completions?api-version=2025-01-01-preview",
+        azure_deployment="admin-4780-resource",
+        api_version="2025-01-01-preview",
+        **scheduler.model_kwargs("MINI_MODEL"),
+    )
+
+
+def _nano_model():
+    from langchain_openai import AzureChatOpenAI
+    import scheduler
+    return AzureChatOpenAI(
+        model="gpt-5-nano",
+        api_key=c.config["OPENAI_API_KEY_ADMIN"],
+        azure_endpoint="https://admin-4780-resource.cognitiveservices.azure.com/openai/deployments/gpt-5-nano/chat/completions?api-version=2025-01-01-preview",
+        azure_deployment="admin-4780-resource",
+        api_version="2025-01-01-preview",
+        **scheduler.model_kwargs("NANO_MODEL"),
+    )
+
+
+def _hf_embedding_model():
+    from langchain_huggingface import HuggingFaceEmbeddings
+    return HuggingFaceEmbeddings(
+        model_name="sentence-transformers/all-MiniLM-L6-v2",
+        encode_kwargs={"normalize_embeddings": True},
+    )
+
+
+def _openai_embedding_model():
+    from langchain_openai import AzureOpenAIEmbeddings
+    return AzureOpenAIEmbeddings(
+        model="text-embedding-3-small",
+        api_key=c.config["OPENAI_API_KEY_AGENTIC"],
+        azure_endpoint="https://agentic-ai-euv.openai.azure.com/",
+    )
+
+
+# Models are built on first use, not at import, so importing this module no longer
+# pulls in langchain_openai, sentence-transformers or PyTorch. `llm.LARGE_MODEL`
+# still works: module __getattr__ builds the model once and then reuses it.
+_FACTORIES: dict[str, Callable[[], Any]] = {
+    "LARGE_MODEL": _large_model,
+    "MINI_MODEL": _mini_model,
+    "NANO_MODEL": _nano_model,
+    "HF_EMBEDDING_MODEL": _hf_embedding_model,
+    "OPENAI_EMBEDDING_MODEL": _openai_embedding_model,
+}
+MODEL_NAMES = tuple(_FACTORIES)
+
+_models: dict[str, Any] = {}
+# One lock per model, so loading the embedding model never holds up a chat model
+_locks = {name: threading.Lock() for name in _FACTORIES}
+
+
+def get_model(name: str) -> Any:
+    """
+    Get a model by name, building it on first use.
+    Args:
+        name: One of MODEL_NAMES, e.g. "LARGE_MODEL"
+    Returns:
+        The shared model instance
+    Note:
+        Safe to call from several threads; each model is built exactly once.
+        Building HF_EMBEDDING_MODEL loads PyTorch and takes seconds, so call
+        it off the event loop (asyncio.to_thread) or prewarm() it.
+    """
+    model = _models.get(name)
+    if model is not None:
+        return model
+    if name not in _FACTORIES:
+        raise KeyError(f"Unknown model {name!r}; expected one of {MODEL_NAMES}")
+    with _locks[name]:
+        model = _models.get(name)
+        if model is None:
+            model = _FACTORIES[name]()
+            _models[name] = model
+            logger.info("Model loaded", model=name)
+    return model
+
+
+async def prewarm(*names: str):
+    """Build the given models on worker threads, e.g. as a background task at startup."""
+    results = await asyncio.gather(
+        *(asyncio.to_thread(get_model, name) for name in names), return_exceptions=True
+    )
+    for name, result in zip(names, results):
+        if isinstance(result, Exception):
+            logger.warning("Model prewarm failed", model=name, error=str(result))
+
+
+def __getattr__(name: str) -> Any:
+    if name in _FACTORIES:
+        return get_model(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
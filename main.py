@@ -2,31 +2,42 @@ from deep_agents import create_agent
 import asyncio
 from kb import create_vector_store
 from loguru import logger
+import db
+import http_client
+import workers
 
 
 async def main():
     store = await create_vector_store()
-    async with store as store:
+    try:
         await store.setup()
         agent = create_agent(store)
 
+        await http_client.startup()
+
         # Print the agent's response
         logger.info("Agent started")
-        while True:
-            user_input = input("Enter your prompt: ")
-            print("-" * 50)
-            print()
-            if user_input == "exit" or user_input == "quit":
-                break
-
-            result = await agent.ainvoke(
-                {"messages": [{"role": "user", "content": user_input}]},
-                config={"configurable": {"thread_id": "123456", "assistant_id": "123451"}},
-            )
-            logger.info(f"Agent response: {result}")
-            print(result["structured_response"]["response"])
-            print("-" * 50)
-            print()
+        try:
+            while True:
+                user_input = input("Enter your prompt: ")
+                print("-" * 50)
+                print()
+                if user_input == "exit" or user_input == "quit":
+                    break
+
+                result = await agent.ainvoke(
+                    {"messages": [{"role": "user", "content": user_input}]},
+                    config={"configurable": {"thread_id": "123456", "assistant_id": "123451"}},
+                )
+                logger.info(f"Agent response: {result}")
+                print(result["structured_response"]["response"])
+                print("-" * 50)
+                print()
+        finally:
+            await http_client.shutdown()
+            workers.shutdown()
+    finally:
+        await db.close_pool()
 
 
 if __name__ == "__main__":
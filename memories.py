@@ -0,0 +1,118 @@
+import asyncio
+import json
+from datetime import datetime, timezone
+from typing import Any, Optional
+import structlog
+from deepagents.backends import StoreBackend
+from langgraph.config import get_config
+from langgraph.store.base import BaseStore, Item
+import cache
+import constants as c
+
+logger = structlog.get_logger()
+
+# Route of the per-user memory files, and the files injected into every turn (prompts.TurnContextMiddleware)
+MEMORY_ROUTE = "/memories/"
+MEMORY_FILES = ("/instructions.txt", "/user_preferences.txt", "/profile.txt")
+NAMESPACE = "filesystem"
+
+
+def _item_size(item: Optional[Item]) -> int:
+    return len(json.dumps(item.value, default=str)) if item is not None else 0
+
+
+# (namespace, key) -> Item, or None for a file that does not exist
+file_cache = cache.TTLCache(
+    "memories",
+    ttl=c.MEMORY_CACHE_TTL,
+    max_bytes=c.MEMORY_CACHE_MAX_BYTES,
+    sizeof=_item_size,
+)
+
+
+class WriteThroughStore:
+    """
+    A store wrapper that serves memory file reads from `file_cache`.
+
+    Writes go to the underlying store first and then replace the cached
+    entry, so this process always reads its own writes. Writes made by other
+    processes become visible once the entry's MEMORY_CACHE_TTL runs out.
+    Everything else (search, listing) is passed straight through.
+    """
+
+    def __init__(self, store: BaseStore):
+        self._store = store
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._store, name)
+
+    async def aget(self, namespace: tuple[str, ...], key: str, **kwargs) -> Optional[Item]:
+        if kwargs:
+            return await self._store.aget(namespace, key, **kwargs)
+        return await file_cache.get_or_load((namespace, key), lambda: self._store.aget(namespace, key))
+
+    async def aput(self, namespace: tuple[str, ...], key: str, value: dict[str, Any], *args, **kwargs):
+        cache_key = (namespace, key)
+        # Drop the entry and any load in flight first, so a read racing this write can't cache the old value
+        file_cache.invalidate(cache_key)
+        await self._store.aput(namespace, key, value, *args, **kwargs)
+        now = datetime.now(timezone.utc)
+        file_cache.set(cache_key, Item(value=value, key=key, namespace=namespace, created_at=now, updated_at=now))
+
+    async def adelete(self, namespace: tuple[str, ...], key: str):
+        file_cache.invalidate((namespace, key))
+        await self._store.adelete(namespace, key)
+        file_cache.set((namespace, key), None)
+
+    def put(self, namespace: tuple[str, ...], key: str, value: dict[str, Any], *args, **kwargs):
+        self._store.put(namespace, key, value, *args, **kwargs)
+        file_cache.invalidate((namespace, key))
+
+    def delete(self, namespace: tuple[str, ...], key: str):
+        self._store.delete(namespace, key)
+        file_cache.invalidate((namespace, key))
+
+
+class CachedStoreBackend(StoreBackend):
+    """StoreBackend for the /memories/ route whose store reads go through the write-through cache."""
+
+    def _get_store(self) -> BaseStore:
+        return WriteThroughStore(super()._get_store())
+
+
+def namespace() -> tuple[str, ...]:
+    """The store namespace of the current user's memory files, as StoreBackend computes it."""
+    try:
+        assistant_id = get_config().get("metadata", {}).get("assistant_id")
+    except Exception:
+        assistant_id = None
+    return (assistant_id, NAMESPACE) if assistant_id else (NAMESPACE,)
+
+
+async def read_memory_files(store: BaseStore) -> dict[str, Optional[str]]:
+    """
+    Current contents of the user's memory files.
+    Args:
+        store: The agent's store
+    Returns:
+        dict: Full path -> file text, or None for a file that does not exist yet
+    """
+    cached_store = WriteThroughStore(store)
+    user_namespace = namespace()
+    items = await asyncio.gather(*(cached_store.aget(user_namespace, key) for key in MEMORY_FILES))
+    files = {}
+    for key, item in zip(MEMORY_FILES, items):
+        content = item.value.get("content") if item is not None else None
+        files[MEMORY_ROUTE.rstrip("/") + key] = "\n".join(content) if isinstance(content, list) else None
+    return files
+
+
+def render_memory(files: dict[str, Optional[str]]) -> str:
+    sections = ["### Current Memory Files", "", "These are the current contents of the user's memory files."]
+    for path, text in files.items():
+        sections.extend(["", f"#### {path}"])
+        if text is None:
+            sections.append("(does not exist yet; create it with write_file)")
+        else:
+            sections.append(text.strip() or "(empty)")
+    return "\n".join(sections)
@@ -0,0 +1,374 @@
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+import structlog
+import constants as c
+import http_client
+import json_stream
+import reports
+import workers
+
+logger = structlog.get_logger()
+
+# Rows upserted per write while a sync streams in
+WRITE_BATCH_SIZE = 1000
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS incident_mirror (
+        tag TEXT NOT NULL,
+        request_id TEXT NOT NULL,
+        record_date_timestamp DOUBLE PRECISION,
+        generated_category TEXT,
+        sub_category TEXT,
+        payload TEXT NOT NULL,
+        sync_pass DOUBLE PRECISION,
+        PRIMARY KEY (tag, request_id)
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS incident_mirror_category
+        ON incident_mirror (tag, generated_category, record_date_timestamp)
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS incident_mirror_sync (
+        tag TEXT PRIMARY KEY,
+        last_timestamp DOUBLE PRECISION,
+        synced_at DOUBLE PRECISION
+    )
+    """,
+)
+
+_UPSERT = """
+    INSERT INTO incident_mirror
+        (tag, request_id, record_date_timestamp, generated_category, sub_category, payload, sync_pass)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (tag, request_id) DO UPDATE SET
+        record_date_timestamp = excluded.record_date_timestamp,
+        generated_category = excluded.generated_category,
+        sub_category = excluded.sub_category,
+        payload = excluded.payload,
+        sync_pass = excluded.sync_pass
+"""
+
+# Rows a full sync did not see: deleted or re-tagged upstream
+_PRUNE = "DELETE FROM incident_mirror WHERE tag = ? AND (sync_pass IS NULL OR sync_pass <> ?)"
+
+_SAVE_CURSOR = """
+    INSERT INTO incident_mirror_sync (tag, last_timestamp, synced_at) VALUES (?, ?, ?)
+    ON CONFLICT (tag) DO UPDATE SET
+        last_timestamp = excluded.last_timestamp,
+        synced_at = excluded.synced_at
+"""
+
+
+class MirrorDB:
+    """
+    Minimal synchronous access to the mirror tables on SQLite or Postgres.
+
+    SQL is written with `?` placeholders and rewritten for psycopg. One
+    connection is shared behind a lock; callers run these methods on a
+    thread with asyncio.to_thread so the event loop never blocks on I/O.
+    """
+
+    def __init__(self, backend: str):
+        self.backend = backend
+        self._lock = threading.Lock()
+        if backend == "postgres":
+            import psycopg
+            self._conn = psycopg.connect(c.CONNECTION_STRING, autocommit=True)
+        else:
+            path = Path(c.MIRROR_SQLITE_PATH)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        for statement in _SCHEMA:
+            self._execute(statement)
+        # Mirrors created before sync_pass existed
+        with self._lock:
+            columns = [column[0] for column in self._conn.execute("SELECT * FROM incident_mirror LIMIT 0").description]
+        if "sync_pass" not in columns:
+            self._execute("ALTER TABLE incident_mirror ADD COLUMN sync_pass DOUBLE PRECISION")
+
+    def _sql(self, sql: str) -> str:
+        return sql.replace("?", "%s") if self.backend == "postgres" else sql
+
+    def _execute(self, sql: str, args: tuple = ()) -> list:
+        with self._lock:
+            cursor = self._conn.execute(self._sql(sql), args)
+            return cursor.fetchall() if cursor.description else []
+
+    def upsert(self, tag: str, incidents: list[dict], sync_pass: float, prune: bool = False):
+        """
+        Write a batch of incidents.
+        Args:
+            tag: The mirrored tag
+            incidents: Upstream records
+            sync_pass: Identifies the sync writing them
+            prune: Also delete the tag's rows this sync_pass did not write, in the same transaction
+        """
+        rows = [
+            (
+                tag,
+                _row_key(incident),
+                incident.get("record_date_timestamp"),
+                incident.get("generatedCategory"),
+                incident.get("correctedSubCategory"),
+                payload,
+                sync_pass,
+            )
+            for incident, payload in ((incident, json.dumps(incident)) for incident in incidents)
+        ]
+        with self._lock:
+            # One transaction per batch; both connections otherwise autocommit every row
+            if self.backend == "postgres":
+                with self._conn.transaction(), self._conn.cursor() as cursor:
+                    cursor.executemany(self._sql(_UPSERT), rows)
+                    if prune:
+                        cursor.execute(self._sql(_PRUNE), (tag, sync_pass))
+            else:
+                self._conn.execute("BEGIN")
+                try:
+                    self._conn.executemany(_UPSERT, rows)
+                    if prune:
+                        self._conn.execute(_PRUNE, (tag, sync_pass))
+                    self._conn.execute("COMMIT")
+                except Exception:
+                    self._conn.execute("ROLLBACK")
+                    raise
+
+    def last_timestamp(self, tag: str) -> Optional[float]:
+        rows = self._execute("SELECT last_timestamp FROM incident_mirror_sync WHERE tag = ?", (tag,))
+        return rows[0][0] if rows else None
+
+    def save_cursor(self, tag: str, last_timestamp: Optional[float]):
+        self._execute(_SAVE_CURSOR, (tag, last_timestamp, time.time()))
+
+    def count_by_category(self, tag: str) -> dict[str, int]:
+        rows = self._execute(
+            "SELECT generated_category, COUNT(*) FROM incident_mirror WHERE tag = ? GROUP BY generated_category",
+            (tag,),
+        )
+        return {category: count for category, count in rows}
+
+    def payloads(
+        self,
+        tag: str,
+        limit: int,
+        generated_category: Optional[str] = None,
+        sub_category: Optional[str] = None,
+    ) -> list[str]:
+        sql = "SELECT payload FROM incident_mirror WHERE tag = ?"
+        args = [tag]
+        for clause, value in (
+            ("generated_category = ?", generated_category),
+            ("sub_category = ?", sub_category),
+        ):
+            if value is not None:
+                sql += f" AND {clause}"
+                args.append(value)
+        sql += " ORDER BY record_date_timestamp DESC LIMIT ?"
+        args.append(limit)
+        return [row[0] for row in self._execute(sql, tuple(args))]
+
+    def close(self):
+        self._conn.close()
+
+
+def _row_key(incident: dict) -> str:
+    """requestId, else incidentNumber, else a hash of the record, so records without an id are still counted."""
+    for field in ("requestId", "incidentNumber"):
+        if incident.get(field) is not None:
+            return str(incident[field])
+    return "sha1:" + hashlib.sha1(json.dumps(incident, sort_keys=True, default=str).encode()).hexdigest()
+
+
+_db: Optional[MirrorDB] = None
+_task: Optional[asyncio.Task] = None
+# tag -> time.monotonic() of the last complete sync in this process
+_synced_at: dict[str, float] = {}
+# tag -> time.monotonic() of the last complete full re-read of the tag
+_full_synced_at: dict[str, float] = {}
+# tag -> time.monotonic() before which a tag whose pull hit MIRROR_FETCH_LIMIT is not synced again
+_backoff_until: dict[str, float] = {}
+
+
+def _tag_param(tag: str) -> dict:
+    """Categoriser `tag` query parameter for a mirrored tag; "all" mirrors the untagged search."""
+    return {} if tag == "all" else {"tag": tag}
+
+
+async def sync_tag(tag: str, full: bool = False) -> int:
+    """
+    Pull records newer than the last seen record_date_timestamp for one tag and upsert them.
+    Args:
+        tag: A categoriser tag value, e.g. "AVD", or "all"
+        full: Re-read every record of the tag instead, picking up status and category edits to old incidents
+    Returns:
+        int: Number of records received
+    Note:
+        The categoriser only filters by day, so each sync re-reads the day of
+        the cursor; the upsert makes that overlap harmless. A full sync
+        replaces the tag's rows, dropping records deleted or re-tagged
+        upstream. A pull that reaches MIRROR_FETCH_LIMIT may be missing
+        records: it prunes nothing, leaves the cursor where it was, and the
+        tag is neither served from the mirror nor synced again for
+        MIRROR_TRUNCATED_BACKOFF seconds.
+    """
+    last_timestamp = await asyncio.to_thread(_db.last_timestamp, tag)
+    incremental = bool(last_timestamp) and not full
+    params = {**_tag_param(tag), "query": "", "limit": c.MIRROR_FETCH_LIMIT}
+    if incremental:
+        params["start_date"] = datetime.fromtimestamp(last_timestamp).strftime("%Y-%m-%d")
+
+    started = time.perf_counter()
+    sync_pass = time.time()
+    received = 0
+    newest = last_timestamp
+    batch = []
+    session = http_client.get_session(c.INGESTER_URL)
+    async with session.get(
+        f"{c.INGESTER_URL}/categoriser/search", params=params, timeout=c.MIRROR_SYNC_TIMEOUT
+    ) as response:
+        response.raise_for_status()
+        async for incident in json_stream.iter_array_items(
+            response.content.iter_chunked(json_stream.CHUNK_SIZE)
+        ):
+            received += 1
+            timestamp = incident.get("record_date_timestamp")
+            if isinstance(timestamp, (int, float)) and (newest is None or timestamp > newest):
+                newest = timestamp
+            batch.append(incident)
+            if len(batch) >= WRITE_BATCH_SIZE:
+                await asyncio.to_thread(_db.upsert, tag, batch, sync_pass)
+                batch = []
+    truncated = received >= c.MIRROR_FETCH_LIMIT
+    # The last batch of a complete full sync also deletes the rows this pass did not see
+    await asyncio.to_thread(_db.upsert, tag, batch, sync_pass, not incremental and not truncated)
+
+    if truncated:
+        _synced_at.pop(tag, None)
+        _backoff_until[tag] = time.monotonic() + c.MIRROR_TRUNCATED_BACKOFF
+        logger.warning(
+            "Incident mirror sync truncated; serving tag remotely",
+            tag=tag,
+            received=received,
+            limit=c.MIRROR_FETCH_LIMIT,
+            retry_in_s=c.MIRROR_TRUNCATED_BACKOFF,
+        )
+        return received
+
+    await asyncio.to_thread(_db.save_cursor, tag, newest)
+    _synced_at[tag] = time.monotonic()
+    if not incremental:
+        _full_synced_at[tag] = _synced_at[tag]
+
+    logger.info(
+        "Incident mirror synced",
+        tag=tag,
+        received=received,
+        incremental=incremental,
+        latency_ms=round((time.perf_counter() - started) * 1000, 1),
+    )
+    return received
+
+
+def _full_sync_due(tag: str) -> bool:
+    full_synced_at = _full_synced_at.get(tag)
+    return full_synced_at is None or time.monotonic() - full_synced_at >= c.MIRROR_FULL_SYNC_INTERVAL
+
+
+async def _sync_forever():
+    while True:
+        for tag in c.MIRROR_TAGS:
+            if time.monotonic() < _backoff_until.get(tag, 0.0):
+                continue
+            try:
+                await sync_tag(tag, full=_full_sync_due(tag))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Incident mirror sync failed", tag=tag, error=str(e) or type(e).__name__)
+        await asyncio.sleep(c.MIRROR_SYNC_INTERVAL)
+
+
+async def start():
+    """Open the mirror database and start the background sync task, if the mirror is enabled."""
+    global _db, _task
+    if c.MIRROR_BACKEND == "off" or _task is not None:
+        return
+    _db = await asyncio.to_thread(MirrorDB, c.MIRROR_BACKEND)
+    _task = asyncio.create_task(_sync_forever())
+    logger.info("Incident mirror started", backend=c.MIRROR_BACKEND, tags=c.MIRROR_TAGS)
+
+
+async def stop():
+    """Cancel the background sync and close the database."""
+    global _db, _task
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+        _task = None
+    if _db is not None:
+        _db.close()
+        _db = None
+    _synced_at.clear()
+    _full_synced_at.clear()
+    _backoff_until.clear()
+
+
+def is_fresh(tag: str) -> bool:
+    """
+    Whether `tag` can be answered from the mirror.
+    Note:
+        New records must be at most MIRROR_MAX_AGE old, and status edits to
+        older ones at most MIRROR_FULL_SYNC_INTERVAL plus MIRROR_MAX_AGE.
+    """
+    now = time.monotonic()
+    synced_at = _synced_at.get(tag)
+    full_synced_at = _full_synced_at.get(tag)
+    return (
+        _db is not None
+        and synced_at is not None
+        and full_synced_at is not None
+        and now - synced_at <= c.MIRROR_MAX_AGE
+        and now - full_synced_at <= c.MIRROR_FULL_SYNC_INTERVAL + c.MIRROR_MAX_AGE
+    )
+
+
+async def count_by_category(tag: str) -> dict[str, int]:
+    """Incident counts per generated category, from one indexed GROUP BY."""
+    return await asyncio.to_thread(_db.count_by_category, tag)
+
+
+def _report_from_payloads(payloads: list[str], category_name: str) -> dict:
+    """Decode mirrored rows and build the category report; module-level for the report executor."""
+    return reports.build_category_report([json.loads(payload) for payload in payloads], category_name)
+
+
+async def category_report(
+    tag: str,
+    category_name: str,
+    limit: int,
+    generated_category: Optional[str] = None,
+    sub_category: Optional[str] = None,
+) -> dict:
+    """
+    Build a category report from the mirror instead of a remote categoriser search.
+    Returns:
+        dict: See reports.IncidentColumns.report
+    Note:
+        There is no date filter. The mirror can't reproduce the categoriser's
+        date filter exactly, so date-bounded reports use the remote search.
+    """
+    payloads = await asyncio.to_thread(_db.payloads, tag, limit, generated_category, sub_category)
+    return await workers.run_cpu(_report_from_payloads, payloads, category_name)
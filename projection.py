@@ -0,0 +1,90 @@
+from typing import Any, Iterable, Optional
+import structlog
+import constants as c
+
+logger = structlog.get_logger()
+
+# Upstream fields never shown to the model
+DROPPED_FIELDS = frozenset({"ipAddress"})
+# Upstream product names shortened for the model
+PRODUCT_ALIASES = {"Horizon Cloud on Azure Titan": "Horizon"}
+# Fields every record carries; they don't show whether the rest of the whitelist still matches
+IDENTITY_FIELDS = frozenset({"incidentNumber", "productType"})
+# A projection keeping fewer non-identity fields than this is taken to mean the upstream schema changed
+MIN_PROJECTED_FIELDS = 2
+# Whitelisted fields already reported missing from upstream records, so each is logged once
+_reported_missing: set[str] = set()
+
+
+def truncate(text: Optional[str], limit: int) -> Optional[str]:
+    """Collapse whitespace and cut `text` to `limit` characters, marking the cut."""
+    if not text:
+        return text
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[:limit] + " …[truncated]"
+
+
+def _is_empty(value: Any) -> bool:
+    return value is None or value == "" or value == [] or value == {}
+
+
+def _slim(value: Any, text_chars: int, list_items: int) -> Any:
+    """Truncate strings and cap lists, recursively."""
+    if isinstance(value, str):
+        return truncate(value, text_chars)
+    if isinstance(value, list):
+        slimmed = [_slim(item, text_chars, list_items) for item in value[:list_items]]
+        if len(value) > list_items:
+            slimmed.append(f"…[{len(value) - list_items} more]")
+        return slimmed
+    if isinstance(value, dict):
+        return {
+            key: _slim(item, text_chars, list_items)
+            for key, item in value.items()
+            if not _is_empty(item)
+        }
+    return value
+
+
+def project_incident(incident: dict, fields: Iterable[str], verbose: bool = False) -> dict:
+    """
+    Reduce an upstream incident record to what the model needs.
+    Args:
+        incident: One record from /getIncidentDetails `data`
+        fields: Whitelisted fields, in output order
+        verbose: Return every field untruncated instead, e.g. when the user asks for the full record
+    Returns:
+        dict: The projected incident
+    Note:
+        Empty fields are dropped, long text is cut to INCIDENT_TEXT_CHARS and
+        product names are shortened. Verbose output is the upstream record
+        as is, less DROPPED_FIELDS.
+        If the whitelist matches (almost) nothing beyond IDENTITY_FIELDS, all
+        scalar fields are kept instead, so a renamed upstream field degrades
+        output size rather than hiding the incident. Whitelisted fields
+        absent from the record are logged once each.
+    """
+    record = {key: value for key, value in incident.items() if key not in DROPPED_FIELDS}
+    if verbose or not c.INCIDENT_PROJECTION:
+        return record
+    if record.get("productType") in PRODUCT_ALIASES:
+        record["productType"] = PRODUCT_ALIASES[record["productType"]]
+
+    fields = list(fields)
+    missing = [field for field in fields if field not in record and field not in _reported_missing]
+    if missing:
+        _reported_missing.update(missing)
+        logger.warning("Whitelisted incident fields missing upstream", fields=missing)
+
+    projected = {field: record[field] for field in fields if not _is_empty(record.get(field))}
+    if len(projected.keys() - IDENTITY_FIELDS) < MIN_PROJECTED_FIELDS:
+        logger.warning(
+            "Incident projection matched too few fields; returning all scalar fields",
+            matched=sorted(projected),
+        )
+        projected = {
+            key: value
+            for key, value in record.items()
+            if not _is_empty(value) and not isinstance(value, (list, dict))
+        }
+    return _slim(projected, c.INCIDENT_TEXT_CHARS, c.INCIDENT_LIST_ITEMS)
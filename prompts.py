@@ -0,0 +1,72 @@
+from datetime import date
+from typing import Any, Awaitable, Callable, Optional
+import structlog
+from langchain.agents.middleware import AgentMiddleware, ModelRequest, ModelResponse
+from langchain_core.messages import SystemMessage
+from langgraph.config import get_config
+import constants as c
+import memories
+
+logger = structlog.get_logger()
+
+CONTEXT_HEADING = "## Current Context"
+
+
+def _user_name() -> Optional[str]:
+    try:
+        return get_config().get("configurable", {}).get("user_name")
+    except Exception:
+        return None
+
+
+def render_context(today: date, user_name: Optional[str], memory_files: Optional[dict[str, Optional[str]]]) -> str:
+    """
+    The per-turn facts appended after the static system prompt.
+    Args:
+        today: The current date
+        user_name: The user's first name, if known
+        memory_files: Memory file contents from memories.read_memory_files, or None to leave them out
+    Returns:
+        str: The dynamic section of the system prompt
+    """
+    lines = [CONTEXT_HEADING, "", f"Today's date is: `{today.isoformat()}`"]
+    if user_name:
+        lines.append(f"You are talking to: {user_name}")
+    if memory_files is not None:
+        lines.extend(["", memories.render_memory(memory_files)])
+    return "\n".join(lines)
+
+
+def with_context(system_message: Optional[SystemMessage], context: str) -> SystemMessage:
+    """Append `context` as the last block of the system message, leaving every earlier block untouched."""
+    blocks = list(system_message.content_blocks) if system_message else []
+    blocks.append({"type": "text", "text": ("\n\n" if blocks else "") + context})
+    return SystemMessage(content=blocks)
+
+
+class TurnContextMiddleware(AgentMiddleware):
+    """
+    Append the date, the user's name and their memory files to the system prompt.
+
+    Everything before this block (the agent prompt, the deep agent's tool and
+    filesystem instructions) is built once and stays byte-identical across
+    turns and users, so providers can reuse the cached prompt prefix. Only
+    the tail written here changes. Registered after the deep agent's own
+    middleware and before model routing, so nothing is appended after it.
+    """
+
+    async def awrap_model_call(
+        self,
+        request: ModelRequest,
+        handler: Callable[[ModelRequest], Awaitable[ModelResponse]],
+    ) -> Any:
+        memory_files = None
+        store = request.runtime.store if request.runtime is not None else None
+        if c.MEMORY_INJECTION and store is not None:
+            try:
+                memory_files = await memories.read_memory_files(store)
+            except Exception as e:
+                logger.warning("Memory injection failed", error=str(e))
+
+        context = render_context(date.today(), _user_name(), memory_files)
+        return await handler(request.override(system_message=with_context(request.system_message, context)))
@@ -0,0 +1,248 @@
+import asyncio
+from collections import deque
+from datetime import datetime
+from typing import AsyncIterator
+import numpy as np
+import constants as c
+import workers
+import status_classifier as sc
+import dates
+import charts
+
+AGEING_BUCKETS = ("0-7", "8-14", "15-30", "30+")
+# Upper bound (inclusive, in days) of every ageing bucket but the last
+AGEING_EDGES = np.array([7, 14, 30])
+
+
+def _created_value(incident: dict):
+    """The created date of an incident, trying the field names used by different data formats."""
+    return (
+        incident.get("created_at_timestamp") or 
+        incident.get("created_at") or 
+        incident.get("createdDate") or 
+        incident.get("created_date")
+    )
+
+
+class IncidentColumns:
+    """
+    Columnar view of categoriser incidents used to build category reports.
+
+    Each incident is reduced once to categorical codes (priority, subcategory,
+    status class) and the day ordinal it was created on; every analytic is then a vectorised
+    group-by over those arrays. Columns from consecutive batches can be
+    appended in arrival order, so incidents never need to be held in memory
+    all at once.
+    """
+
+    def __init__(self):
+        # by_priority is only reported when the first incident carries a priority
+        self.first_has_priority = None
+        # Category value -> code, in order of first appearance
+        self.priorities = {}
+        self.subcategories = {}
+        self.engineers = {}
+        self.priority = np.empty(0, dtype=np.int32)
+        self.subcategory = np.empty(0, dtype=np.int32)
+        self.status = np.empty(0, dtype=np.int8)
+        self.created_day = np.empty(0, dtype=np.int32)
+        # One row per (incident, engineer) pair from top_engineers_for_category
+        self.engineer = np.empty(0, dtype=np.int32)
+        self.percentage = np.empty(0, dtype=np.float64)
+
+    @property
+    def total(self) -> int:
+        return len(self.priority)
+
+    @classmethod
+    def from_incidents(cls, incidents: list) -> "IncidentColumns":
+        """Convert a batch of incidents into columns in a single pass."""
+        columns = cls()
+        if incidents:
+            columns.first_has_priority = isinstance(incidents[0], dict) and "priority" in incidents[0]
+        current_date = datetime.now()
+        priorities = columns.priorities
+        subcategories = columns.subcategories
+        engineers = columns.engineers
+        status_keys = {}
+        priority, subcategory, status_code, created = [], [], [], []
+        engineer, percentage = [], []
+        for incident in incidents:
+            priority.append(priorities.setdefault(incident.get("priority", "Unknown"), len(priorities)))
+            # Try multiple field names for subcategory
+            value = (
+                incident.get("correctedSubCategory") or 
+                incident.get("corrected_sub_category") or 
+                incident.get("subCategory") or
+                incident.get("sub_category") or
+                "Other"
+            )
+            subcategory.append(subcategories.setdefault(value, len(subcategories)))
+            status_code.append(status_keys.setdefault(sc.status_key(incident), len(status_keys)))
+            created.append(_created_value(incident))
+
+            # Check if top_engineers_for_category exists in the incident
+            top_engineers = incident.get("top_engineers_for_category", [])
+            if top_engineers and isinstance(top_engineers, list):
+                for engineer_data in top_engineers:
+                    if isinstance(engineer_data, dict):
+                        engineer.append(engineers.setdefault(engineer_data.get("engineer", "Unknown"), len(engineers)))
+                        percentage.append(float(engineer_data.get("percentage") or 0.0))
+
+        # Classify each distinct status key once, then map every incident through the table
+        status_table = np.array([sc.classify_key(*key) for key in status_keys], dtype=np.int8)
+        columns.priority = np.array(priority, dtype=np.int32)
+        columns.subcategory = np.array(subcategory, dtype=np.int32)
+        columns.status = status_table[np.array(status_code, dtype=np.int32)]
+        columns.created_day = dates.day_ordinals(created, current_date)
+        columns.engineer = np.array(engineer, dtype=np.int32)
+        columns.percentage = np.array(percentage, dtype=np.float64)
+        return columns
+
+    def append(self, other: "IncidentColumns"):
+        """Append columns of incidents that arrived after this instance's incidents."""
+        if self.first_has_priority is None:
+            self.first_has_priority = other.first_has_priority
+
+        def remap(codes: dict, other_codes: dict, column: np.ndarray) -> np.ndarray:
+            mapping = np.array([codes.setdefault(v, len(codes)) for v in other_codes], dtype=np.int32)
+            return mapping[column] if len(column) else column
+
+        self.priority = np.concatenate([self.priority, remap(self.priorities, other.priorities, other.priority)])
+        self.subcategory = np.concatenate(
+            [self.subcategory, remap(self.subcategories, other.subcategories, other.subcategory)]
+        )
+        self.status = np.concatenate([self.status, other.status])
+        self.created_day = np.concatenate([self.created_day, other.created_day])
+        self.engineer = np.concatenate([self.engineer, remap(self.engineers, other.engineers, other.engineer)])
+        self.percentage = np.concatenate([self.percentage, other.percentage])
+
+    def ageing_counts(self) -> dict:
+        """Incident counts per ageing bucket (0-7, 8-14, 15-30, 30+ days)."""
+        days_old = dates.days_old(self.created_day, datetime.now().toordinal())
+        buckets = np.searchsorted(AGEING_EDGES, days_old, side="left")
+        counts = np.bincount(buckets, minlength=len(AGEING_BUCKETS))
+        return dict(zip(AGEING_BUCKETS, counts.tolist()))
+
+    def by_priority(self) -> dict:
+        """Incident counts per priority, empty if the first incident had no priority field."""
+        if not self.first_has_priority:
+            return {}
+        counts = np.bincount(self.priority, minlength=len(self.priorities))
+        return dict(zip(self.priorities, counts.tolist()))
+
+    def subcategory_status(self) -> dict:
+        """Resolved/pending/open counts per subcategory, in order of first appearance."""
+        n = len(self.subcategories)
+        counts = np.bincount(
+            self.subcategory.astype(np.int64) * len(sc.STATUSES) + self.status, minlength=n * len(sc.STATUSES)
+        ).reshape(n, len(sc.STATUSES))
+        return {
+            subcategory: dict(zip(sc.STATUSES, row))
+            for subcategory, row in zip(self.subcategories, counts.tolist())
+        }
+
+    def top_smes(self, n: int = 5) -> list:
+        """Engineers with the highest percentage seen across all incidents."""
+        names = list(self.engineers)
+        best = np.full(len(names), -np.inf)
+        np.maximum.at(best, self.engineer, self.percentage)
+        order = np.argsort(-best, kind="stable")[:n]
+        return [
+            {"engineer": names[i], "percentage": best[i].item()}
+            for i in order.tolist()
+        ]
+
+    def report(self, category_name: str) -> dict:
+        """
+        Build the report returned by get_incidents_by_category.
+        Args:
+            category_name: The category the report is for
+        Returns:
+            dict: Priority breakdown, ageing analysis, subcategory status, chart JSON and top SMEs
+        """
+        by_priority = self.by_priority()
+        ageing_counts = self.ageing_counts()
+        subcategory_status = self.subcategory_status()
+        top_smes = self.top_smes()
+
+        # Get top 8 subcategories by total count
+        subcategory_totals = {
+            subcat: data["resolved"] + data["pending"] + data["open"]
+            for subcat, data in subcategory_status.items()
+        }
+        top_subcategories = sorted(subcategory_status.items(), key=lambda x: subcategory_totals[x[0]], reverse=True)[:8]
+
+        # Build chart data
+        labels = [subcat for subcat, _ in top_subcategories]
+        charts_json = charts.build_charts_json(
+            ageing_data=[ageing_counts[bucket] for bucket in AGEING_BUCKETS],
+            subcategory_labels=labels,
+            resolved_counts=[subcategory_status[subcat]["resolved"] for subcat in labels],
+            pending_counts=[subcategory_status[subcat]["pending"] for subcat in labels],
+            open_counts=[subcategory_status[subcat]["open"] for subcat in labels],
+        )
+
+        rep = {
+            "category_name": category_name,
+            "total": self.total,
+            "incidents_count": self.total,  # Just the count, not the full list
+            "by_priority": by_priority,
+            "ageing_analysis": ageing_counts,
+            "subcategory_status": subcategory_status,
+            "chart_data": charts_json,  # Pre-calculated chart JSON string
+            "top_smes": top_smes,  # Top subject matter experts for this category
+            "is_empty": False  # Flag to indicate data exists
+        }
+        return rep
+
+
+def aggregate_batch(incidents: list) -> IncidentColumns:
+    """Convert one batch of incidents to columns; module-level so a process pool can run it."""
+    return IncidentColumns.from_incidents(incidents)
+
+
+def build_category_report(incidents: list, category_name: str) -> dict:
+    """
+    Aggregate a fully materialised incident list into a category report.
+    Args:
+        incidents: Incidents returned by the categoriser search API
+        category_name: The category the report is for
+    Returns:
+        dict: See IncidentColumns.report
+    """
+    return aggregate_batch(incidents).report(category_name)
+
+
+async def aggregate_stream(incidents: AsyncIterator[dict]) -> IncidentColumns:
+    """
+    Convert incidents to columns while they are still arriving.
+    Args:
+        incidents: Async iterator of incidents, e.g. json_stream.iter_array_items over a response
+    Returns:
+        IncidentColumns: Columns over every incident yielded
+    Note:
+        Incidents are grouped into batches of REPORT_BATCH_SIZE and converted
+        on the shared executor while the next batch downloads. At most
+        REPORT_MAX_PENDING_BATCHES batches are held at once, so memory stays
+        flat however large the result set is.
+    """
+    columns = IncidentColumns()
+    pending = deque()
+    batch = []
+    try:
+        async for incident in incidents:
+            batch.append(incident)
+            if len(batch) >= c.REPORT_BATCH_SIZE:
+                pending.append(asyncio.ensure_future(workers.run_cpu(aggregate_batch, batch)))
+                batch = []
+                while len(pending) > c.REPORT_MAX_PENDING_BATCHES:
+                    columns.append(await pending.popleft())
+        if batch:
+            pending.append(asyncio.ensure_future(workers.run_cpu(aggregate_batch, batch)))
+        while pending:
+            columns.append(await pending.popleft())
+    finally:
+        for future in pending:
+            future.cancel()
+    return columns
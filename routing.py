@@ -0,0 +1,181 @@
+import re
+import time
+from typing import Any, Awaitable, Callable, Optional
+import structlog
+from langchain.agents.middleware import AgentMiddleware, ModelRequest, ModelResponse
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+import constants as c
+import llm as l
+
+logger = structlog.get_logger()
+
+# Routing tiers, cheapest first, and the llm registry model each one uses
+NANO, MINI, LARGE = "nano", "mini", "large"
+TIER_MODELS = {NANO: "NANO_MODEL", MINI: "MINI_MODEL", LARGE: "LARGE_MODEL"}
+
+# Greetings, thanks and acknowledgements that need no tools or reasoning
+_SMALL_TALK = re.compile(
+    r"^\W*(hi|hello|hey|hiya|good (morning|afternoon|evening)|thanks|thank you|thx|ty|"
+    r"ok|okay|cool|great|got it|bye|goodbye|see you)( (there|all|team|again|so much|a lot))?\W*$",
+    re.IGNORECASE,
+)
+SMALL_TALK_MAX_WORDS = 6
+
+# Count and report lookups whose pre-aggregated results the next step only restates for the user.
+# Incident details, SOPs and search results stay on the large model: the step after them has to
+# reason over the content and choose the next tools.
+SUMMARY_TOOLS = frozenset({
+    "count_all_incidents",
+    "get_incidents_by_category",
+})
+# Filesystem tools that, pointed at /memories/, only record preferences or profile data
+MEMORY_WRITE_TOOLS = frozenset({"write_file", "edit_file"})
+MEMORY_PREFIX = "/memories/"
+
+
+def _text(message) -> str:
+    return message.content if isinstance(message.content, str) else ""
+
+
+def _trailing_tool_calls(messages: list) -> Optional[list[dict]]:
+    """Tool calls answered by the ToolMessages at the end of `messages`, or None if it ends otherwise."""
+    if not messages or not isinstance(messages[-1], ToolMessage):
+        return None
+    for message in reversed(messages):
+        if isinstance(message, AIMessage):
+            return message.tool_calls
+        if not isinstance(message, ToolMessage):
+            return None
+    return None
+
+
+def _turn_answered(messages: list) -> bool:
+    """
+    Whether the user's current turn was already answered before the trailing tool calls.
+    Note:
+        Either the AI message making those calls also carries the answer
+        text, or an AI message with text and no tool calls came earlier in
+        the turn.
+    """
+    ai_index = max(i for i, message in enumerate(messages) if isinstance(message, AIMessage))
+    if _text(messages[ai_index]).strip():
+        return True
+    for message in reversed(messages[:ai_index]):
+        if isinstance(message, HumanMessage):
+            return False
+        if isinstance(message, AIMessage) and not message.tool_calls and _text(message).strip():
+            return True
+    return False
+
+
+def classify(messages: list) -> tuple[str, str]:
+    """
+    Pick the tier for the next model call from the conversation so far.
+    Args:
+        messages: The messages the model is about to see, excluding the system prompt
+    Returns:
+        tuple: (tier, reason)
+    Note:
+        Rules only, so routing never costs a model call. Anything not
+        recognised as cheap stays on the large model.
+    """
+    if not messages:
+        return LARGE, "empty"
+    last = messages[-1]
+    if isinstance(last, HumanMessage):
+        text = _text(last).strip()
+        if text and len(text.split()) <= SMALL_TALK_MAX_WORDS and _SMALL_TALK.match(text):
+            return NANO, "small_talk"
+        return LARGE, "user_turn"
+
+    tool_calls = _trailing_tool_calls(messages)
+    if tool_calls:
+        names = {call["name"] for call in tool_calls}
+        # A memory write made mid-task is followed by more reasoning; only one that closes an answered turn is cheap
+        if (
+            names <= MEMORY_WRITE_TOOLS
+            and all(str(call["args"].get("file_path", "")).startswith(MEMORY_PREFIX) for call in tool_calls)
+            and _turn_answered(messages)
+        ):
+            return MINI, "memory_bookkeeping"
+        if names <= SUMMARY_TOOLS:
+            return MINI, "tool_summary"
+    return LARGE, "reasoning"
+
+
+class TierStats:
+    """Call, latency and token totals for one routing tier."""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.latency_ms = 0.0
+        self.input_tokens = 0
+        self.output_tokens = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "avg_latency_ms": round(self.latency_ms / self.calls, 1) if self.calls else 0.0,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+        }
+
+
+_stats = {tier: TierStats() for tier in TIER_MODELS}
+
+
+def stats() -> dict:
+    """Calls, errors, average latency and tokens per routing tier since startup."""
+    return {tier: tier_stats.as_dict() for tier, tier_stats in _stats.items()}
+
+
+def _usage(response: Any) -> dict:
+    messages = response.result if isinstance(response, ModelResponse) else [response]
+    for message in messages:
+        if isinstance(message, AIMessage) and message.usage_metadata:
+            return message.usage_metadata
+    return {}
+
+
+class ModelRoutingMiddleware(AgentMiddleware):
+    """
+    Send cheap agent steps to MINI_MODEL/NANO_MODEL and keep reasoning on LARGE_MODEL.
+
+    Sits innermost in the deep agent's middleware stack, so the model it
+    picks is the one actually called. See classify() for the rules.
+    """
+
+    async def awrap_model_call(
+        self,
+        request: ModelRequest,
+        handler: Callable[[ModelRequest], Awaitable[ModelResponse]],
+    ) -> Any:
+        tier, reason = classify(request.messages) if c.MODEL_ROUTING else (LARGE, "routing_disabled")
+        if tier != LARGE:
+            request = request.override(model=l.get_model(TIER_MODELS[tier]))
+
+        tier_stats = _stats[tier]
+        tier_stats.calls += 1
+        started = time.perf_counter()
+        try:
+            response = await handler(request)
+        except Exception:
+            tier_stats.errors += 1
+            raise
+        latency_ms = (time.perf_counter() - started) * 1000
+        usage = _usage(response)
+        tier_stats.latency_ms += latency_ms
+        tier_stats.input_tokens += usage.get("input_tokens", 0)
+        tier_stats.output_tokens += usage.get("output_tokens", 0)
+
+        logger.info(
+            "Model call routed",
+            tier=tier,
+            reason=reason,
+            latency_ms=round(latency_ms, 1),
+            input_tokens=usage.get("input_tokens"),
+            output_tokens=usage.get("output_tokens"),
+        )
+        return response
@@ -0,0 +1,381 @@
+import asyncio
+import contextvars
+import time
+import uuid
+from collections import OrderedDict, deque
+from typing import Any, Optional
+import structlog
+from langchain_core.callbacks import AsyncCallbackHandler
+from langchain_core.messages.utils import count_tokens_approximately
+from langchain_core.outputs import LLMResult
+from langchain_core.rate_limiters import BaseRateLimiter
+from langgraph.config import get_config
+import constants as c
+
+logger = structlog.get_logger()
+
+# Queue priorities, most urgent first. The bot marks its turns interactive; anything unmarked is batch work.
+INTERACTIVE, BATCH = "interactive", "batch"
+PRIORITIES = (INTERACTIVE, BATCH)
+
+# (run id, estimated tokens) of the model call about to be scheduled, set by SchedulerCallback
+_pending: contextvars.ContextVar[Optional[tuple[uuid.UUID, int]]] = contextvars.ContextVar(
+    "pending_model_call", default=None
+)
+
+
+class TokenBucket:
+    """A per-minute budget refilled continuously, holding at most one minute's worth."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.level = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.capacity / 60)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` (at most the capacity) is available."""
+        self._refill()
+        missing = min(amount, self.capacity) - self.level
+        return max(missing, 0.0) * 60 / self.capacity
+
+    def take(self, amount: float):
+        """Spend `amount`, or refund a negative amount. The level may go negative, which delays later calls."""
+        self._refill()
+        self.level = min(self.capacity, self.level - amount)
+
+    def resize(self, per_minute: float):
+        """Change the per-minute budget, e.g. to the limit the server reports."""
+        self._refill()
+        self.capacity = float(per_minute)
+        self.level = min(self.level, self.capacity)
+
+    def sync(self, remaining: float):
+        """Set the level to what the server reports is left, raising it as well as lowering it."""
+        self._refill()
+        self.level = min(self.capacity, remaining)
+
+
+class _Waiter:
+    __slots__ = ("tokens", "future", "enqueued")
+
+    def __init__(self, tokens: int, future: asyncio.Future):
+        self.tokens = tokens
+        self.future = future
+        self.enqueued = time.perf_counter()
+
+
+def _header(headers: dict, name: str) -> Optional[float]:
+    for key, value in headers.items():
+        if key.lower() == name:
+            try:
+                return float(value)
+            except (TypeError, ValueError):
+                return None
+    return None
+
+
+class DeploymentScheduler:
+    """
+    Requests-per-minute and tokens-per-minute budgets, and a fair queue, for one deployment.
+
+    Calls wait until both budgets cover them. A call's token cost is its
+    estimated prompt plus SCHEDULER_OUTPUT_TOKENS, corrected to the real usage
+    when it finishes. Interactive calls always go first. Within a priority,
+    users are served round-robin, so one busy chat cannot starve the others.
+    The configured budgets are only a starting point: the x-ratelimit-limit-*
+    headers of every response resize them to the deployment's real quota, and
+    x-ratelimit-remaining-* sets what is left of it. A 429 pauses the whole
+    deployment for its retry-after instead of letting every queued call fail
+    in turn.
+    """
+
+    def __init__(self, name: str, rpm: int, tpm: int):
+        self.name = name
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        # priority -> user -> that user's waiters, oldest first
+        self._queues: dict[str, OrderedDict[str, deque[_Waiter]]] = {p: OrderedDict() for p in PRIORITIES}
+        # run id -> tokens charged for a call in flight
+        self._charged: dict[uuid.UUID, int] = {}
+        self._paused_until = 0.0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.granted = 0
+        self.rate_limited = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+
+    def _ensure_dispatcher(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._task is None or self._task.done():
+            self._loop = loop
+            self._wake = asyncio.Event()
+            self._task = loop.create_task(self._dispatch())
+
+    async def acquire(self, user: str, priority: str, tokens: int, run_id: Optional[uuid.UUID] = None):
+        """
+        Wait for this deployment's budgets to cover a call.
+        Args:
+            user: Whose call it is; users of the same priority are served in turn
+            priority: INTERACTIVE or BATCH
+            tokens: Estimated tokens the call will use
+            run_id: The model run, to settle the estimate against real usage in settle()
+        """
+        self._ensure_dispatcher()
+        waiter = _Waiter(tokens, self._loop.create_future())
+        queue = self._queues.get(priority, self._queues[BATCH])
+        queue.setdefault(user, deque()).append(waiter)
+        self._wake.set()
+        # A cancelled caller cancels its future, and the dispatcher skips it
+        await waiter.future
+        if run_id is not None:
+            self._charged[run_id] = tokens
+
+    def _head(self) -> Optional[tuple[OrderedDict, str]]:
+        """The queue and user whose oldest waiter is next, dropping cancelled waiters on the way."""
+        for priority in PRIORITIES:
+            queue = self._queues[priority]
+            while queue:
+                user, waiters = next(iter(queue.items()))
+                while waiters and waiters[0].future.done():
+                    waiters.popleft()
+                if waiters:
+                    return queue, user
+                del queue[user]
+        return None
+
+    async def _dispatch(self):
+        while True:
+            head = self._head()
+            if head is None:
+                self._wake.clear()
+                await self._wake.wait()
+                continue
+            queue, user = head
+            waiter = queue[user][0]
+            delay = max(
+                self._paused_until - time.monotonic(),
+                self.requests.wait_time(1),
+                self.tokens.wait_time(waiter.tokens),
+            )
+            if delay > 0:
+                # Woken early by new waiters (maybe of higher priority) or by a budget change
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            queue[user].popleft()
+            queue.move_to_end(user)
+            self.requests.take(1)
+            self.tokens.take(waiter.tokens)
+            wait_ms = (time.perf_counter() - waiter.enqueued) * 1000
+            self.granted += 1
+            self.total_wait_ms += wait_ms
+            self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+            waiter.future.set_result(None)
+
+    def settle(self, run_id: uuid.UUID, used_tokens: Optional[int]):
+        """Replace a finished call's estimate with its real usage."""
+        charged = self._charged.pop(run_id, None)
+        if charged is not None and used_tokens is not None:
+            self.tokens.take(used_tokens - charged)
+
+    def fail(self, run_id: uuid.UUID):
+        """Refund a failed call's estimate."""
+        charged = self._charged.pop(run_id, None)
+        if charged is not None:
+            self.tokens.take(-charged)
+
+    def observe(self, status_code: int, headers: Any):
+        """
+        Apply one HTTP response from the deployment, including those the openai client retries.
+        Args:
+            status_code: The response status
+            headers: The response headers
+        Note:
+            x-ratelimit-limit-* resize the budgets and x-ratelimit-remaining-*
+            set what is left of them. A 429 pauses the deployment for the
+            time Azure asks.
+        """
+        for bucket, kind in ((self.requests, "requests"), (self.tokens, "tokens")):
+            limit = _header(headers, f"x-ratelimit-limit-{kind}")
+            remaining = _header(headers, f"x-ratelimit-remaining-{kind}")
+            if limit:
+                bucket.resize(limit)
+            if remaining is not None:
+                bucket.sync(remaining)
+        if status_code != 429:
+            return
+        retry_after_ms = _header(headers, "retry-after-ms")
+        retry_after = retry_after_ms / 1000 if retry_after_ms is not None else _header(headers, "retry-after")
+        if retry_after is None:
+            retry_after = c.SCHEDULER_DEFAULT_BACKOFF
+        self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+        self.rate_limited += 1
+        logger.warning("Model deployment rate limited", deployment=self.name, retry_after=retry_after)
+        if self._wake is not None:
+            self._wake.set()
+
+    async def stop(self):
+        """Cancel the dispatcher task; calls still queued stay waiting."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        """Calls waiting per priority, time spent waiting, and what is left of this deployment's budgets."""
+        return {
+            "waiting": {
+                priority: sum(len(waiters) for waiters in queue.values())
+                for priority, queue in self._queues.items()
+            },
+            "users_waiting": sum(len(queue) for queue in self._queues.values()),
+            "in_flight": len(self._charged),
+            "granted": self.granted,
+            "rate_limited": self.rate_limited,
+            "avg_wait_ms": round(self.total_wait_ms / self.granted, 1) if self.granted else 0.0,
+            "max_wait_ms": round(self.max_wait_ms, 1),
+            "rpm": round(self.requests.capacity),
+            "tpm": round(self.tokens.capacity),
+            "requests_left": round(self.requests.level, 1),
+            "tokens_left": round(self.tokens.level),
+            "paused_for_s": round(max(self._paused_until - time.monotonic(), 0.0), 1),
+        }
+
+
+def _caller() -> tuple[str, str]:
+    """(user, priority) of the current run, from the agent config the bot passes in."""
+    try:
+        configurable = get_config().get("configurable", {})
+    except Exception:
+        return "unknown", BATCH
+    user = configurable.get("assistant_id") or configurable.get("thread_id") or "unknown"
+    return str(user), configurable.get("priority") or BATCH
+
+
+class SchedulerRateLimiter(BaseRateLimiter):
+    """Hooks a DeploymentScheduler into a chat model's `rate_limiter`, which every async call awaits."""
+
+    def __init__(self, scheduler: DeploymentScheduler):
+        self.scheduler = scheduler
+
+    def acquire(self, *, blocking: bool = True) -> bool:
+        # Sync model calls run outside the event loop the scheduler lives on; the bot makes none
+        return True
+
+    async def aacquire(self, *, blocking: bool = True) -> bool:
+        pending = _pending.get()
+        _pending.set(None)
+        run_id, tokens = pending if pending is not None else (None, c.SCHEDULER_OUTPUT_TOKENS)
+        user, priority = _caller()
+        await self.scheduler.acquire(user, priority, tokens, run_id)
+        return True
+
+
+class SchedulerCallback(AsyncCallbackHandler):
+    """
+    Supplies the scheduler with each call's token estimate and real usage.
+    Note:
+        run_inline makes langchain await on_chat_model_start in the calling
+        task, right before the model awaits its rate limiter, so the estimate
+        reaches SchedulerRateLimiter through a context variable.
+    """
+
+    run_inline = True
+
+    def __init__(self, scheduler: DeploymentScheduler):
+        self.scheduler = scheduler
+
+    async def on_chat_model_start(self, serialized: dict, messages: list[list], *, run_id: uuid.UUID, **kwargs: Any):
+        prompt_tokens = sum(count_tokens_approximately(batch) for batch in messages)
+        _pending.set((run_id, prompt_tokens + c.SCHEDULER_OUTPUT_TOKENS))
+
+    async def on_llm_end(self, response: LLMResult, *, run_id: uuid.UUID, **kwargs: Any):
+        used_tokens = None
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if usage:
+                    used_tokens = usage.get("total_tokens")
+        self.scheduler.settle(run_id, used_tokens)
+
+    async def on_llm_error(self, error: BaseException, *, run_id: uuid.UUID, **kwargs: Any):
+        self.scheduler.fail(run_id)
+
+
+# One scheduler per chat deployment in llm.py
+_schedulers: dict[str, DeploymentScheduler] = {}
+
+
+def _budgets(name: str) -> tuple[int, int]:
+    return {
+        "LARGE_MODEL": (c.LARGE_MODEL_RPM, c.LARGE_MODEL_TPM),
+        "MINI_MODEL": (c.MINI_MODEL_RPM, c.MINI_MODEL_TPM),
+        "NANO_MODEL": (c.NANO_MODEL_RPM, c.NANO_MODEL_TPM),
+    }[name]
+
+
+def get_scheduler(name: str) -> DeploymentScheduler:
+    scheduler = _schedulers.get(name)
+    if scheduler is None:
+        rpm, tpm = _budgets(name)
+        scheduler = _schedulers[name] = DeploymentScheduler(name, rpm, tpm)
+    return scheduler
+
+
+def http_client(scheduler: DeploymentScheduler, **kwargs: Any):
+    """The openai client's default async HTTP client, reporting every response to `scheduler`."""
+    import openai
+
+    async def observe(response):
+        scheduler.observe(response.status_code, response.headers)
+
+    return openai.DefaultAsyncHttpxClient(event_hooks={"response": [observe]}, **kwargs)
+
+
+def model_kwargs(name: str) -> dict:
+    """
+    Constructor arguments that put a chat model behind its deployment's scheduler.
+    Args:
+        name: The llm registry name, e.g. "LARGE_MODEL"
+    Returns:
+        dict: rate_limiter, callbacks and http_async_client; empty when SCHEDULER=off
+    Note:
+        The rate-limit headers are read from every HTTP response, 429s the
+        openai client retries included, so the client keeps its own retries
+        and no headers end up in response_metadata or the checkpoints. These
+        are the shared model instances, so subagent, summarisation and
+        compaction calls are scheduled too.
+    """
+    if not c.SCHEDULER:
+        return {}
+    scheduler = get_scheduler(name)
+    return {
+        "rate_limiter": SchedulerRateLimiter(scheduler),
+        "callbacks": [SchedulerCallback(scheduler)],
+        "http_async_client": http_client(scheduler),
+    }
+
+
+def stats() -> dict:
+    """Per-deployment scheduler metrics since startup."""
+    return {name: scheduler.stats() for name, scheduler in _schedulers.items()}
+
+
+async def stop():
+    """Cancel every deployment's dispatcher task, e.g. on shutdown."""
+    for scheduler in _schedulers.values():
+        await scheduler.stop()
@@ -0,0 +1,128 @@
+import time
+from typing import Any, Optional
+import numpy as np
+import cache
+
+
+class SemanticCache:
+    """
+    Bounded cache of results keyed by query embedding rather than exact text.
+
+    Embeddings are stored as rows of one float32 matrix, allocated on the
+    first add once the embedding size is known, so a lookup is a single
+    matrix-vector product. Vectors must be L2-normalised, which makes the dot
+    product the cosine similarity. When the cache is full the least recently
+    used row is overwritten. Like cache.TTLCache, all
+    bookkeeping runs on the event loop.
+    """
+
+    def __init__(self, name: str, threshold: float, max_entries: int, ttl: float):
+        self.name = name
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._vectors: Optional[np.ndarray] = None
+        self._last_used = np.zeros(max_entries, dtype=np.int64)
+        self._stored_at = np.zeros(max_entries, dtype=np.float64)
+        self._values: list[Any] = [None] * max_entries
+        self._queries: list[Optional[str]] = [None] * max_entries
+        # Exact query text -> row, so verbatim repeats skip embedding altogether
+        self._rows: dict[str, int] = {}
+        self._size = 0
+        self._clock = 0
+        self.hits = 0
+        self.exact_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        cache.register(self)
+
+    @staticmethod
+    def normalise(query: str) -> str:
+        return " ".join(query.lower().split())
+
+    def _touch(self, row: int) -> Any:
+        self._clock += 1
+        self._last_used[row] = self._clock
+        return self._values[row]
+
+    def _expired(self, row: int) -> bool:
+        return time.monotonic() - self._stored_at[row] > self.ttl
+
+    def _expired_rows(self) -> np.ndarray:
+        """Mask of the rows in use whose TTL has run out."""
+        return time.monotonic() - self._stored_at[:self._size] > self.ttl
+
+    def get_exact(self, query: str) -> Any:
+        """Return the value cached for exactly this (normalised) query, or None."""
+        row = self._rows.get(self.normalise(query))
+        if row is None or self._expired(row):
+            return None
+        self.exact_hits += 1
+        return self._touch(row)
+
+    def lookup(self, vector: np.ndarray) -> tuple[Any, float]:
+        """
+        Find the cached value whose query is most similar to `vector`.
+        Args:
+            vector: L2-normalised query embedding
+        Returns:
+            tuple: (value, similarity), with value None when nothing fresh is above the threshold
+        Note:
+            Expired rows are masked out first, so a stale best match cannot
+            hide a fresh one just below it.
+        """
+        if self._size:
+            similarities = self._vectors[:self._size] @ vector
+            similarities[self._expired_rows()] = -np.inf
+            row = int(np.argmax(similarities))
+            similarity = float(similarities[row])
+            if similarity >= self.threshold:
+                self.hits += 1
+                return self._touch(row), similarity
+        self.misses += 1
+        return None, 0.0
+
+    def add(self, query: str, vector: np.ndarray, value: Any):
+        """Cache `value` for `query`, reusing an expired row or else the least recently used one when full."""
+        if self._vectors is None:
+            self._vectors = np.zeros((self.max_entries, len(vector)), dtype=np.float32)
+        key = self.normalise(query)
+        row = self._rows.get(key)
+        if row is None:
+            if self._size < self.max_entries:
+                row = self._size
+                self._size += 1
+            else:
+                expired = np.flatnonzero(self._expired_rows())
+                if expired.size:
+                    row = int(expired[0])
+                else:
+                    row = int(np.argmin(self._last_used))
+                    self.evictions += 1
+                del self._rows[self._queries[row]]
+            self._rows[key] = row
+        self._vectors[row] = vector
+        self._values[row] = value
+        self._queries[row] = key
+        self._stored_at[row] = time.monotonic()
+        self._touch(row)
+
+    def clear(self):
+        self._rows.clear()
+        self._values = [None] * self.max_entries
+        self._queries = [None] * self.max_entries
+        self._last_used[:] = 0
+        self._size = 0
+
+    def stats(self) -> dict:
+        """Exact, similar and missed lookups since startup, and how many rows are in use."""
+        lookups = self.hits + self.exact_hits + self.misses
+        return {
+            "name": self.name,
+            "entries": self._size,
+            "hits": self.hits,
+            "exact_hits": self.exact_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.exact_hits) / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+        }
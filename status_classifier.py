@@ -0,0 +1,98 @@
+import re
+from functools import lru_cache
+import constants as c
+
+# Status classes, in the column order used by subcategory_status
+RESOLVED, PENDING, OPEN = 0, 1, 2
+STATUSES = ("resolved", "pending", "open")
+
+# Keywords recognised in stage and issueStatus values, per status family
+STAGE_RESOLVED = frozenset({"closed", "resolved", "completed"})
+STAGE_PENDING = frozenset({
+    "verification", "pending", "in progress", "isolation", "hold", "in queue", "assigned",
+    "investigation", "wip",
+})
+ISSUE_RESOLVED = frozenset({"done", "resolved", "closed", "completed"})
+ISSUE_PENDING = frozenset({
+    "pending", "on hold", "escalated", "waiting", "in progress", "verification", "review with engineering",
+})
+
+# One matcher for every keyword; the lookahead reports overlapping matches
+# too, e.g. both "on hold" and "hold" in "on hold"
+_KEYWORDS = sorted(STAGE_RESOLVED | STAGE_PENDING | ISSUE_RESOLVED | ISSUE_PENDING | {"open"}, key=len, reverse=True)
+_MATCHER = re.compile("(?=(" + "|".join(re.escape(keyword) for keyword in _KEYWORDS) + "))")
+
+
+def _keywords(value) -> frozenset:
+    return frozenset(_MATCHER.findall(str(value).lower()))
+
+
+def status_key(incident: dict) -> tuple:
+    """
+    The raw fields of an incident that decide its status class.
+    Args:
+        incident: An incident from the categoriser or incident APIs
+    Returns:
+        tuple: (stage, issue_status, has_resolution, status_details), the key classify_key memoises on
+    """
+    # Check stage field first (new format), then fallback to issueStatus
+    # Note: Category incidents use 'issueStatus' field, regular incidents use 'stage' field
+    stage = incident.get("stage", "") or incident.get("Stage", "")
+    issue_status = incident.get("issueStatus", "") or incident.get("IssueStatus", "")
+    resolution_note = incident.get("resolutionNote") or incident.get("resolution", "") or incident.get("Resolution", "")
+    has_resolution = bool(resolution_note) and not (isinstance(resolution_note, str) and resolution_note.isspace())
+    status_details = ""
+    if not stage and not issue_status:
+        status_details = incident.get("statusDetails") or incident.get("status", "") or incident.get("Status", "")
+    return stage, issue_status, has_resolution, status_details
+
+
+@lru_cache(maxsize=c.STATUS_CACHE_SIZE)
+def classify_key(stage: str, issue_status: str, has_resolution: bool, status_details: str = "") -> int:
+    """
+    Classify a status key as RESOLVED, PENDING or OPEN.
+    Args:
+        stage: Stage value, e.g. 'Closed', 'Verification', 'Resolution in Progress'
+        issue_status: IssueStatus value, used when stage is empty, e.g. 'Open', 'Pending', 'Resolved'
+        has_resolution: Whether the incident has a non-blank resolution note
+        status_details: statusDetails/status value, used when stage and issue_status are empty
+    Returns:
+        int: One of RESOLVED, PENDING or OPEN
+    """
+    if stage:
+        keywords = _keywords(stage)
+        if keywords & STAGE_RESOLVED:
+            return RESOLVED
+        if keywords & STAGE_PENDING:
+            return PENDING
+        # If resolution note exists, consider it resolved
+        return RESOLVED if has_resolution else OPEN
+    if issue_status:
+        keywords = _keywords(issue_status)
+        if keywords & ISSUE_RESOLVED:
+            return RESOLVED
+        if keywords & ISSUE_PENDING:
+            return PENDING
+        # "Open" with a resolution note is treated as resolved; unknown statuses default to open
+        if "open" in keywords and has_resolution:
+            return RESOLVED
+        return OPEN
+    if has_resolution:
+        return RESOLVED
+    if status_details:
+        keywords = _keywords(status_details)
+        if "resolved" in keywords:
+            return RESOLVED
+        if "pending" in keywords:
+            return PENDING
+    return OPEN
+
+
+def classify(incident: dict) -> int:
+    """Classify an incident as RESOLVED, PENDING or OPEN."""
+    return classify_key(*status_key(incident))
+
+
+def status_name(incident: dict) -> str:
+    """Classify an incident as "resolved", "pending" or "open"."""
+    return STATUSES[classify(incident)]
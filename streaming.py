@@ -0,0 +1,153 @@
+import json
+import re
+import time
+from typing import Any, AsyncIterator, Optional
+import structlog
+from langchain_core.messages import AIMessageChunk
+from telegram.error import BadRequest, RetryAfter
+
+logger = structlog.get_logger()
+
+PLACEHOLDER = "⏳ Working on it…"
+# Telegram's hard limit on message text length
+MAX_MESSAGE_CHARS = 4096
+
+# The "response" string of a ResponseFormat object that is still being generated
+_PARTIAL_RESPONSE = re.compile(r'^\s*\{\s*"response"\s*:\s*"((?:[^"\\]|\\.)*)')
+
+
+def partial_answer(text: str) -> str:
+    """
+    Readable text from a partially streamed final answer.
+    Args:
+        text: Model output so far; either plain text or the start of a {"response": "..."} object
+    Returns:
+        str: The answer text received so far
+    """
+    if not text.lstrip().startswith("{"):
+        return text
+    match = _PARTIAL_RESPONSE.match(text)
+    if not match:
+        return ""
+    escaped = match.group(1)
+    # Drop a trailing escape cut in half, e.g. a lone backslash or "\u00"
+    escaped = re.sub(r"\\(u[0-9a-fA-F]{0,3})?$", "", escaped)
+    try:
+        return json.loads(f'"{escaped}"')
+    except json.JSONDecodeError:
+        return ""
+
+
+def _is_main_agent_token(metadata: dict) -> bool:
+    """Tokens from the top-level agent's model node, not subagents or summarisation."""
+    namespace = metadata.get("langgraph_checkpoint_ns") or metadata.get("checkpoint_ns") or ""
+    return metadata.get("langgraph_node") == "model" and "|" not in namespace
+
+
+def _fit(text: str) -> str:
+    """Keep the end of over-long progress text, where the newest tokens are."""
+    if len(text) <= MAX_MESSAGE_CHARS:
+        return text
+    return "…" + text[-(MAX_MESSAGE_CHARS - 1):]
+
+
+def render_progress(tools_called: list[str], answer: str) -> str:
+    lines = [PLACEHOLDER]
+    lines.extend(f"🔧 {name}" for name in tools_called)
+    if answer:
+        lines.extend(["", answer])
+    return "\n".join(lines)
+
+
+class StreamingReply:
+    """
+    A Telegram message that is sent at once as a placeholder and then edited as the agent runs.
+
+    Progress edits are plain text and throttled to one per `interval`
+    seconds; Telegram rejects faster edits with RetryAfter, which pushes the
+    next edit back instead of failing the run.
+    """
+
+    def __init__(self, bot, chat_id: int, interval: float):
+        self.bot = bot
+        self.chat_id = chat_id
+        self.interval = interval
+        self.message = None
+        self._shown = ""
+        self._next_edit = 0.0
+        self.edits = 0
+
+    async def start(self):
+        self.message = await self.bot.send_message(chat_id=self.chat_id, text=PLACEHOLDER)
+        self._shown = PLACEHOLDER
+        self._next_edit = time.monotonic() + self.interval
+
+    async def progress(self, text: str):
+        """Show `text` unless an edit was made too recently; intermediate states may be skipped."""
+        text = _fit(text)
+        if text == self._shown or time.monotonic() < self._next_edit:
+            return
+        await self._edit(text)
+
+    async def finish(self, text: str, parse_mode: Optional[str] = None):
+        """Replace the placeholder with the final answer, falling back to a new message."""
+        try:
+            await self.bot.edit_message_text(
+                chat_id=self.chat_id, message_id=self.message.message_id, text=text, parse_mode=parse_mode
+            )
+        except BadRequest as e:
+            if "not modified" in str(e).lower():
+                return
+            logger.warning("Final edit failed, sending a new message", error=str(e))
+            await self.bot.send_message(chat_id=self.chat_id, text=text, parse_mode=parse_mode)
+
+    async def _edit(self, text: str):
+        try:
+            await self.bot.edit_message_text(
+                chat_id=self.chat_id, message_id=self.message.message_id, text=text
+            )
+            self._shown = text
+            self.edits += 1
+            self._next_edit = time.monotonic() + self.interval
+        except RetryAfter as e:
+            retry_after = e.retry_after.total_seconds() if hasattr(e.retry_after, "total_seconds") else e.retry_after
+            self._next_edit = time.monotonic() + retry_after
+        except BadRequest as e:
+            if "not modified" not in str(e).lower():
+                logger.warning("Progress edit failed", error=str(e))
+            self._next_edit = time.monotonic() + self.interval
+
+
+async def stream_to_reply(events: AsyncIterator[tuple[str, Any]], reply: StreamingReply) -> Optional[dict]:
+    """
+    Drive a StreamingReply from an agent stream.
+    Args:
+        events: agent.astream(..., stream_mode=["updates", "messages"])
+        reply: A started StreamingReply
+    Returns:
+        The structured_response of the run, or None if it produced none
+    """
+    tools_called: list[str] = []
+    message_id = None
+    text = ""
+    structured_response = None
+    async for mode, chunk in events:
+        if mode == "messages":
+            message, metadata = chunk
+            if not isinstance(message, AIMessageChunk) or not _is_main_agent_token(metadata):
+                continue
+            if message.id != message_id:
+                message_id, text = message.id, ""
+            if isinstance(message.content, str):
+                text += message.content
+        elif mode == "updates":
+            for update in chunk.values():
+                if not isinstance(update, dict):
+                    continue
+                if update.get("structured_response") is not None:
+                    structured_response = update["structured_response"]
+                messages = update.get("messages")
+                for message in messages if isinstance(messages, list) else []:
+                    tools_called.extend(call["name"] for call in getattr(message, "tool_calls", None) or [])
+        await reply.progress(render_progress(tools_called, partial_answer(text)))
+    return structured_response
@@ -0,0 +1,21 @@
+import dotenv
+
+# constants.py builds CONNECTION_STRING from these when imported; tests never connect to Postgres.
+# Values from a real .env still win.
+TEST_CONFIG = {
+    "POSTGRES_USER": "test",
+    "POSTGRES_PASSWORD": "test",
+    "POSTGRES_HOST": "localhost",
+    "POSTGRES_PORT": "5432",
+    "POSTGRES_DB": "test",
+    "TAVILY_API_KEY": "test",
+}
+
+_dotenv_values = dotenv.dotenv_values
+
+
+def _dotenv_values_with_test_config(*args, **kwargs):
+    return {**TEST_CONFIG, **_dotenv_values(*args, **kwargs)}
+
+
+dotenv.dotenv_values = _dotenv_values_with_test_config
@@ -0,0 +1,45 @@
+import asyncio
+import gc
+import cache
+
+
+def test_concurrent_misses_share_one_load():
+    calls = 0
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+
+    async def main():
+        ttl_cache = cache.TTLCache("test", ttl=60)
+        values = await asyncio.gather(*(ttl_cache.get_or_load("key", loader) for _ in range(5)))
+        return values, ttl_cache.stats()
+
+    values, stats = asyncio.run(main())
+    assert values == [1] * 5
+    assert calls == 1
+    assert (stats["misses"], stats["coalesced"]) == (1, 4)
+
+
+def test_failed_load_after_cancelled_waiter_is_retrieved():
+    unhandled = []
+
+    async def loader():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    async def main():
+        asyncio.get_running_loop().set_exception_handler(lambda loop, context: unhandled.append(context))
+        ttl_cache = cache.TTLCache("test", ttl=60)
+        waiter = asyncio.create_task(ttl_cache.get_or_load("key", loader))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.sleep(0.05)
+        gc.collect()
+        assert ttl_cache.get("key") is None
+
+    asyncio.run(main())
+    gc.collect()
+    assert unhandled == []
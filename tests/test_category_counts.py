@@ -0,0 +1,56 @@
+import asyncio
+import json
+import tools
+
+
+class FakeContent:
+    def __init__(self, body: bytes):
+        self._body = body
+
+    async def iter_chunked(self, size: int):
+        for start in range(0, len(self._body), size):
+            yield self._body[start:start + size]
+
+
+class FakeResponse:
+    def __init__(self, body: bytes):
+        self.content = FakeContent(body)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+
+class FakeSession:
+    def __init__(self, payload):
+        self.payload = payload
+        self.calls = 0
+
+    def get(self, url, params=None, timeout=None):
+        self.calls += 1
+        return FakeResponse(json.dumps(self.payload).encode())
+
+
+def count(session: FakeSession, category: str):
+    return asyncio.run(tools._count_category(session, asyncio.Semaphore(1), "prod", category))
+
+
+def test_counts_array_items():
+    tools.categoriser_cache.clear()
+    session = FakeSession([{"incidentNumber": i} for i in range(3)])
+    category, total, error, _ = count(session, "Network")
+    assert (category, total, error) == ("Network", 3, None)
+
+
+def test_error_body_is_reported_and_not_cached():
+    tools.categoriser_cache.clear()
+    session = FakeSession({"error": "index unavailable"})
+    for _ in range(2):
+        _, total, error, _ = count(session, "Storage")
+        assert (total, error) == (0, "index unavailable")
+    assert session.calls == 2
@@ -0,0 +1,102 @@
+import asyncio
+import operator
+import os
+from contextlib import asynccontextmanager
+from typing import Annotated, TypedDict
+import pytest
+from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
+from psycopg.rows import dict_row
+from psycopg_pool import AsyncConnectionPool
+from langgraph.graph import END, START, StateGraph
+import checkpoints
+
+
+@pytest.fixture(scope="module")
+def postgres_uri(tmp_path_factory):
+    """TEST_POSTGRES_URI (an empty, throwaway database) if set, otherwise a server from the pgserver package."""
+    uri = os.environ.get("TEST_POSTGRES_URI")
+    if uri:
+        yield uri
+        return
+    pgserver = pytest.importorskip("pgserver", reason="set TEST_POSTGRES_URI or install pgserver")
+    server = pgserver.get_server(tmp_path_factory.mktemp("pgdata"), cleanup_mode="stop")
+    yield server.get_uri()
+    server.cleanup()
+
+
+class State(TypedDict):
+    # A list channel, so every step writes a new blob version
+    notes: Annotated[list, operator.add]
+
+
+def build_graph(saver):
+    graph = StateGraph(State)
+    graph.add_node("note", lambda state: {"notes": [f"note {len(state['notes'])}"]})
+    graph.add_edge(START, "note")
+    graph.add_edge("note", END)
+    return graph.compile(checkpointer=saver)
+
+
+@asynccontextmanager
+async def open_saver(uri: str, pooled: bool):
+    """A saver on one connection (main.py style) or on a pool configured like db.open_pool."""
+    if not pooled:
+        async with AsyncPostgresSaver.from_conn_string(uri) as saver:
+            yield saver
+        return
+    kwargs = {"autocommit": True, "prepare_threshold": 0, "row_factory": dict_row}
+    async with AsyncConnectionPool(uri, min_size=1, max_size=4, kwargs=kwargs, open=False) as pool:
+        yield AsyncPostgresSaver(pool)
+
+
+async def count(saver, table: str, thread_id: str) -> int:
+    async with checkpoints._connection(saver) as conn:
+        cursor = await conn.execute(f"SELECT count(*) FROM {table} WHERE thread_id = %s", (thread_id,))
+        return (await cursor.fetchone())["count"]
+
+
+@pytest.mark.parametrize("pooled", [False, True], ids=["connection", "pool"])
+def test_prune_keeps_recent_checkpoints_and_drops_orphaned_blobs(postgres_uri, pooled):
+    async def main():
+        async with open_saver(postgres_uri, pooled) as saver:
+            await saver.setup()
+            graph = build_graph(saver)
+            busy = {"configurable": {"thread_id": f"busy-{pooled}"}}
+            quiet = {"configurable": {"thread_id": f"quiet-{pooled}"}}
+            for _ in range(10):
+                await graph.ainvoke({"notes": ["hi"]}, busy)
+            await graph.ainvoke({"notes": ["hi"]}, quiet)
+
+            async def totals(table: str) -> dict:
+                return {
+                    name: await count(saver, table, config["configurable"]["thread_id"])
+                    for name, config in (("busy", busy), ("quiet", quiet))
+                }
+
+            checkpoints_before, blobs_before = await totals("checkpoints"), await totals("checkpoint_blobs")
+            state_before = await graph.aget_state(busy)
+
+            result = await checkpoints.prune(saver, keep_last=2, idle_ttl=3600)
+
+            checkpoints_after, blobs_after = await totals("checkpoints"), await totals("checkpoint_blobs")
+            assert checkpoints_after == {"busy": 2, "quiet": min(checkpoints_before["quiet"], 2)}
+            assert result["checkpoints"] == sum(checkpoints_before.values()) - sum(checkpoints_after.values())
+            assert result["blobs"] == sum(blobs_before.values()) - sum(blobs_after.values())
+            assert blobs_after["busy"] < blobs_before["busy"]
+            # The newest state still loads in full
+            assert (await graph.aget_state(busy)).values == state_before.values
+
+    asyncio.run(main())
+
+
+def test_idle_threads_are_deleted(postgres_uri):
+    async def main():
+        async with AsyncPostgresSaver.from_conn_string(postgres_uri) as saver:
+            await saver.setup()
+            graph = build_graph(saver)
+            await graph.ainvoke({"notes": ["hi"]}, {"configurable": {"thread_id": "idle"}})
+            result = await checkpoints.prune(saver, keep_last=2, idle_ttl=-1)
+            assert result["idle_threads"] >= 1
+            assert await count(saver, "checkpoints", "idle") == 0
+
+    asyncio.run(main())
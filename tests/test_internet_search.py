@@ -0,0 +1,80 @@
+import asyncio
+import constants as c
+import tools
+
+
+class FakeTavilyClient:
+    """Stands in for AsyncTavilyClient, returning a canned response or raising."""
+
+    def __init__(self, response=None, error=None):
+        self.response = response
+        self.error = error
+        self.calls = []
+
+    async def search(self, query, **kwargs):
+        self.calls.append((query, kwargs))
+        if self.error is not None:
+            raise self.error
+        return self.response
+
+
+def search(monkeypatch, client, **args):
+    monkeypatch.setattr(tools, "_tavily_client", client)
+    tools.search_cache.clear()
+    return asyncio.run(tools.internet_search.ainvoke({"query": "horizon agent update", **args}))
+
+
+def test_results_are_compacted(monkeypatch):
+    client = FakeTavilyClient({
+        "query": "horizon agent update",
+        "answer": "Update the agent from the admin console.",
+        "response_time": 1.2,
+        "images": [],
+        "results": [
+            {
+                "title": "Horizon agent",
+                "url": "https://example.com/horizon",
+                "content": "word " * c.SEARCH_CONTENT_CHARS,
+                "raw_content": "page " * c.SEARCH_RAW_CONTENT_CHARS,
+                "score": 0.91,
+                "favicon": "https://example.com/favicon.ico",
+            },
+            {"title": "Release notes", "url": "https://example.com/notes", "content": "Fixed  login\nloop", "score": 0.5},
+        ],
+    })
+
+    result = search(monkeypatch, client, max_results=2, include_raw_content=True)
+
+    assert client.calls == [("horizon agent update", {"max_results": 2, "include_raw_content": True})]
+    assert set(result) == {"query", "answer", "results"}
+    first, second = result["results"]
+    assert set(first) == {"title", "url", "content", "raw_content", "score"}
+    assert first["content"].endswith("…[truncated]")
+    assert len(first["content"]) <= c.SEARCH_CONTENT_CHARS + len(" …[truncated]")
+    assert len(first["raw_content"]) <= c.SEARCH_RAW_CONTENT_CHARS + len(" …[truncated]")
+    assert second == {
+        "title": "Release notes",
+        "url": "https://example.com/notes",
+        "content": "Fixed login loop",
+        "score": 0.5,
+    }
+
+
+def test_repeated_search_is_served_from_cache(monkeypatch):
+    client = FakeTavilyClient({"query": "q", "results": []})
+    monkeypatch.setattr(tools, "_tavily_client", client)
+    tools.search_cache.clear()
+
+    async def main():
+        for _ in range(2):
+            await tools.internet_search.ainvoke({"query": "vpn drops"})
+
+    asyncio.run(main())
+    assert len(client.calls) == 1
+
+
+def test_failed_search_returns_error_and_is_not_cached(monkeypatch):
+    client = FakeTavilyClient(error=RuntimeError("quota exceeded"))
+
+    assert search(monkeypatch, client) == {"error": "quota exceeded"}
+    assert tools.search_cache.stats()["entries"] == 0
@@ -0,0 +1,153 @@
+import asyncio
+import json
+import sqlite3
+import constants as c
+import http_client
+import mirror
+
+
+class FakeContent:
+    def __init__(self, body: bytes):
+        self._body = body
+
+    async def iter_chunked(self, size: int):
+        yield self._body
+
+
+class FakeResponse:
+    def __init__(self, body: bytes):
+        self.content = FakeContent(body)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+
+class FakeSession:
+    def __init__(self):
+        self.incidents = []
+        self.params = []
+
+    def get(self, url, params=None, timeout=None):
+        self.params.append(params)
+        return FakeResponse(json.dumps(self.incidents).encode())
+
+
+def incident(request_id: int, stage: str = "New") -> dict:
+    return {
+        "requestId": request_id,
+        "record_date_timestamp": 1_790_000_000 + request_id,
+        "generatedCategory": "Network",
+        "stage": stage,
+    }
+
+
+def run_mirror(monkeypatch, tmp_path, body):
+    session = FakeSession()
+    monkeypatch.setattr(c, "MIRROR_SQLITE_PATH", str(tmp_path / "mirror.sqlite3"))
+    monkeypatch.setattr(http_client, "get_session", lambda base_url: session)
+
+    async def main():
+        mirror._db = mirror.MirrorDB("sqlite")
+        try:
+            await body(session)
+        finally:
+            mirror._db.close()
+            mirror._db = None
+            mirror._synced_at.clear()
+            mirror._full_synced_at.clear()
+            mirror._backoff_until.clear()
+
+    asyncio.run(main())
+
+
+def test_truncated_sync_is_not_fresh(monkeypatch, tmp_path):
+    monkeypatch.setattr(c, "MIRROR_FETCH_LIMIT", 2)
+
+    async def body(session):
+        session.incidents = [incident(1), incident(2)]
+        await mirror.sync_tag("AVD", full=True)
+        assert not mirror.is_fresh("AVD")
+        assert mirror._db.last_timestamp("AVD") is None
+        # Backed off instead of being re-read in full every cycle
+        assert mirror._backoff_until["AVD"] > 0
+
+    run_mirror(monkeypatch, tmp_path, body)
+
+
+def test_full_sync_picks_up_status_edits(monkeypatch, tmp_path):
+    async def body(session):
+        session.incidents = [incident(1), incident(2)]
+        await mirror.sync_tag("AVD")
+        assert mirror.is_fresh("AVD")
+
+        # An incremental sync only asks for the cursor's day onwards
+        await mirror.sync_tag("AVD")
+        assert "start_date" in session.params[-1]
+
+        session.incidents = [incident(1, stage="Closed"), incident(2)]
+        await mirror.sync_tag("AVD", full=True)
+        assert "start_date" not in session.params[-1]
+        report = await mirror.category_report("AVD", "Network", 10, generated_category="Network")
+        assert report["total"] == 2
+
+        stages = sorted(json.loads(payload)["stage"] for payload in mirror._db.payloads("AVD", 10))
+        assert stages == ["Closed", "New"]
+
+    run_mirror(monkeypatch, tmp_path, body)
+
+
+def test_mirror_needs_a_recent_full_sync(monkeypatch, tmp_path):
+    async def body(session):
+        session.incidents = [incident(1)]
+        await mirror.sync_tag("AVD")
+        assert mirror.is_fresh("AVD")
+        monkeypatch.setattr(c, "MIRROR_FULL_SYNC_INTERVAL", -c.MIRROR_MAX_AGE - 1)
+        assert not mirror.is_fresh("AVD")
+
+    run_mirror(monkeypatch, tmp_path, body)
+
+
+def test_full_sync_replaces_the_tags_rows(monkeypatch, tmp_path):
+    async def body(session):
+        session.incidents = [incident(1), incident(2), incident(3)]
+        await mirror.sync_tag("AVD", full=True)
+
+        # 2 was deleted upstream; 3 moved to another category
+        session.incidents = [incident(1), {**incident(3), "generatedCategory": "Storage"}]
+        await mirror.sync_tag("AVD", full=True)
+        assert mirror._db.count_by_category("AVD") == {"Network": 1, "Storage": 1}
+
+    run_mirror(monkeypatch, tmp_path, body)
+
+
+def test_records_without_request_id_are_kept(monkeypatch, tmp_path):
+    async def body(session):
+        without_id = {key: value for key, value in incident(2).items() if key != "requestId"}
+        session.incidents = [incident(1), without_id, {**without_id, "incidentNumber": "INC9"}]
+        for _ in range(2):
+            await mirror.sync_tag("AVD", full=True)
+            assert mirror._db.count_by_category("AVD") == {"Network": 3}
+
+    run_mirror(monkeypatch, tmp_path, body)
+
+
+def test_existing_mirror_gains_the_sync_pass_column(monkeypatch, tmp_path):
+    path = tmp_path / "mirror.sqlite3"
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE incident_mirror (tag TEXT NOT NULL, request_id TEXT NOT NULL, "
+        "record_date_timestamp DOUBLE PRECISION, generated_category TEXT, sub_category TEXT, "
+        "payload TEXT NOT NULL, PRIMARY KEY (tag, request_id))"
+    )
+    conn.close()
+    monkeypatch.setattr(c, "MIRROR_SQLITE_PATH", str(path))
+    db = mirror.MirrorDB("sqlite")
+    db.upsert("AVD", [incident(1)], 1.0, prune=True)
+    assert db.count_by_category("AVD") == {"Network": 1}
+    db.close()
@@ -0,0 +1,54 @@
+import constants as c
+import projection
+
+FIELDS = ["incidentNumber", "productType", "shortDescription", "stage", "assignedTo"]
+
+
+def test_whitelisted_fields_are_kept_in_order():
+    incident = {
+        "assignedTo": "Priya",
+        "stage": "New",
+        "shortDescription": "VM   slow",
+        "productType": "Horizon Cloud on Azure Titan",
+        "incidentNumber": "INC1",
+        "ipAddress": "10.0.0.1",
+        "rawLogs": "x" * 10_000,
+        "notes": "",
+    }
+    projected = projection.project_incident(incident, FIELDS)
+    assert list(projected) == FIELDS
+    assert projected["productType"] == "Horizon"
+    assert projected["shortDescription"] == "VM slow"
+
+
+def test_identity_fields_alone_fall_back_to_all_scalar_fields():
+    # Upstream renamed everything but the identity fields
+    incident = {
+        "incidentNumber": "INC1",
+        "productType": "AVD",
+        "summary": "Cannot log in",
+        "state": "Open",
+        "history": [{"note": "created"}],
+    }
+    projected = projection.project_incident(incident, FIELDS)
+    assert projected == {"incidentNumber": "INC1", "productType": "AVD", "summary": "Cannot log in", "state": "Open"}
+
+
+def test_long_text_is_truncated_and_verbose_keeps_it():
+    incident = {"incidentNumber": "INC1", "shortDescription": "a " * c.INCIDENT_TEXT_CHARS, "stage": "New"}
+    assert projection.project_incident(incident, FIELDS)["shortDescription"].endswith("…[truncated]")
+    assert projection.project_incident(incident, FIELDS, verbose=True) == incident
+
+
+def test_verbose_and_disabled_projection_return_the_upstream_record(monkeypatch):
+    incident = {
+        "incidentNumber": "INC1",
+        "productType": "Horizon Cloud on Azure Titan",
+        "shortDescription": "a " * c.INCIDENT_TEXT_CHARS,
+        "notes": "",
+    }
+    upstream = dict(incident)
+    assert projection.project_incident(incident, FIELDS, verbose=True) == upstream
+    monkeypatch.setattr(c, "INCIDENT_PROJECTION", False)
+    assert projection.project_incident(incident, FIELDS) == upstream
+    assert incident == upstream
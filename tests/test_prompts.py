@@ -0,0 +1,63 @@
+import asyncio
+from datetime import date
+from types import SimpleNamespace
+from langchain.agents.middleware import ModelRequest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import HumanMessage, SystemMessage
+from langgraph.store.memory import InMemoryStore
+import memories
+import prompts
+
+STATIC_PROMPT = SystemMessage(content=[
+    {"type": "text", "text": "You are an incident analyst."},
+    {"type": "text", "text": "## Filesystem Tools\n\nUse ls, read_file and write_file."},
+])
+
+
+def system_prompt_for_turn(monkeypatch, store, today, user_name, question) -> SystemMessage:
+    class FixedDate(date):
+        @classmethod
+        def today(cls):
+            return today
+
+    monkeypatch.setattr(prompts, "date", FixedDate)
+    monkeypatch.setattr(prompts, "_user_name", lambda: user_name)
+    request = ModelRequest(
+        model=FakeListChatModel(responses=["ok"]),
+        messages=[HumanMessage(question)],
+        system_message=STATIC_PROMPT,
+        runtime=SimpleNamespace(store=store),
+    )
+    seen = []
+
+    async def handler(request):
+        seen.append(request.system_message)
+
+    asyncio.run(prompts.TurnContextMiddleware().awrap_model_call(request, handler))
+    return seen[0]
+
+
+def test_static_prefix_is_byte_identical_across_turns(monkeypatch):
+    monkeypatch.setattr(memories, "namespace", lambda: (memories.NAMESPACE,))
+    memories.file_cache.clear()
+    store = InMemoryStore()
+
+    first = system_prompt_for_turn(monkeypatch, store, date(2026, 10, 1), "Asha", "How many AVD incidents?")
+    store.put((memories.NAMESPACE,), "/user_preferences.txt", {"content": ["Prefers tables"]})
+    memories.file_cache.clear()
+    second = system_prompt_for_turn(monkeypatch, store, date(2026, 10, 2), "Ravi", "Show INC1")
+
+    static_blocks = list(STATIC_PROMPT.content_blocks)
+    for message in (first, second):
+        blocks = message.content_blocks
+        assert blocks[:-1] == static_blocks
+        assert blocks[-1]["text"].startswith("\n\n" + prompts.CONTEXT_HEADING)
+    assert first.content_blocks[-1] != second.content_blocks[-1]
+
+    # The serialised prompt up to the context block is the same bytes on every turn
+    prefix = "".join(block["text"] for block in static_blocks).encode()
+    for message, per_turn in ((first, ["2026-10-01", "Asha"]), (second, ["2026-10-02", "Ravi", "Prefers tables"])):
+        text = "".join(block["text"] for block in message.content_blocks).encode()
+        assert text.startswith(prefix)
+        tail = text[len(prefix):].decode()
+        assert all(value in tail for value in per_turn)
@@ -0,0 +1,62 @@
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+import routing
+
+
+def after_tools(*names: str) -> list:
+    calls = [{"name": name, "args": {}, "id": f"call_{i}"} for i, name in enumerate(names)]
+    return [
+        HumanMessage("How are AVD incidents looking?"),
+        AIMessage("", tool_calls=calls),
+        *(ToolMessage("{}", tool_call_id=call["id"]) for call in calls),
+    ]
+
+
+@pytest.mark.parametrize("names", [
+    ("count_all_incidents",),
+    ("get_incidents_by_category",),
+    ("count_all_incidents", "get_incidents_by_category"),
+])
+def test_count_and_report_results_go_to_mini(names):
+    assert routing.classify(after_tools(*names)) == (routing.MINI, "tool_summary")
+
+
+@pytest.mark.parametrize("names", [
+    ("get_incident_details_by_incident_number",),
+    ("get_incident_details_by_incident_numbers",),
+    ("get_sop_for_issue",),
+    ("internet_search",),
+    ("count_all_incidents", "get_incident_details_by_incident_number"),
+])
+def test_results_that_need_reasoning_stay_large(names):
+    assert routing.classify(after_tools(*names)) == (routing.LARGE, "reasoning")
+
+
+def test_small_talk_goes_to_nano():
+    assert routing.classify([HumanMessage("thanks!")]) == (routing.NANO, "small_talk")
+
+
+def memory_write(content: str = "") -> list:
+    call = {"name": "write_file", "args": {"file_path": "/memories/user_preferences.txt"}, "id": "call_mem"}
+    return [AIMessage(content, tool_calls=[call]), ToolMessage("ok", tool_call_id="call_mem")]
+
+
+def test_memory_write_mid_task_stays_large():
+    messages = [
+        *after_tools("count_all_incidents"),
+        *memory_write(),
+    ]
+    assert routing.classify(messages) == (routing.LARGE, "reasoning")
+
+
+def test_memory_write_after_the_answer_goes_to_mini():
+    answered_in_same_message = [HumanMessage("Call me Sam"), *memory_write("Sure, Sam.")]
+    assert routing.classify(answered_in_same_message) == (routing.MINI, "memory_bookkeeping")
+
+    answered_earlier = [HumanMessage("Call me Sam"), AIMessage("Sure, Sam."), *memory_write()]
+    assert routing.classify(answered_earlier) == (routing.MINI, "memory_bookkeeping")
+
+
+def test_answer_from_an_earlier_turn_does_not_count():
+    messages = [HumanMessage("hi"), AIMessage("Hello!"), HumanMessage("Remember I use AVD"), *memory_write()]
+    assert routing.classify(messages) == (routing.LARGE, "reasoning")
@@ -0,0 +1,80 @@
+import asyncio
+import uuid
+from types import SimpleNamespace
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, LLMResult
+import constants as c
+import scheduler
+
+
+def test_limit_headers_resize_budgets_both_ways():
+    deployment = scheduler.DeploymentScheduler("test", rpm=300, tpm=50_000)
+    deployment.observe(200, {
+        "x-ratelimit-limit-requests": "1000",
+        "x-ratelimit-limit-tokens": "450000",
+        "x-ratelimit-remaining-requests": "990",
+        "x-ratelimit-remaining-tokens": "420000",
+    })
+    stats = deployment.stats()
+    assert (stats["rpm"], stats["tpm"]) == (1000, 450_000)
+    assert stats["tokens_left"] >= 420_000
+
+    deployment.observe(200, {"X-RateLimit-Limit-Tokens": "30000"})
+    assert deployment.stats()["tpm"] == 30_000
+    assert deployment.stats()["tokens_left"] <= 30_000
+
+
+def test_remaining_header_raises_the_level():
+    deployment = scheduler.DeploymentScheduler("test", rpm=300, tpm=50_000)
+    deployment.tokens.take(45_000)
+    deployment.observe(200, {"x-ratelimit-remaining-tokens": "40000"})
+    assert deployment.stats()["tokens_left"] >= 40_000
+
+
+def test_rate_limited_response_pauses_the_deployment():
+    deployment = scheduler.DeploymentScheduler("test", rpm=300, tpm=50_000)
+    deployment.observe(429, {"retry-after": "7"})
+    stats = deployment.stats()
+    assert stats["rate_limited"] == 1
+    assert 6 < stats["paused_for_s"] <= 7
+
+
+def test_callback_settles_usage():
+    deployment = scheduler.DeploymentScheduler("test", rpm=300, tpm=50_000)
+    callback = scheduler.SchedulerCallback(deployment)
+    run_id = uuid.uuid4()
+    message = AIMessage("done", usage_metadata={"input_tokens": 900, "output_tokens": 100, "total_tokens": 1000})
+
+    async def main():
+        await deployment.acquire("user", scheduler.INTERACTIVE, 5000, run_id)
+        await callback.on_llm_end(LLMResult(generations=[[ChatGeneration(message=message)]]), run_id=run_id)
+        await deployment.stop()
+
+    asyncio.run(main())
+    stats = deployment.stats()
+    assert stats["in_flight"] == 0
+    assert stats["tokens_left"] >= 49_000
+
+
+def test_http_client_reports_every_response():
+    deployment = scheduler.DeploymentScheduler("test", rpm=300, tpm=50_000)
+    client = scheduler.http_client(deployment)
+    (observe,) = client.event_hooks["response"]
+
+    async def main():
+        await observe(SimpleNamespace(status_code=429, headers={"retry-after-ms": "10"}))
+        await observe(SimpleNamespace(status_code=200, headers={"x-ratelimit-limit-tokens": "450000"}))
+        await client.aclose()
+
+    asyncio.run(main())
+    stats = deployment.stats()
+    assert stats["rate_limited"] == 1
+    assert stats["tpm"] == 450_000
+
+
+def test_scheduler_off_leaves_models_untouched(monkeypatch):
+    monkeypatch.setattr(c, "SCHEDULER", True)
+    kwargs = scheduler.model_kwargs("LARGE_MODEL")
+    assert set(kwargs) == {"rate_limiter", "callbacks", "http_async_client"}
+    monkeypatch.setattr(c, "SCHEDULER", False)
+    assert scheduler.model_kwargs("LARGE_MODEL") == {}
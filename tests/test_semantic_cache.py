@@ -0,0 +1,40 @@
+import numpy as np
+import semantic_cache
+
+
+def unit(*values: float) -> np.ndarray:
+    vector = np.array(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def expire(cache: semantic_cache.SemanticCache, query: str):
+    cache._stored_at[cache._rows[cache.normalise(query)]] -= cache.ttl + 1
+
+
+def test_similar_query_hits_and_dissimilar_misses():
+    cache = semantic_cache.SemanticCache("test", threshold=0.9, max_entries=4, ttl=60)
+    cache.add("vpn keeps dropping", unit(1, 0, 0), "vpn sop")
+    assert cache.lookup(unit(1, 0.1, 0))[0] == "vpn sop"
+    assert cache.lookup(unit(0, 1, 0)) == (None, 0.0)
+
+
+def test_expired_best_match_does_not_hide_a_fresh_one():
+    cache = semantic_cache.SemanticCache("test", threshold=0.9, max_entries=4, ttl=60)
+    cache.add("vpn keeps dropping", unit(1, 0, 0), "stale sop")
+    cache.add("vpn drops every hour", unit(1, 0.2, 0), "fresh sop")
+    expire(cache, "vpn keeps dropping")
+    value, similarity = cache.lookup(unit(1, 0, 0))
+    assert value == "fresh sop"
+    assert similarity >= 0.9
+
+
+def test_full_cache_reuses_expired_rows_before_evicting():
+    cache = semantic_cache.SemanticCache("test", threshold=0.9, max_entries=2, ttl=60)
+    cache.add("first", unit(1, 0, 0), 1)
+    cache.add("second", unit(0, 1, 0), 2)
+    expire(cache, "second")
+    cache.add("third", unit(0, 0, 1), 3)
+    assert cache.get_exact("first") == 1
+    assert cache.get_exact("second") is None
+    assert cache.get_exact("third") == 3
+    assert cache.stats()["evictions"] == 0
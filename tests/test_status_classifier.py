@@ -0,0 +1,62 @@
+import pytest
+import status_classifier as sc
+
+# Incidents and the status the classifier in reports.py gave them before status_classifier.py existed
+BASELINE_CASES = [
+    ({"stage": "Closed"}, "resolved"),
+    ({"stage": "Resolved - Verified"}, "resolved"),
+    ({"stage": "Completed"}, "resolved"),
+    # "Done" was compared against the lower-cased stage, so it never matched
+    ({"stage": "Done"}, "open"),
+    ({"stage": "Done", "resolutionNote": "fixed"}, "resolved"),
+    ({"stage": "Verification"}, "pending"),
+    ({"stage": "Resolution in Progress"}, "pending"),
+    ({"stage": "On Hold"}, "pending"),
+    ({"stage": "In Queue"}, "pending"),
+    ({"stage": "Assigned"}, "pending"),
+    ({"stage": "WIP"}, "pending"),
+    ({"stage": "New"}, "open"),
+    ({"stage": "New", "resolutionNote": "Rebooted VM"}, "resolved"),
+    ({"stage": "New", "resolutionNote": "   "}, "open"),
+    ({"Stage": "closed"}, "resolved"),
+    ({"issueStatus": "Done"}, "resolved"),
+    ({"issueStatus": "Resolved"}, "resolved"),
+    ({"issueStatus": "Closed"}, "resolved"),
+    ({"issueStatus": "Pending"}, "pending"),
+    ({"issueStatus": "On Hold"}, "pending"),
+    ({"issueStatus": "Escalated"}, "pending"),
+    ({"issueStatus": "Waiting for Customer"}, "pending"),
+    ({"issueStatus": "Review with Engineering"}, "pending"),
+    ({"issueStatus": "Open"}, "open"),
+    ({"issueStatus": "Open", "resolution": "Reset password"}, "resolved"),
+    ({"issueStatus": "Reopened"}, "open"),
+    ({"issueStatus": "Unknown"}, "open"),
+    ({"IssueStatus": "pending"}, "pending"),
+    ({"stage": "Closed", "issueStatus": "Open"}, "resolved"),
+    ({"stage": "New", "issueStatus": "Resolved"}, "open"),
+    ({"resolutionNote": "Cleared cache"}, "resolved"),
+    ({"statusDetails": "Resolved by user"}, "resolved"),
+    ({"status": "Pending approval"}, "pending"),
+    ({"Status": "Active"}, "open"),
+    ({}, "open"),
+]
+
+
+@pytest.mark.parametrize("incident,expected", BASELINE_CASES)
+def test_status_matches_baseline(incident, expected):
+    assert sc.status_name(incident) == expected
+
+
+def test_classify_key_is_memoised():
+    sc.classify_key.cache_clear()
+    for _ in range(3):
+        sc.classify({"stage": "Verification"})
+    info = sc.classify_key.cache_info()
+    assert (info.misses, info.hits) == (1, 2)
+
+
+def test_equal_keys_share_a_cache_entry():
+    # Fields that don't decide the status must not split the cache
+    first = {"issueStatus": "Open", "description": "VM slow", "requestId": 1}
+    second = {"issueStatus": "Open", "description": "Cannot log in", "requestId": 2}
+    assert sc.status_key(first) == sc.status_key(second)
@@ -1,27 +1,130 @@
 from typing import Optional, Literal
-import requests
 from datetime import datetime,timedelta
 from constants import INGESTER_URL
-from tavily import TavilyClient
+from tavily import AsyncTavilyClient
 from constants import URL, INGESTER_URL
 import constants as c
 import os
-import json
+import time
 import asyncio
 import aiohttp
+import numpy as np
 import structlog
 from langchain.tools import tool
+import http_client
+import json_stream
+import cache
+import semantic_cache
+import reports
+import workers
+import mirror
+import projection
+import llm as l
 logger = structlog.get_logger()
 
+# Shared by count_all_incidents and get_incidents_by_category
+categoriser_cache = cache.TTLCache(
+    "categoriser",
+    ttl=c.CATEGORISER_CACHE_TTL,
+    stale_ttl=c.CATEGORISER_CACHE_STALE_TTL,
+    max_bytes=c.CATEGORISER_CACHE_MAX_BYTES,
+)
+
+# SOP results keyed by query meaning, so rephrased questions skip /sop/search
+sop_cache = semantic_cache.SemanticCache(
+    "sop",
+    threshold=c.SOP_CACHE_THRESHOLD,
+    max_entries=c.SOP_CACHE_MAX_ENTRIES,
+    ttl=c.SOP_CACHE_TTL,
+)
+
+# Short-lived: incident state changes, but one conversation often looks the same incident up repeatedly
+incident_cache = cache.TTLCache(
+    "incident_details",
+    ttl=c.INCIDENT_CACHE_TTL,
+    max_bytes=c.INCIDENT_CACHE_MAX_BYTES,
+)
+
+
+def _incident_key(incident_number: str, environment_type: str) -> tuple:
+    return cache.make_key(
+        "getIncidentDetails", incident_number=incident_number, environment_type=environment_type
+    )
+
+
+async def _post_incident_details(environment_type: str, filters: list[dict]) -> dict:
+    """POST /getIncidentDetails with the given filter list and return the decoded response."""
+    url = f"{URL}/getIncidentDetails"
+    headers = {
+        "UserName": "rgoNEXoN",
+        "Password": "ZvFiumvAJgdGVYc",
+        "Content-Type": "application/json",
+    }
+
+    payload = {
+        "clientName": "",
+        "environmentType": environment_type,
+        "engineerUserId": 4036,
+        "allIncidentDetails": False,
+        "pageNumber": 1,
+        "pageSize": c.INCIDENT_BATCH_SIZE,
+        "botAssigned": 0,
+        "assignedTo": 0,
+        "filter": filters,
+    }
+
+    session = http_client.get_session(URL)
+    async with session.post(
+        url, headers=headers, json=payload, timeout=30
+    ) as resp:
+        resp.raise_for_status()
+        return await resp.json()
+
+
+async def _fetch_incident_details(incident_number: str, environment_type: str) -> dict:
+    """Fetch one incident; raises on failure so errors are never cached."""
+    resp = await _post_incident_details(
+        environment_type, [{"field": "incidentNumber", "value": incident_number}]
+    )
+    if not resp.get("data"):
+        raise LookupError(f"Incident {incident_number} not found")
+    return resp
+
+
+async def _fetch_incident_batch(incident_numbers: list[str], environment_type: str) -> dict[str, dict]:
+    """
+    Fetch up to INCIDENT_BATCH_SIZE incidents in one request.
+    Returns:
+        dict: incident number -> incident, for the requested incidents the response contained
+    """
+    resp = await _post_incident_details(
+        environment_type,
+        [{"field": "incidentNumber", "value": number} for number in incident_numbers],
+    )
+    wanted = set(incident_numbers)
+    found = {}
+    for incident in resp.get("data") or []:
+        number = incident.get("incidentNumber")
+        if number in wanted:
+            found[number] = incident
+    return found
+
+
+def invalidate_incident_details(incident_number: str, environment_type: str = "daas"):
+    """Forget the cached details of an incident, e.g. after it has been updated."""
+    incident_cache.invalidate(_incident_key(incident_number, environment_type))
+
+
 @tool
 async def get_incident_details_by_incident_number(
-    incident_number: str, environment_type: str = "daas"
+    incident_number: str, environment_type: str = "daas", verbose: bool = False
 ) -> dict:
     """
     Get incident details by incident number from the ingester API.
     Args:
         incident_number: The incident number to get details for
         environment_type: The environment type to get details for
+        verbose: Return every field of the incident untruncated; only when the user asks for the full record
     Returns:
         dict: The incident details
     Example:
@@ -29,44 +132,167 @@ async def get_incident_details_by_incident_number(
     Note:
         Use this to retrieve the details of a specific incident.
     """
-    url = f"{URL}/getIncidentDetails"
-    headers = {
-        "UserName": "rgoNEXoN",
-        "Password": "ZvFiumvAJgdGVYc",
-        "Content-Type": "application/json",
+    key = _incident_key(incident_number, environment_type)
+    try:
+        resp = await incident_cache.get_or_load(
+            key, lambda: _fetch_incident_details(incident_number, environment_type)
+        )
+        return projection.project_incident(resp["data"][0], c.INCIDENT_DETAIL_FIELDS, verbose)
+    except aiohttp.ClientError as e:
+        return {"error": str(e)}
+    except Exception as e:
+        return {"error": str(e)}
+
+@tool
+async def get_incident_details_by_incident_numbers(
+    incident_numbers: list[str], environment_type: str = "daas", verbose: bool = False
+) -> dict:
+    """
+    Get the details of several incidents at once from the ingester API.
+    Args:
+        incident_numbers: The incident numbers to get details for
+        environment_type: The environment type to get details for
+        verbose: Return every field of each incident untruncated; only when the user asks for full records
+    Returns:
+        dict: incidents (incident number -> details), errors (incident number -> reason) and counts
+    Example:
+        get_incident_details_by_incident_numbers(incident_numbers=["INC2301202600003", "INC2301202600004"], environment_type="daas")
+    Note:
+        Use this instead of repeated get_incident_details_by_incident_number calls when
+        the user mentions more than one incident.
+    """
+    numbers = list(dict.fromkeys(number.strip() for number in incident_numbers if number and number.strip()))
+    incidents, errors = {}, {}
+    started = time.perf_counter()
+
+    missing = []
+    for number in numbers:
+        cached = incident_cache.get(_incident_key(number, environment_type))
+        if cached is not None:
+            incidents[number] = cached["data"][0]
+        else:
+            missing.append(number)
+
+    semaphore = asyncio.Semaphore(c.INCIDENT_DETAILS_CONCURRENCY)
+
+    async def fetch_batch(batch: list[str]) -> dict[str, dict]:
+        async with semaphore:
+            try:
+                return await _fetch_incident_batch(batch, environment_type)
+            except Exception as e:
+                logger.warning("Batch incident lookup failed", size=len(batch), error=str(e))
+                return {}
+
+    batches = [
+        missing[i:i + c.INCIDENT_BATCH_SIZE] for i in range(0, len(missing), c.INCIDENT_BATCH_SIZE)
+    ]
+    for found in await asyncio.gather(*(fetch_batch(batch) for batch in batches)):
+        for number, incident in found.items():
+            incident_cache.set(_incident_key(number, environment_type), {"data": [incident]})
+            incidents[number] = incident
+
+    # Anything the batch request did not return is looked up on its own
+    async def fetch_one(number: str):
+        async with semaphore:
+            try:
+                resp = await incident_cache.get_or_load(
+                    _incident_key(number, environment_type),
+                    lambda: _fetch_incident_details(number, environment_type),
+                )
+                incidents[number] = resp["data"][0]
+            except Exception as e:
+                errors[number] = str(e)
+
+    remainder = [number for number in missing if number not in incidents]
+    await asyncio.gather(*(fetch_one(number) for number in remainder))
+
+    logger.info(
+        "Batch incident lookup",
+        requested=len(numbers),
+        cached=len(numbers) - len(missing),
+        batched=len(missing) - len(remainder),
+        single=len(remainder),
+        latency_ms=round((time.perf_counter() - started) * 1000, 1),
+    )
+    return {
+        "incidents": {
+            number: projection.project_incident(incidents[number], c.INCIDENT_SUMMARY_FIELDS, verbose)
+            for number in numbers
+            if number in incidents
+        },
+        "errors": errors,
+        "requested": len(numbers),
+        "found": len(incidents),
     }
 
-    payload = {
-        "clientName": "",
-        "environmentType": environment_type,
-        "engineerUserId": 4036,
-        "allIncidentDetails": False,
-        "pageNumber": 1,
-        "pageSize": 100,
-        "botAssigned": 0,
-        "assignedTo": 0,
-        "filter": [{"field": "incidentNumber", "value": incident_number}],
+CATEGORIES = [
+    "Application Management",
+    "Hardware & Devices",
+    "Email & Communication",
+    "Network & Performance",
+    "Access & Security",
+    "Installation & Configuration",
+    "File & Shared Resources",
+    "Server & Infrastructure",
+    "Feedback",
+    "Others"
+]
+
+TAGS = {
+    "horizon": "horizon",
+    "avd": "AVD",
+    "ws1": "ws1",
+    "citrix": "citrix",
+}
+
+
+def _tag_params(tag: str) -> dict:
+    """Map the tool-facing tag to the categoriser `tag` query parameter (empty for "all")."""
+    if tag in TAGS:
+        return {"tag": TAGS[tag]}
+    return {}
+
+
+def _mirror_tag(tag: str) -> str:
+    """Mirror partition holding the incidents a categoriser search with this tag would return."""
+    return TAGS.get(tag, "all")
+
+
+async def _count_category(
+    session: aiohttp.ClientSession, semaphore: asyncio.Semaphore, tag: str, category: str
+) -> tuple[str, int, Optional[str], float]:
+    """Count one category by streaming the result array and discarding every record."""
+    params = {
+        **_tag_params(tag),
+        "query": "",
+        "generated_category": category,
+        "limit": 100000,
     }
+    async def load() -> int:
+        async with semaphore:
+            async with session.get(
+                f"{INGESTER_URL}/categoriser/search", params=params, timeout=120
+            ) as response:
+                response.raise_for_status()
+                return await json_stream.count_array_items(
+                    response.content.iter_chunked(json_stream.CHUNK_SIZE)
+                )
+
+    started = time.perf_counter()
+    try:
+        count = await categoriser_cache.get_or_load(cache.make_key("count", **params), load)
+        error = None
+    except json_stream.NotAJSONArray as e:
+        # Upstream answered with an error object instead of the result array
+        upstream_error = e.value.get("error") if isinstance(e.value, dict) else None
+        logger.error("Failed to query category", category=category, error=upstream_error or str(e))
+        count, error = 0, str(upstream_error or e)
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+        logger.error("Failed to query category", category=category, error=str(e))
+        count, error = 0, str(e) or type(e).__name__
+    latency_ms = round((time.perf_counter() - started) * 1000, 1)
+    return category, count, error, latency_ms
 
-    async with aiohttp.ClientSession() as session:
-        try:
-            async with session.post(
-                url, headers=headers, json=payload, timeout=30
-            ) as resp:
-                resp.raise_for_status()
-                resp = await resp.json()
-                incident = resp.get("data", [{}])[0]
-                del incident["ipAddress"]
-                if incident.get('productType') == 'Horizon Cloud on Azure Titan':
-                    productType = 'Horizon'
-                else:
-                    productType = incident.get('productType', 'N/A')
-                return resp
-            return {"error": "Failed to get incident details"}
-        except aiohttp.ClientError as e:
-            return {"error": str(e)}
-        except Exception as e:
-            return {"error": str(e)}
 
 @tool
 async def count_all_incidents(
@@ -75,7 +301,8 @@ async def count_all_incidents(
     """
     Get incident counts for all generated categories.
     
-    Makes separate API calls for each category using the category filter parameter.
+    Queries every category concurrently; a failed category counts as 0 and is
+    reported under "errors" so the remaining counts are still usable.
     
     Returns:
         dict: Counts for each category
@@ -86,64 +313,57 @@ async def count_all_incidents(
                     "Hardware & Devices": 234,
                     "Email & Communication": 189,
                     ...
-                }
+                },
+                "latency_ms": {"Application Management": 812.4, ...},
+                "errors": {"Feedback": "timeout"},
+                "partial": True
             }
     """
-    categories = [
-        "Application Management",
-        "Hardware & Devices",
-        "Email & Communication",
-        "Network & Performance",
-        "Access & Security",
-        "Installation & Configuration",
-        "File & Shared Resources",
-        "Server & Infrastructure",
-        "Feedback",
-        "Others"
-    ]
-    if tag == "horizon":
-        url = f"{INGESTER_URL}/categoriser/search?tag=horizon"
-    elif tag == "avd":
-        url = f"{INGESTER_URL}/categoriser/search?tag=AVD"
-    elif tag == "ws1":
-        url = f"{INGESTER_URL}/categoriser/search?tag=ws1"
-    elif tag == "citrix":
-        url = f"{INGESTER_URL}/categoriser/search?tag=citrix"
-    else:
-        url = f"{INGESTER_URL}/categoriser/search"
-    category_counts = {}
-    total_count = 0
-    #print(f"@@Tag: {tag}")
-    #print(f"@@: {url}")
-    # Query each category separately
-    for category in categories:
-        params = {
-            "query":"",
-            "generated_category": category,
-            "limit": 100000
-        }
-        
+    if mirror.is_fresh(_mirror_tag(tag)):
+        started = time.perf_counter()
         try:
-            response = requests.get(url, params=params, timeout=120)
-            response.raise_for_status()
-            results = response.json()
-            #print("Parrams",params)
-            #print("Results",results)
-            count = len(results) if isinstance(results, list) else 0
-            category_counts[category] = count
-            total_count += count
-            # logger.info(f"Category '{category}' count: {count}")
-            #print(f"Category '{category}' count: {count}")
-        except requests.exceptions.RequestException as e:
-            # logger.error(f"Failed to query category {category}", error=str(e))
-            #print(f"Failed to query category {category} error {str(e)}")
-            category_counts[category] = 0
-    
+            counts = await mirror.count_by_category(_mirror_tag(tag))
+        except Exception as e:
+            logger.warning("Incident mirror count failed", error=str(e))
+        else:
+            latency_ms = round((time.perf_counter() - started) * 1000, 1)
+            category_counts = {category: counts.get(category, 0) for category in CATEGORIES}
+            return {
+                "total": sum(category_counts.values()),
+                "by_category": category_counts,
+                "latency_ms": {category: latency_ms for category in CATEGORIES},
+                "errors": {},
+                "partial": False
+            }
+
+    session = http_client.get_session(INGESTER_URL)
+    semaphore = asyncio.Semaphore(c.COUNT_CONCURRENCY)
+    results = await asyncio.gather(
+        *(_count_category(session, semaphore, tag, category) for category in CATEGORIES)
+    )
+
+    category_counts = {}
+    latencies = {}
+    errors = {}
+    for category, count, error, latency_ms in results:
+        category_counts[category] = count
+        latencies[category] = latency_ms
+        if error:
+            errors[category] = error
+
     return {
-        "total": total_count,
-        "by_category": category_counts
+        "total": sum(category_counts.values()),
+        "by_category": category_counts,
+        "latency_ms": latencies,
+        "errors": errors,
+        "partial": bool(errors)
     }
 
+def _embed_query(query: str) -> list[float]:
+    # Runs on a thread: the first call loads the embedding model
+    return l.get_model("HF_EMBEDDING_MODEL").embed_query(query)
+
+
 @tool
 async def get_sop_for_issue(query: str) -> dict:
     """
@@ -173,10 +393,24 @@ async def get_sop_for_issue(query: str) -> dict:
         "historic_resolution_data": None,
         "web_data": None
     }
+
+    cached = sop_cache.get_exact(query)
+    if cached is not None:
+        return cached
+    vector = None
+    try:
+        # Embedding is CPU-bound and the model lives in this process, so use a thread rather than workers
+        vector = np.asarray(await asyncio.to_thread(_embed_query, query), dtype=np.float32)
+        cached, similarity = sop_cache.lookup(vector)
+        if cached is not None:
+            logger.info("SOP served from semantic cache", similarity=round(similarity, 3))
+            return cached
+    except Exception as e:
+        logger.warning("SOP query embedding failed", error=str(e))
  
     try:
-        async with aiohttp.ClientSession() as session:
-            response = await session.get(sop_url, params=params, timeout=30)
+        session = http_client.get_session(INGESTER_URL)
+        async with session.get(sop_url, params=params, timeout=30) as response:
             response.raise_for_status()
             raw_data = await response.json()
             response_data["sop_data"] = raw_data
@@ -192,6 +426,8 @@ async def get_sop_for_issue(query: str) -> dict:
     except asyncio.TimeoutError:
         logger.error("Request timed out")
         # return {"error": "Request timed out"}
+    if response_data["sop_data"] is not None and vector is not None:
+        sop_cache.add(query, vector, response_data)
     return response_data
 
 
@@ -246,24 +482,12 @@ async def get_incidents_by_category(
     """
     #print(f"inside get_incidents_by_category")
     #print(f"parameters: query: {query}, limit: {limit}, category: {category}, sub_category: {sub_category}, start_date: {start_date}, end_date: {end_date}, generated_category: {generated_category}, tag: {tag}")
-    if tag == "horizon":
-        url = f"{INGESTER_URL}/categoriser/search?tag=horizon"
-    elif tag == "avd":
-        url = f"{INGESTER_URL}/categoriser/search?tag=AVD"
-    elif tag == "ws1":
-        url = f"{INGESTER_URL}/categoriser/search?tag=ws1"
-    elif tag == "citrix":
-        url = f"{INGESTER_URL}/categoriser/search?tag=citrix"
-    else:
-        url = f"{INGESTER_URL}/categoriser/search"
-    
     # Build params dict, only include non-None values
     params = {
+        **_tag_params(tag),
         "query": query,
         "limit": limit
     }
-    #print(f"@@Tag for specific category: {tag}")
-    #print(f"@@URL for specific category: {url}")
     if category:
         params["category"] = category
     if generated_category:
@@ -282,517 +506,114 @@ async def get_incidents_by_category(
     # if not start_date and not end_date:
     #     params["start_date"] = (datetime.now() - timedelta(days=30)).strftime("%Y-%m-%d")
     #     params["end_date"] = datetime.now().strftime("%Y-%m-%d")
-    if "start_date" in params:
-        ...
-        #print("Start date", params["start_date"])
-    if "end_date" in params:
-        ...
-        #print("End date", params["end_date"])
-    try:
-        #print("Params from get_incidents_by_category", params)
-        response = requests.get(url, params=params, timeout=120)
-        response.raise_for_status()
-        incidents = response.json()
-        #print("Response from get_incidents_by_category", incidents)
-        # Handle error response
-        if isinstance(incidents, dict) and "error" in incidents:
-            return incidents
-        
-        # Ensure incidents is a list
-        if not isinstance(incidents, list):
-            incidents = []
-        
-        # Calculate priority breakdown if priority field exists in incidents
-        by_priority = {}
-        if incidents and isinstance(incidents[0], dict):
-            # Check if priority field exists
-            if "priority" in incidents[0]:
-                for incident in incidents:
-                    priority = incident.get("priority", "Unknown")
-                    by_priority[priority] = by_priority.get(priority, 0) + 1
-            # If no priority field, set default empty dict
-            # ResponseAgent will handle this gracefully
-        
-        # Calculate ageing analysis and subcategory status for charts
-        ageing_counts = {"0-7": 0, "8-14": 0, "15-30": 0, "30+": 0}
-        subcategory_status = {}  # {subcategory: {"resolved": 0, "pending": 0, "open": 0}}
-        current_date = datetime.now()
-        
-        for incident in incidents:
-            # Calculate ageing from created_at or created_at_timestamp
-            # Try multiple field names to support different data formats
-            created_date_value = (
-                incident.get("created_at_timestamp") or 
-                incident.get("created_at") or 
-                incident.get("createdDate") or 
-                incident.get("created_date")
-            )
-            days_old = 0  # Default to 0-7 days
-            
-            if created_date_value:
-                try:
-                    # Handle different date formats
-                    if isinstance(created_date_value, (int, float)):
-                        # It's a timestamp (Unix timestamp)
-                        created_date = datetime.fromtimestamp(created_date_value)
-                        days_old = (current_date - created_date).days
-                    elif isinstance(created_date_value, str):
-                        # It's a string - try to parse it
-                        # ISO format: "2025-07-21T10:27:57.93Z" or "2025-11-20T15:55:10.22Z"
-                        if "T" in created_date_value:
-                            # ISO format with time
-                            try:
-                                # Remove microseconds and timezone for simpler parsing
-                                date_str = created_date_value.split("T")[0]  # Get "YYYY-MM-DD"
-                                if len(date_str) == 10 and date_str[4] == '-' and date_str[7] == '-':
-                                    year, month, day = int(date_str[0:4]), int(date_str[5:7]), int(date_str[8:10])
-                                    created_date = datetime(year, month, day)
-                                    days_old = (current_date - created_date).days
-                                else:
-                                    # Try full ISO parsing
-                                    created_date = datetime.fromisoformat(created_date_value.replace("Z", "+00:00").split(".")[0])
-                                    days_old = (current_date - created_date.replace(tzinfo=None)).days
-                            except (ValueError, AttributeError, IndexError):
-                                # Fallback: try to extract date part
-                                date_part = created_date_value[:10] if len(created_date_value) >= 10 else created_date_value
-                                if len(date_part) == 10 and date_part[4] == '-' and date_part[7] == '-':
-                                    year, month, day = int(date_part[0:4]), int(date_part[5:7]), int(date_part[8:10])
-                                    created_date = datetime(year, month, day)
-                                    days_old = (current_date - created_date).days
-                        elif len(created_date_value) >= 10:
-                            # Other string format: "YYYY-MM-DD HH:MM:SS" or "YYYY-MM-DD"
-                            date_part = created_date_value[:10]
-                            if len(date_part) == 10 and date_part[4] == '-' and date_part[7] == '-':
-                                # Direct parsing without split/replace operations
-                                year, month, day = int(date_part[0:4]), int(date_part[5:7]), int(date_part[8:10])
-                                created_date = datetime(year, month, day)
-                                days_old = (current_date - created_date).days
-                            else:
-                                # Try parsing the full string
-                                try:
-                                    created_date = datetime.strptime(created_date_value.split()[0], "%Y-%m-%d")
-                                    days_old = (current_date - created_date).days
-                                except (ValueError, IndexError):
-                                    days_old = 0
-                        else:
-                            # String too short, assume recent
-                            days_old = 0
-                    else:
-                        # Unknown type, assume recent
-                        days_old = 0
-                except (ValueError, AttributeError, TypeError, IndexError, OSError) as e:
-                    # If date parsing fails, assume 0-7 days (recent)
-                    #print(f"Warning: Could not parse date '{created_date_value}': {e}")
-                    days_old = 0
-            
-            # Categorize by age
-            if days_old <= 7:
-                ageing_counts["0-7"] += 1
-            elif days_old <= 14:
-                ageing_counts["8-14"] += 1
-            elif days_old <= 30:
-                ageing_counts["15-30"] += 1
-            else:
-                ageing_counts["30+"] += 1
-            
-            # Calculate subcategory status
-            # Try multiple field names for subcategory
-            subcategory = (
-                incident.get("correctedSubCategory") or 
-                incident.get("corrected_sub_category") or 
-                incident.get("subCategory") or
-                incident.get("sub_category") or
-                "Other"
-            )
-            if subcategory not in subcategory_status:
-                subcategory_status[subcategory] = {"resolved": 0, "pending": 0, "open": 0}
-            
-            # Determine status: check stage field first (new format), then fallback to issueStatus
-            # Note: Category incidents use 'issueStatus' field, regular incidents use 'stage' field
-            stage = incident.get("stage", "") or incident.get("Stage", "")
-            issue_status = incident.get("issueStatus", "") or incident.get("IssueStatus", "")
-            resolution_note = incident.get("resolutionNote") or incident.get("resolution", "") or incident.get("Resolution", "")
-            
-            # Map stage values to status categories
-            # Stage values: 'Closed', 'Verification', 'Resolution in Progress', etc.
-            # IssueStatus values: 'Open', 'Pending', 'Resolved', etc.
-            if stage:
-                stage_lower = stage.lower().strip()
-                # Check for resolved status - use keyword matching to catch variations
-                resolved_keywords = ["closed", "resolved", "completed", "resolved - completed", "closed - verified", 
-                                     "resolved - verified", "closed - resolved", "completed - verified", "Done"]
-                # Check for pending/in-progress status
-                pending_keywords = ["verification", "pending", "in progress", "resolution in progress", 
-                                   "isolation", "on hold", "hold", "in queue", "assigned", "investigation",
-                                   "work in progress", "wip"]
-                
-                # Check if stage contains any resolved keyword
-                is_resolved = any(keyword in stage_lower for keyword in resolved_keywords)
-                # Check if stage contains any pending keyword
-                is_pending = any(keyword in stage_lower for keyword in pending_keywords)
-                
-                if is_resolved:
-                    subcategory_status[subcategory]["resolved"] += 1
-                elif is_pending:
-                    subcategory_status[subcategory]["pending"] += 1
-                else:
-                    # If resolution note exists, consider it resolved
-                    if resolution_note and resolution_note.strip():
-                        subcategory_status[subcategory]["resolved"] += 1
-                    else:
-                        subcategory_status[subcategory]["open"] += 1
-            elif issue_status:
-                # Fallback to issueStatus if stage is not available (used by category incidents)
-                status_lower = issue_status.lower().strip()
-                # Check for resolved status
-                if (status_lower == "done" or status_lower == "resolved" or "done" in status_lower or "resolved" in status_lower or "closed" in status_lower or "completed" in status_lower):
-                    subcategory_status[subcategory]["resolved"] += 1
-                # Check for pending status
-                # elif status_lower == "pending" or "pending" in status_lower or "in progress" in status_lower or "verification" in status_lower:
-                elif (status_lower == "pending" or status_lower == "on hold" or status_lower == "escalated" or status_lower == "waiting for customer" or status_lower == "in progress" or status_lower == "review with engineering" or "pending" in status_lower or "on hold" in status_lower or "escalated" in status_lower or "waiting" in status_lower or "in progress" in status_lower or "verification" in status_lower or"review with engineering" in status_lower):
-                    subcategory_status[subcategory]["pending"] += 1
-                # Check for open status - but also check if it might be pending based on other fields
-                elif status_lower == "open" or "open" in status_lower:
-                    # If resolution note exists, consider it resolved even if status is "open"
-                    if resolution_note and resolution_note.strip():
-                        subcategory_status[subcategory]["resolved"] += 1
-                    else:
-                        # Check if there are other indicators of pending status
-                        # For category incidents, "Open" usually means truly open, not pending
-                        subcategory_status[subcategory]["open"] += 1
-                else:
-                    # Unknown status, default to open
-                    subcategory_status[subcategory]["open"] += 1
-            else:
-                # Fallback: check resolution note and other status fields
-                status_details = incident.get("statusDetails") or incident.get("status", "") or incident.get("Status", "")
-                
-                if resolution_note and resolution_note.strip():
-                    # Has resolution note, likely resolved
-                    subcategory_status[subcategory]["resolved"] += 1
-                elif status_details:
-                    status_details_lower = status_details.lower().strip()
-                    if status_details_lower == "resolved" or "resolved" in status_details_lower:
-                        subcategory_status[subcategory]["resolved"] += 1
-                    elif status_details_lower == "pending" or "pending" in status_details_lower:
-                        subcategory_status[subcategory]["pending"] += 1
-                    else:
-                        subcategory_status[subcategory]["open"] += 1
-                else:
-                    # Default to open
-                    subcategory_status[subcategory]["open"] += 1 
-        # Get top 8 subcategories by total count
-        subcategory_totals = {
-            subcat: data["resolved"] + data["pending"] + data["open"]
-            for subcat, data in subcategory_status.items()
-        }
-        top_subcategories = sorted(subcategory_status.items(), key=lambda x: subcategory_totals[x[0]], reverse=True)[:8]
-        
-        # Build chart data
-        chart1_data = {
-            "type": "bar",
-            "data": {
-                "labels": ["0-7 days", "8-14 days", "15-30 days", "30+ days"],
-                "datasets": [{
-                    "label": "Incidents",
-                    "data": [ageing_counts["0-7"], ageing_counts["8-14"], ageing_counts["15-30"], ageing_counts["30+"]],
-                    "backgroundColor": ["#3B82F6", "#60A5FA", "#93C5FD", "#DBEAFE"],
-                    "borderWidth": 1,
-                    "borderColor": "#ffffff"
-                }]
-            },
-            "options": {
-                "responsive": True,
-                "maintainAspectRatio": True,
-                "plugins": {
-                    "title": {
-                        "display": True,
-                        "text": "Incident Ageing Analysis",
-                        "font": {"size": 18, "weight": "bold"}
-                    },
-                    "legend": {"display": False}
-                },
-                "scales": {
-                    "y": {
-                        "beginAtZero": True,
-                        "title": {
-                            "display": True,
-                            "text": "Number of Incidents (Count)"
-                        }
-                    },
-                    "x": {
-                        "title": {
-                            "display": True,
-                            "text": "Age Range (Days)"
-                        }
-                    }
-                }
-            }
-        }
-        
-        # Build chart2 data
-        # Ensure we have at least empty arrays if no subcategories
-        if top_subcategories:
-            chart2_labels = [subcat for subcat, _ in top_subcategories]
-            chart2_resolved = [subcategory_status[subcat]["resolved"] for subcat in chart2_labels]
-            chart2_pending = [subcategory_status[subcat]["pending"] for subcat in chart2_labels]
-            chart2_open = [subcategory_status[subcat]["open"] for subcat in chart2_labels]
-        else:
-            # No subcategories - use empty arrays
-            chart2_labels = []
-            chart2_resolved = []
-            chart2_pending = []
-            chart2_open = []
-        
-        chart2_data = {
-            "type": "bar",
-            "data": {
-                "labels": chart2_labels,
-                "datasets": [
-                    {
-                        "label": "Resolved",
-                        "data": chart2_resolved,
-                        "backgroundColor": "#10B981",
-                        "borderWidth": 1,
-                        "borderColor": "#ffffff"
-                    },
-                    {
-                        "label": "Pending",
-                        "data": chart2_pending,
-                        "backgroundColor": "#F59E0B",
-                        "borderWidth": 1,
-                        "borderColor": "#ffffff"
-                    },
-                    {
-                        "label": "Open",
-                        "data": chart2_open,
-                        "backgroundColor": "#EF4444",
-                        "borderWidth": 1,
-                        "borderColor": "#ffffff"
-                    }
-                ]
-            },
-            "options": {
-                "indexAxis": "y",
-                "responsive": True,
-                "maintainAspectRatio": True,
-                "plugins": {
-                    "title": {
-                        "display": True,
-                        "text": "Issue Status by Subcategory",
-                        "font": {"size": 18, "weight": "bold"}
-                    },
-                    "legend": {
-                        "display": True,
-                        "position": "top"
-                    }
-                },
-                "scales": {
-                    "x": {
-                        "beginAtZero": True,
-                        "title": {
-                            "display": True,
-                            "text": "Number of Incidents (Count)"
-                        }
-                    },
-                    "y": {
-                        "title": {
-                            "display": True,
-                            "text": "Subcategory"
-                        }
-                    }
-                }
-            }
-        }
-        
-        # Serialize charts to JSON string
-        charts_json = json.dumps([chart1_data, chart2_data])
-        
-        # Validate the JSON is correct and can be parsed
-        try:
-            parsed_charts = json.loads(charts_json)
-            if not isinstance(parsed_charts, list) or len(parsed_charts) != 2:
-                #print(f"ERROR: Chart JSON validation failed - expected list of 2 charts, got {type(parsed_charts)}")
-                # Return error instead of invalid JSON
-                charts_json = json.dumps([chart1_data, chart2_data])  # Try again
-                parsed_charts = json.loads(charts_json)
-            
-            # CRITICAL: Verify both charts have required structure and fix if needed
-            charts_need_fix = False
-            for i, chart in enumerate(parsed_charts):
-                if not isinstance(chart, dict):
-                    #print(f"ERROR: Chart {i} is not a dict - regenerating...")
-                    charts_need_fix = True
-                    break
-                if "type" not in chart or "data" not in chart:
-                    #print(f"ERROR: Chart {i} is missing required fields (type or data) - regenerating...")
-                    charts_need_fix = True
-                    break
-                if "options" not in chart:
-                    #print(f"ERROR: Chart {i} is missing 'options' field - fixing by regenerating...")
-                    charts_need_fix = True
-                    break
-            
-            # If any chart is malformed, regenerate from source data
-            if charts_need_fix:
-                #print(f"WARNING: Regenerating charts due to structural issues...")
-                charts_json = json.dumps([chart1_data, chart2_data])
-                parsed_charts = json.loads(charts_json)
-            
-            # CRITICAL: Ensure JSON is properly formatted and ends with closing bracket
-            # Re-parse and re-serialize to ensure it's valid and complete
-            charts_json = json.dumps(parsed_charts)
-            # Double-check it ends with ']' and can be parsed
-            if not charts_json.endswith(']'):
-                #print(f"ERROR: Chart JSON does not end with ']' - fixing...")
-                charts_json = json.dumps(parsed_charts)
-            # Final validation parse - this will raise if invalid
-            final_parsed = json.loads(charts_json)
-            # Verify structure one more time
-            if not isinstance(final_parsed, list) or len(final_parsed) != 2:
-                raise ValueError("Final validation failed - not a list of 2 charts")
-            for i, chart in enumerate(final_parsed):
-                if "options" not in chart:
-                    raise ValueError(f"Chart {i} missing 'options' field after final validation")
-        except (json.JSONDecodeError, ValueError, KeyError) as e:
-            #print(f"ERROR: Generated chart JSON is invalid: {e} - regenerating from source...")
-            # Regenerate from source data
-            charts_json = json.dumps([chart1_data, chart2_data])
-            # Final check
-            if not charts_json.endswith(']'):
-                #print(f"CRITICAL ERROR: Regenerated chart JSON still does not end with ']'")
-                charts_json = json.dumps([chart1_data, chart2_data])
-            # Verify the regenerated JSON is valid
-            try:
-                final_check = json.loads(charts_json)
-                if len(final_check) != 2 or "options" not in final_check[0] or "options" not in final_check[1]:
-                    print(f"CRITICAL ERROR: Regenerated JSON still has structural issues!")
-            except Exception as e2:
-                print(f"CRITICAL ERROR: Regenerated JSON cannot be parsed: {e2}")
-
-        
-        # Calculate summary statistics
-        ageing_analysis = {
-            "0-7": ageing_counts["0-7"],
-            "8-14": ageing_counts["8-14"],
-            "15-30": ageing_counts["15-30"],
-            "30+": ageing_counts["30+"]
-        }
-        
-        # CRITICAL: Final validation before returning - ensure chart_data is valid JSON
-        # This prevents issues where the JSON might get corrupted during agent processing
-        try:
-            # Verify it can be parsed and is a list of 2 charts
-            final_validation = json.loads(charts_json)
-            if not isinstance(final_validation, list) or len(final_validation) != 2:
-                #print(f"WARNING: Chart data validation failed before return - regenerating...")
-                charts_json = json.dumps([chart1_data, chart2_data])
-                final_validation = json.loads(charts_json)
-            
-            # CRITICAL: Verify both charts have "options" field
-            for i, chart in enumerate(final_validation):
-                if not isinstance(chart, dict):
-                    raise ValueError(f"Chart {i} is not a dict")
-                if "options" not in chart:
-                    #print(f"CRITICAL: Chart {i} missing 'options' field before return - regenerating...")
-                    charts_json = json.dumps([chart1_data, chart2_data])
-                    final_validation = json.loads(charts_json)
-                    break
-                if "type" not in chart or "data" not in chart:
-                    #print(f"CRITICAL: Chart {i} missing required fields before return - regenerating...")
-                    charts_json = json.dumps([chart1_data, chart2_data])
-                    final_validation = json.loads(charts_json)
-                    break
-            
-            # Ensure it ends with ']' (array closing bracket)
-            if not charts_json.endswith(']'):
-                #print(f"WARNING: Chart data does not end with ']' - fixing...")
-                charts_json = json.dumps([chart1_data, chart2_data])
-            
-            # Final parse to ensure it's valid
-            final_check = json.loads(charts_json)
-            # Verify both charts have options
-            if len(final_check) != 2 or "options" not in final_check[0] or "options" not in final_check[1]:
-                raise ValueError("Final check failed - charts missing options field")
-        except (json.JSONDecodeError, ValueError, KeyError, Exception) as e:
-            #print(f"ERROR: Chart data validation failed before return: {e} - regenerating...")
-            charts_json = json.dumps([chart1_data, chart2_data])
-            # Verify regenerated JSON
-            try:
-                verify = json.loads(charts_json)
-                if len(verify) != 2 or "options" not in verify[0] or "options" not in verify[1]:
-                    print(f"CRITICAL ERROR: Regenerated JSON still missing options field!")
-            except Exception as e2:
-                print(f"CRITICAL ERROR: Regenerated JSON cannot be parsed: {e2}")
-
-        # Return structured response with pre-calculated chart data
-        # NOTE: We don't include the full incidents list to reduce payload size
-        # The agent only needs the summaries for the report
-        engineer_percentages = {}
-        for incident in incidents:
-            # Check if top_engineers_for_category exists in the incident
-            top_engineers = incident.get("top_engineers_for_category", [])
-            if top_engineers and isinstance(top_engineers, list):
-                for engineer_data in top_engineers:
-                    if isinstance(engineer_data, dict):
-                        engineer_name = engineer_data.get("engineer", "Unknown")
-                        percentage = engineer_data.get("percentage", 0.0)
-                        
-                        # Aggregate percentages across all incidents
-                        if engineer_name in engineer_percentages:
-                            # Keep the max percentage seen for this engineer
-                            engineer_percentages[engineer_name] = max(engineer_percentages[engineer_name], percentage)
-                        else:
-                            engineer_percentages[engineer_name] = percentage
-        
-        # Convert to list format and sort by percentage (descending)
-        top_smes = [
-            {"engineer": engineer, "percentage": percentage}
-            for engineer, percentage in engineer_percentages.items()
-        ]
-        top_smes.sort(key=lambda x: x["percentage"], reverse=True)
-        
-        # Take top 5 SMEs
-        top_smes = top_smes[:5]
-        
-
-        category_name = generated_category or category or "Unknown"
-        rep = {
-            "category_name": category_name,
-            "total": len(incidents),
-            "incidents_count": len(incidents),  # Just the count, not the full list
-            "by_priority": by_priority,
-            "ageing_analysis": ageing_analysis,
-            "subcategory_status": subcategory_status,
-            "chart_data": charts_json,  # Pre-calculated chart JSON string
-            "top_smes": top_smes,  # Top subject matter experts for this category
-            "is_empty": False  # Flag to indicate data exists
-        }
-        # Final verification before returning
+    category_name = generated_category or category or "Unknown"
+
+    # Plain filtered listings can come from the local mirror. Free-text queries and date ranges need the
+    # remote search; the mirror can't reproduce the categoriser's date filter exactly.
+    if (
+        not query.strip()
+        and not category
+        and not start_date
+        and not end_date
+        and mirror.is_fresh(_mirror_tag(tag))
+    ):
         try:
-            verify_charts = json.loads(charts_json)
-            has_options = len(verify_charts) == 2 and "options" in verify_charts[0] and "options" in verify_charts[1]
-            #print(f"Response from get_incidents_by_category: {category_name}, total: {len(incidents)}, chart_data length: {len(charts_json)}, ends with ']': {charts_json.endswith(']')}, has_options: {has_options}")
+            return await mirror.category_report(
+                _mirror_tag(tag),
+                category_name,
+                limit,
+                generated_category=generated_category,
+                sub_category=sub_category,
+            )
         except Exception as e:
-            print(f"WARNING: Could not verify chart_data before return: {e}")
-        #print(f"resp sent to agent {rep}")
-        return rep
-    except requests.exceptions.RequestException as e:
-        #print("Error in get_incidents_by_category", e)
-        return {"error": str(e)}
+            logger.warning("Incident mirror query failed", error=str(e))
+
+    async def load() -> dict:
+        session = http_client.get_session(INGESTER_URL)
+        async with session.get(
+            f"{INGESTER_URL}/categoriser/search", params=params, timeout=120
+        ) as response:
+            response.raise_for_status()
+            # Convert incidents to report columns as they stream in
+            columns = await reports.aggregate_stream(
+                json_stream.iter_array_items(response.content.iter_chunked(json_stream.CHUNK_SIZE))
+            )
+        return await workers.run_cpu(columns.report, category_name)
+
+    try:
+        return await categoriser_cache.get_or_load(
+            cache.make_key("report", category_name=category_name, **params), load
+        )
+    except json_stream.NotAJSONArray as e:
+        # Handle error response
+        if isinstance(e.value, dict) and "error" in e.value:
+            return e.value
+        return await workers.run_cpu(reports.IncidentColumns().report, category_name)
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+        return {"error": str(e) or type(e).__name__}
+
 
+search_cache = cache.TTLCache(
+    "internet_search",
+    ttl=c.SEARCH_CACHE_TTL,
+    max_bytes=c.SEARCH_CACHE_MAX_BYTES,
+)
+_search_semaphore = asyncio.Semaphore(c.SEARCH_CONCURRENCY)
+_tavily_client: Optional[AsyncTavilyClient] = None
+
+
+def _get_tavily_client() -> AsyncTavilyClient:
+    """Create the Tavily client on first use rather than at import."""
+    global _tavily_client
+    if _tavily_client is None:
+        _tavily_client = AsyncTavilyClient(
+            api_key=c.config["TAVILY_API_KEY"],
+            api_base_url=c.config.get("TAVILY_API_BASE_URL") or None,
+        )
+    return _tavily_client
+
+
+def _compact_search_response(response: dict) -> dict:
+    """Keep what the model uses from a Tavily response, with page content cut to size."""
+    results = []
+    for result in response.get("results", []):
+        compact = {
+            "title": result.get("title"),
+            "url": result.get("url"),
+            "content": projection.truncate(result.get("content"), c.SEARCH_CONTENT_CHARS),
+            "score": result.get("score"),
+        }
+        if result.get("raw_content"):
+            compact["raw_content"] = projection.truncate(result["raw_content"], c.SEARCH_RAW_CONTENT_CHARS)
+        results.append(compact)
+    compacted = {"query": response.get("query"), "results": results}
+    if response.get("answer"):
+        compacted["answer"] = response["answer"]
+    return compacted
 
-tavily_client = TavilyClient(api_key=c.config["TAVILY_API_KEY"])
 
 @tool
-def internet_search(
+async def internet_search(
     query: str,
     max_results: int = 5,
     include_raw_content: bool = False,
 ):
     """Run a web search"""
-    return tavily_client.search(
-        query,
-        max_results=max_results,
-        include_raw_content=include_raw_content,
-    )
\ No newline at end of file
+    key = cache.make_key(
+        "internet_search", query=query, max_results=max_results, include_raw_content=include_raw_content
+    )
+
+    async def load() -> dict:
+        async with _search_semaphore:
+            response = await _get_tavily_client().search(
+                query,
+                max_results=max_results,
+                include_raw_content=include_raw_content,
+            )
+        return _compact_search_response(response)
+
+    try:
+        return await search_cache.get_or_load(key, load)
+    except Exception as e:
+        logger.error("Internet search failed", error=str(e))
+        return {"error": str(e) or type(e).__name__}
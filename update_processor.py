@@ -0,0 +1,102 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Optional
+import structlog
+from telegram.ext import BaseUpdateProcessor
+
+logger = structlog.get_logger()
+
+
+def thread_id(update: object) -> Optional[str]:
+    """The agent thread an update belongs to: its chat id, as used in the agent config."""
+    chat = getattr(update, "effective_chat", None)
+    return str(chat.id) if chat is not None else None
+
+
+class ChatOrderedUpdateProcessor(BaseUpdateProcessor):
+    """
+    Process updates concurrently, but strictly in order within each chat.
+
+    Each update first waits for its chat's lock and only then for one of the
+    `max_concurrent_updates` global slots, so a burst of messages from one
+    chat queues behind that chat instead of holding slots other chats need.
+    Locks are created on demand and dropped when a chat has nothing pending.
+    """
+
+    def __init__(self, max_concurrent_updates: int):
+        super().__init__(max_concurrent_updates)
+        self._chat_locks: dict[str, asyncio.Lock] = {}
+        # thread_id -> updates running or waiting for that chat
+        self._depth: dict[str, int] = {}
+        self._waiting = 0
+        self.processed = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+
+    async def process_update(self, update: object, coroutine: Awaitable[Any]) -> None:
+        key = thread_id(update)
+        enqueued = time.perf_counter()
+        lock = None
+        if key is not None:
+            lock = self._chat_locks.setdefault(key, asyncio.Lock())
+            self._depth[key] = self._depth.get(key, 0) + 1
+        self._waiting += 1
+        started = False
+        try:
+            if lock is not None:
+                await lock.acquire()
+            try:
+                async with self._semaphore:
+                    self._waiting -= 1
+                    started = True
+                    wait_ms = (time.perf_counter() - enqueued) * 1000
+                    self._record_wait(key, wait_ms)
+                    await self.do_process_update(update, coroutine)
+            finally:
+                if lock is not None:
+                    lock.release()
+        finally:
+            if not started:
+                self._waiting -= 1
+                # Cancelled while queued; close the handler coroutine so it is not left un-awaited
+                coroutine.close()
+            if key is not None:
+                self._depth[key] -= 1
+                if not self._depth[key]:
+                    del self._depth[key]
+                    del self._chat_locks[key]
+
+    def _record_wait(self, key: Optional[str], wait_ms: float):
+        self.processed += 1
+        self.total_wait_ms += wait_ms
+        self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+        logger.info(
+            "Update started",
+            thread_id=key,
+            wait_ms=round(wait_ms, 1),
+            chat_depth=self._depth.get(key, 0),
+            waiting=self._waiting,
+            in_flight=self.current_concurrent_updates,
+        )
+
+    async def do_process_update(self, update: object, coroutine: Awaitable[Any]) -> None:
+        await coroutine
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
+
+    def stats(self) -> dict:
+        """Updates running and queued per chat, and how long processed updates waited for a slot."""
+        return {
+            "max_concurrent_updates": self.max_concurrent_updates,
+            "in_flight": self.current_concurrent_updates,
+            "waiting": self._waiting,
+            "chats_pending": len(self._depth),
+            "max_chat_depth": max(self._depth.values(), default=0),
+            "processed": self.processed,
+            "avg_wait_ms": round(self.total_wait_ms / self.processed, 1) if self.processed else 0.0,
+            "max_wait_ms": round(self.max_wait_ms, 1),
+        }
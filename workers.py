@@ -0,0 +1,44 @@
+import asyncio
+import functools
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+import structlog
+import constants as c
+
+logger = structlog.get_logger()
+
+_executor: Executor | None = None
+
+
+def get_executor() -> Executor:
+    """
+    Get the shared executor for CPU-heavy report building.
+    Returns:
+        Executor: A thread pool, or a process pool when REPORT_EXECUTOR=process
+    Note:
+        A process pool sidesteps the GIL but pickles every argument; functions
+        submitted to it must be module-level.
+    """
+    global _executor
+    if _executor is None:
+        if c.REPORT_EXECUTOR == "process":
+            _executor = ProcessPoolExecutor(max_workers=c.REPORT_WORKERS)
+        else:
+            _executor = ThreadPoolExecutor(
+                max_workers=c.REPORT_WORKERS, thread_name_prefix="report"
+            )
+        logger.info("Report executor started", kind=c.REPORT_EXECUTOR, workers=c.REPORT_WORKERS)
+    return _executor
+
+
+async def run_cpu(fn, *args, **kwargs):
+    """Run a synchronous, CPU-bound function on the shared executor and await its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), functools.partial(fn, *args, **kwargs))
+
+
+def shutdown():
+    """Stop the shared executor, dropping any work that has not started yet."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None